@@ -1,46 +1,499 @@
-from fastapi import APIRouter, HTTPException, Depends
+import functools
+import json
+import time
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional
-from backend.services.llm_service import LLMService
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+from backend.feature_flags.manager import FeatureFlagManager, get_feature_flags
+from backend.services.batch_jobs import BatchGroup, BatchProgress, parse_jsonl, plan_groups, run_groups_async
+from backend.services.batching import ContinuousBatcher
+from backend.services.context_window import map_reduce
+from backend.services.grammar import grammar_key
+from backend.services.inference_scheduler import InferenceScheduler, QueueFullError, SchedulerError, TokenStream
+from backend.services.llm_cache import ResponseCache, make_cache_key
+from backend.services.llm_service import GenerationResult, LLMService
+from backend.services.model_registry import ModelRegistry
 from backend.settings import settings
+from backend.telemetry.metrics import REGISTRY, RATE_BUCKETS, RATIO_BUCKETS, TOKEN_BUCKETS
+from backend.telemetry.tracing import TRACER, span
 
 router = APIRouter()
 
+DECODE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+REQUEST_SECONDS = REGISTRY.histogram("llm_request_duration_seconds", "Generation latency including queue wait")
+QUEUE_WAIT_SECONDS = REGISTRY.histogram("llm_queue_wait_seconds", "Time spent waiting for an inference worker")
+TTFT_SECONDS = REGISTRY.histogram("llm_time_to_first_token_seconds", "Time to first token including queue wait")
+PROMPT_EVAL_SECONDS = REGISTRY.histogram("llm_prompt_eval_seconds", "llama.cpp prompt evaluation time")
+DECODE_SECONDS_PER_TOKEN = REGISTRY.histogram("llm_decode_seconds_per_token", "Decode time per generated token", DECODE_BUCKETS)
+TOKENS_PER_SECOND = REGISTRY.histogram("llm_tokens_per_second", "Completion tokens per second", RATE_BUCKETS)
+PROMPT_TOKENS = REGISTRY.histogram("llm_prompt_tokens", "Prompt tokens per request", TOKEN_BUCKETS)
+COMPLETION_TOKENS = REGISTRY.histogram("llm_completion_tokens", "Completion tokens per request", TOKEN_BUCKETS)
+CACHE_RESULTS = REGISTRY.counter("llm_cache_results_total", "Generation requests by cache outcome")
+DRAFT_ACCEPTANCE = REGISTRY.histogram("llm_draft_acceptance_ratio", "Share of speculative draft tokens accepted", RATIO_BUCKETS)
+
 class LLMRequest(BaseModel):
     prompt: str = Field(..., min_length=1, max_length=4096, description="The text prompt to generate from")
     max_tokens: Optional[int] = Field(default=256, ge=1, le=2048, description="Maximum number of tokens to generate")
     temperature: Optional[float] = Field(default=0.7, ge=0.0, le=2.0, description="Sampling temperature")
+    model: Optional[str] = Field(default=None, description="Name of a configured model (defaults to LLM_DEFAULT_MODEL)")
+    priority: int = Field(default=5, ge=0, le=9, description="Queue priority (0 runs first)")
+    timeout: Optional[float] = Field(default=None, gt=0, le=600, description="Deadline in seconds, including time spent queued")
+    speculative: Optional[Literal["off", "prompt_lookup", "draft_model"]] = Field(
+        default=None, description="Speculative decoding mode (defaults to LLM_SPECULATIVE)"
+    )
+    json_schema: Optional[Dict[str, Any]] = Field(default=None, description="JSON schema the response must match")
+    grammar: Optional[str] = Field(default=None, max_length=16384, description="GBNF grammar the response must match")
+    truncation: Optional[Literal["error", "head", "tail", "middle_out"]] = Field(
+        default=None, description="How a prompt too long for the context is handled (defaults to LLM_TRUNCATION)"
+    )
+
+class LLMUsage(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    truncated_tokens: int = Field(default=0, description="Prompt tokens dropped to fit the context window")
+
+class ContextRequest(BaseModel):
+    prompt: str = Field(..., min_length=1, max_length=1_000_000, description="Text to measure")
+    max_tokens: int = Field(default=256, ge=1, le=2048, description="Tokens the completion would ask for")
+    model: Optional[str] = Field(default=None, description="Name of a configured model (defaults to LLM_DEFAULT_MODEL)")
+    truncation: Optional[Literal["error", "head", "tail", "middle_out"]] = Field(
+        default=None, description="Strategy to plan with (defaults to LLM_TRUNCATION)"
+    )
+
+class ContextResponse(BaseModel):
+    n_ctx: int
+    prompt_tokens: int = Field(description="Tokens in the prompt as sent")
+    fits: bool = Field(description="Whether the request runs without truncation")
+    planned_prompt_tokens: Optional[int] = Field(default=None, description="Prompt tokens after truncation")
+    max_tokens: Optional[int] = Field(default=None, description="max_tokens clamped to the room left")
+    truncated_tokens: int = 0
+    error: Optional[str] = Field(default=None, description="Why the request would be rejected")
+
+class ChunkedRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=1_000_000, description="Input too long for one context, e.g. a whole file")
+    instruction: str = Field(..., min_length=1, max_length=4096, description="What to do with each window and with the combined answers")
+    max_tokens: int = Field(default=256, ge=1, le=2048, description="Maximum tokens per window answer and for the combined answer")
+    temperature: float = Field(default=0.7, ge=0.0, le=2.0, description="Sampling temperature")
+    model: Optional[str] = Field(default=None, description="Name of a configured model (defaults to LLM_DEFAULT_MODEL)")
+    window_tokens: Optional[int] = Field(default=None, ge=16, description="Tokens per window (default: as many as fit)")
+    overlap_tokens: int = Field(default=64, ge=0, description="Tokens shared by neighbouring windows")
+    reduce: bool = Field(default=True, description="Combine the window answers with one more generation")
+    priority: int = Field(default=5, ge=0, le=9, description="Queue priority (0 runs first)")
+
+class LLMChunkResult(BaseModel):
+    index: int
+    response: str
+    usage: LLMUsage
+
+class ChunkedResponse(BaseModel):
+    response: Optional[str] = Field(default=None, description="The combined answer (the only window's answer for short input)")
+    chunks: List[LLMChunkResult]
+    usage: LLMUsage
+
+class LLMTimings(BaseModel):
+    queue_wait_ms: float = 0.0
+    prompt_eval_ms: Optional[float] = None
+    ttft_ms: Optional[float] = Field(default=None, description="Time to first token, including queue wait")
+    decode_ms_per_token: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    total_ms: float = 0.0
+
+class LLMSpeculation(BaseModel):
+    mode: str
+    draft_tokens: int = Field(default=0, description="Tokens proposed by the draft")
+    accepted_tokens: int = Field(default=0, description="Draft tokens the model kept")
+    acceptance_rate: Optional[float] = None
+    speedup: Optional[float] = Field(default=None, description="Decode speed relative to recent non-speculative requests")
 
 class LLMResponse(BaseModel):
     response: str
     model_loaded: bool
     tokens_generated: Optional[int] = None
+    usage: Optional[LLMUsage] = None
+    timings: Optional[LLMTimings] = None
+    speculative: Optional[LLMSpeculation] = None
+    cache: str = Field(default="miss", description="hit (exact response cache), prefix (KV prefix reused) or miss")
+    tokens_saved: int = Field(default=0, description="Tokens not evaluated thanks to caching")
+    parsed: Optional[Any] = Field(default=None, description="The response decoded as JSON, for json_schema requests")
+
+def get_model_registry(request: Request) -> ModelRegistry:
+    return request.app.state.model_registry
+
+def get_inference_scheduler(request: Request) -> InferenceScheduler:
+    return request.app.state.inference_scheduler
+
+def get_batcher(request: Request) -> Optional[ContinuousBatcher]:
+    return getattr(request.app.state, "batcher", None)
+
+def get_response_cache(request: Request) -> Optional[ResponseCache]:
+    return getattr(request.app.state, "response_cache", None)
 
-def get_llm_service() -> LLMService:
-    return LLMService(str(settings.LLM_MODEL_PATH))
+async def _cache_get(cache: ResponseCache, key: str) -> Optional[Dict[str, Any]]:
+    # With Redis behind it a lookup is a network round trip; keep that off the event loop.
+    if cache.redis is None:
+        return cache.get(key)
+    return await run_in_threadpool(cache.get, key)
+
+async def _cache_set(cache: ResponseCache, key: str, value: Dict[str, Any]) -> None:
+    if cache.redis is None:
+        cache.set(key, value)
+    else:
+        await run_in_threadpool(cache.set, key, value)
+
+def _record_metrics(model: str, result: GenerationResult) -> None:
+    CACHE_RESULTS.inc(model=model, cache=result.cache)
+    if result.cache == "hit":
+        return
+    REQUEST_SECONDS.observe(result.total_ms / 1000, model=model)
+    QUEUE_WAIT_SECONDS.observe(result.queue_wait_ms / 1000, model=model)
+    PROMPT_TOKENS.observe(result.prompt_tokens, model=model)
+    COMPLETION_TOKENS.observe(result.completion_tokens, model=model)
+    if result.ttft_ms is not None:
+        TTFT_SECONDS.observe(result.ttft_ms / 1000, model=model)
+    if result.prompt_eval_ms is not None:
+        PROMPT_EVAL_SECONDS.observe(result.prompt_eval_ms / 1000, model=model)
+    if result.decode_ms_per_token is not None:
+        DECODE_SECONDS_PER_TOKEN.observe(result.decode_ms_per_token / 1000, model=model)
+    if result.tokens_per_second is not None:
+        TOKENS_PER_SECOND.observe(result.tokens_per_second, model=model)
+    if result.acceptance_rate is not None:
+        DRAFT_ACCEPTANCE.observe(result.acceptance_rate, model=model, mode=result.speculative)
+
+def _usage(result: GenerationResult) -> LLMUsage:
+    return LLMUsage(
+        prompt_tokens=result.prompt_tokens,
+        completion_tokens=result.completion_tokens,
+        total_tokens=result.prompt_tokens + result.completion_tokens,
+        truncated_tokens=result.truncated_tokens
+    )
+
+def _parse_json(text: str) -> Optional[Any]:
+    """Decode a schema-constrained response; None when max_tokens cut it short."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+def _to_response(llm: LLMService, result: GenerationResult, parse_json: bool = False) -> LLMResponse:
+    return LLMResponse(
+        response=result.text,
+        parsed=_parse_json(result.text) if parse_json and result.error is None else None,
+        model_loaded=llm.is_model_loaded(),
+        tokens_generated=result.completion_tokens,
+        cache=result.cache,
+        tokens_saved=result.tokens_saved,
+        speculative=LLMSpeculation(
+            mode=result.speculative,
+            draft_tokens=result.draft_tokens,
+            accepted_tokens=result.accepted_tokens,
+            acceptance_rate=result.acceptance_rate,
+            speedup=result.speedup
+        ) if result.speculative else None,
+        usage=_usage(result),
+        timings=LLMTimings(
+            queue_wait_ms=result.queue_wait_ms,
+            prompt_eval_ms=result.prompt_eval_ms,
+            ttft_ms=result.ttft_ms,
+            decode_ms_per_token=result.decode_ms_per_token,
+            tokens_per_second=result.tokens_per_second,
+            total_ms=result.total_ms
+        )
+    )
+
+def get_llm_service(request: LLMRequest, registry: ModelRegistry = Depends(get_model_registry)) -> LLMService:
+    try:
+        return registry.get(request.model)
+    except ValueError as ex:
+        raise HTTPException(status_code=404, detail=str(ex))
 
 @router.post("/generate", response_model=LLMResponse)
-async def generate_text(request: LLMRequest, llm: LLMService = Depends(get_llm_service)):
+async def generate_text(request: LLMRequest, llm: LLMService = Depends(get_llm_service),
+                        scheduler: InferenceScheduler = Depends(get_inference_scheduler),
+                        batcher: Optional[ContinuousBatcher] = Depends(get_batcher),
+                        registry: ModelRegistry = Depends(get_model_registry),
+                        cache: Optional[ResponseCache] = Depends(get_response_cache)):
     """Generate text using the local GGUF LLM model."""
+    model = registry.resolve(request.model)
+    max_tokens = request.max_tokens or 256
+    temperature = request.temperature if request.temperature is not None else 0.7
+    constrained = request.json_schema is not None or request.grammar is not None
+    cache_key = None
+    if cache is not None and cache.is_cacheable(temperature):
+        options = {"grammar": grammar_key(request.json_schema, request.grammar)} if constrained else {}
+        if request.truncation is not None:
+            options["truncation"] = request.truncation
+        cache_key = make_cache_key(model, request.prompt, max_tokens=max_tokens, temperature=temperature, **options)
+        with span("llm.cache_lookup"):
+            cached = await _cache_get(cache, cache_key)
+        if cached is not None:
+            result = GenerationResult(
+                text=cached["text"],
+                cache="hit",
+                tokens_saved=cached["prompt_tokens"] + cached["completion_tokens"],
+                prompt_tokens=cached["prompt_tokens"],
+                completion_tokens=cached["completion_tokens"]
+            )
+            _record_metrics(model, result)
+            return _to_response(llm, result, parse_json=request.json_schema is not None)
+
+    # The batcher decodes one token per sequence per step, so it never speculates
+    # and has no grammar; constrained requests run on their own, as do requests
+    # overriding the truncation strategy.
+    batched = batcher is not None and batcher.llm is llm and not constrained and request.truncation is None
+    generate = batcher.generate if batched else functools.partial(
+        llm.generate, speculative=request.speculative, json_schema=request.json_schema, grammar=request.grammar,
+        truncation=request.truncation
+    )
+    submitted_at = time.perf_counter()
+    submitted_ns = time.time_ns()
+
+    def run() -> GenerationResult:
+        queue_wait_ms = (time.perf_counter() - submitted_at) * 1000
+        TRACER.record("llm.queue_wait", submitted_ns, time.time_ns())
+        with span("llm.inference", model=model, batched=batched) as inference:
+            result = generate(prompt=request.prompt, max_tokens=max_tokens, temperature=temperature)
+            inference.set_attribute("llm.prompt_tokens", result.prompt_tokens)
+            inference.set_attribute("llm.completion_tokens", result.completion_tokens)
+        result.queue_wait_ms = queue_wait_ms
+        result.total_ms += queue_wait_ms
+        if result.ttft_ms is not None:
+            result.ttft_ms += queue_wait_ms
+        return result
+
+    try:
+        result = await scheduler.submit(run, priority=request.priority, timeout=request.timeout)
+        if cache_key is not None and result.error is None:
+            await _cache_set(cache, cache_key, {
+                "text": result.text,
+                "prompt_tokens": result.prompt_tokens,
+                "completion_tokens": result.completion_tokens
+            })
+        _record_metrics(model, result)
+        return _to_response(llm, result, parse_json=request.json_schema is not None)
+    except QueueFullError as ex:
+        raise HTTPException(status_code=429, detail=str(ex), headers={"Retry-After": "1"})
+    except SchedulerError as ex:
+        raise HTTPException(status_code=503, detail=str(ex))
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=f"LLM generation failed: {str(ex)}")
+
+@router.post("/context", response_model=ContextResponse)
+def plan_context_window(request: ContextRequest, registry: ModelRegistry = Depends(get_model_registry)):
+    """
+    Count a prompt's tokens and show how it would fit the context, without
+    generating. Synchronous, so loading and tokenizing run in the threadpool.
+    """
+    try:
+        llm = registry.get(request.model)
+    except ValueError as ex:
+        raise HTTPException(status_code=404, detail=str(ex))
+    prompt_tokens = llm.count_tokens(request.prompt)
+    try:
+        _, plan = llm.fit_context(request.prompt, request.max_tokens, request.truncation)
+    except ValueError as ex:
+        return ContextResponse(n_ctx=llm.n_ctx, prompt_tokens=prompt_tokens, fits=False, error=str(ex))
+    return ContextResponse(
+        n_ctx=llm.n_ctx,
+        prompt_tokens=prompt_tokens,
+        fits=not plan.truncated_tokens,
+        planned_prompt_tokens=plan.prompt_tokens,
+        max_tokens=plan.max_tokens,
+        truncated_tokens=plan.truncated_tokens
+    )
+
+@router.post("/generate/chunked", response_model=ChunkedResponse)
+async def generate_chunked(request: ChunkedRequest, registry: ModelRegistry = Depends(get_model_registry),
+                           scheduler: InferenceScheduler = Depends(get_inference_scheduler)):
+    """
+    Map-reduce over input longer than the context: the instruction runs on
+    overlapping windows of the text in parallel, then once more to combine
+    the window answers.
+    """
+    def split() -> Tuple[LLMService, List[str]]:
+        llm = registry.get(request.model)
+        return llm, llm.chunk_text(request.text, request.instruction, request.max_tokens,
+                                   request.overlap_tokens, request.window_tokens)
+
+    try:
+        # Loading the model and tokenizing the whole text block; keep them off the event loop.
+        llm, chunks = await run_in_threadpool(split)
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    model = registry.resolve(request.model)
+
+    async def run(prompt: str, truncation: Optional[str]) -> GenerationResult:
+        result = await scheduler.submit(llm.generate, prompt, request.max_tokens, request.temperature,
+                                        truncation=truncation, priority=request.priority)
+        _record_metrics(model, result)
+        return result
+
+    try:
+        # No more windows in flight than workers, so a long file cannot fill the queue.
+        parts, combined = await map_reduce(chunks, request.instruction, run,
+                                           concurrency=scheduler.max_workers, reduce=request.reduce)
+    except QueueFullError as ex:
+        raise HTTPException(status_code=429, detail=str(ex), headers={"Retry-After": "1"})
+    except SchedulerError as ex:
+        raise HTTPException(status_code=503, detail=str(ex))
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    results = parts + ([combined] if combined is not None else [])
+    if combined is not None:
+        response = combined.text
+    else:
+        response = parts[0].text if len(parts) == 1 else None
+    return ChunkedResponse(
+        response=response,
+        chunks=[LLMChunkResult(index=index, response=part.text, usage=_usage(part)) for index, part in enumerate(parts)],
+        usage=LLMUsage(
+            prompt_tokens=sum(result.prompt_tokens for result in results),
+            completion_tokens=sum(result.completion_tokens for result in results),
+            total_tokens=sum(result.prompt_tokens + result.completion_tokens for result in results),
+            truncated_tokens=sum(result.truncated_tokens for result in results)
+        )
+    )
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def _sse_events(tokens: TokenStream, raw_request: Request, model: str) -> AsyncIterator[str]:
+    """
+    Relay tokens as Server-Sent Events. Decoding runs ahead on an inference
+    worker, so a slow client does not hold the model; a disconnected client
+    stops it at the next token.
+    """
+    count = 0
+    start = time.perf_counter()
+    ttft_ms = None
     try:
-        result = llm.generate(
+        async for token in tokens:
+            if await raw_request.is_disconnected():
+                return
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - start) * 1000
+                TTFT_SECONDS.observe(ttft_ms / 1000, model=model)
+            count += 1
+            yield _sse("token", {"text": token})
+        yield _sse("done", {"tokens_generated": count, "ttft_ms": ttft_ms})
+    except Exception as ex:
+        yield _sse("error", {"detail": f"LLM generation failed: {str(ex)}"})
+    finally:
+        tokens.close()
+
+@router.post("/generate/stream")
+async def generate_text_stream(request: LLMRequest, raw_request: Request, llm: LLMService = Depends(get_llm_service),
+                               registry: ModelRegistry = Depends(get_model_registry),
+                               scheduler: InferenceScheduler = Depends(get_inference_scheduler),
+                               flags: FeatureFlagManager = Depends(get_feature_flags)):
+    """Stream generated tokens as Server-Sent Events."""
+    if not flags.is_enabled("llm_streaming"):
+        raise HTTPException(status_code=404, detail="Streaming is disabled")
+    if request.json_schema is not None or request.grammar is not None:
+        raise HTTPException(status_code=400, detail="json_schema and grammar are not supported for streaming")
+    try:
+        # Fitting the prompt to the context tokenizes it; do that off the event loop too.
+        tokens = await run_in_threadpool(
+            llm.generate_stream,
             prompt=request.prompt,
             max_tokens=request.max_tokens or 256,
-            temperature=request.temperature or 0.7
-        )
-        return LLMResponse(
-            response=result,
-            model_loaded=llm.is_model_loaded(),
-            tokens_generated=len(result.split()) if result else 0
+            temperature=request.temperature if request.temperature is not None else 0.7,
+            speculative=request.speculative
         )
-    except Exception as ex:
-        raise HTTPException(status_code=500, detail=f"LLM generation failed: {str(ex)}")
+        stream = scheduler.submit_stream(tokens, priority=request.priority, timeout=request.timeout)
+    except QueueFullError as ex:
+        raise HTTPException(status_code=429, detail=str(ex), headers={"Retry-After": "1"})
+    except SchedulerError as ex:
+        raise HTTPException(status_code=503, detail=str(ex))
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    return StreamingResponse(
+        _sse_events(stream, raw_request, registry.resolve(request.model)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Batch jobs queue behind every interactive request.
+BATCH_PRIORITY = 9
+
+async def _batch_lines(records: AsyncIterator[dict], progress: BatchProgress) -> AsyncIterator[str]:
+    async for record in records:
+        yield json.dumps(record) + "\n"
+    yield json.dumps({"summary": progress.summary()}) + "\n"
+
+@router.post("/generate/batch")
+async def generate_batch(raw_request: Request,
+                         model: Optional[str] = Query(default=None, description="Name of a configured model"),
+                         max_tokens: int = Query(default=256, ge=1, le=2048, description="Default max_tokens per prompt"),
+                         temperature: float = Query(default=0.7, ge=0.0, le=2.0, description="Default sampling temperature"),
+                         registry: ModelRegistry = Depends(get_model_registry),
+                         scheduler: InferenceScheduler = Depends(get_inference_scheduler),
+                         batcher: Optional[ContinuousBatcher] = Depends(get_batcher),
+                         cache: Optional[ResponseCache] = Depends(get_response_cache)):
+    """
+    Generate completions for a JSONL body of prompts, streamed back as JSONL
+    in completion order with a final summary line. Identical prompts are
+    generated once and prompts run shortest first at the lowest priority.
+    """
+    try:
+        items = parse_jsonl((await raw_request.body()).splitlines(), max_tokens, temperature)
+        # Loading a model and tokenizing every prompt block; keep them off the event loop.
+        llm = await run_in_threadpool(registry.get, model)
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    if len(items) > settings.LLM_BATCH_MAX_PROMPTS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.LLM_BATCH_MAX_PROMPTS} prompts per request; "
+                                                    "use python -m backend.batch for larger jobs")
+    name = registry.resolve(model)
+    groups = await run_in_threadpool(plan_groups, items, length=llm.count_tokens)
+    progress = BatchProgress(total=len(items))
+    batched = batcher is not None and batcher.llm is llm
+    generate = batcher.generate if batched else llm.generate
+
+    async def submit(group: BatchGroup) -> GenerationResult:
+        cache_key = None
+        if cache is not None and cache.is_cacheable(group.temperature):
+            cache_key = make_cache_key(name, group.prompt, max_tokens=group.max_tokens, temperature=group.temperature)
+            cached = await _cache_get(cache, cache_key)
+            if cached is not None:
+                result = GenerationResult(text=cached["text"], cache="hit",
+                                          tokens_saved=cached["prompt_tokens"] + cached["completion_tokens"],
+                                          prompt_tokens=cached["prompt_tokens"],
+                                          completion_tokens=cached["completion_tokens"])
+                _record_metrics(name, result)
+                return result
+        result = await scheduler.submit(generate, group.prompt, group.max_tokens, group.temperature,
+                                        priority=BATCH_PRIORITY)
+        if cache_key is not None and result.error is None:
+            await _cache_set(cache, cache_key, {"text": result.text, "prompt_tokens": result.prompt_tokens,
+                                  "completion_tokens": result.completion_tokens})
+        _record_metrics(name, result)
+        return result
+
+    # Enough in flight to keep every worker (and batch slot) busy without
+    # filling the queue that interactive requests are admitted through.
+    slots = scheduler.max_workers * (batcher.max_batch_size if batched else 1)
+    concurrency = max(1, min(slots, settings.LLM_MAX_QUEUE_SIZE // 2))
+    records = run_groups_async(groups, submit, concurrency, progress)
+    return StreamingResponse(_batch_lines(records, progress), media_type="application/x-ndjson")
 
 @router.get("/health")
-async def health_check(llm: LLMService = Depends(get_llm_service)):
-    """Check if the LLM service is healthy and model is loaded."""
+async def health_check(registry: ModelRegistry = Depends(get_model_registry)):
+    """Check if the LLM service is healthy and model is loaded. Never loads a model."""
+    llm = registry.peek()
+    model_loaded = llm is not None and llm.is_model_loaded()
     return {
-        "status": "healthy" if llm.is_model_loaded() else "model_not_loaded",
+        "status": "healthy" if model_loaded else "model_not_loaded",
         "model_path": str(settings.LLM_MODEL_PATH),
-        "model_loaded": llm.is_model_loaded()
-    }
\ No newline at end of file
+        "model_loaded": model_loaded,
+        "models": registry.status()
+    }
+
+@router.get("/queue")
+async def queue_stats(scheduler: InferenceScheduler = Depends(get_inference_scheduler)):
+    """Inference queue depth, counters and wait-time metrics."""
+    return scheduler.stats()
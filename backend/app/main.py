@@ -1,14 +1,160 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
 from backend.app.api_router import api_router
+from backend.app.responses import (CompressionMiddleware, ConditionalGetMiddleware, ORJSONResponse, brotli_available,
+                                   orjson_available)
+from backend.feature_flags.manager import FeatureFlagManager
+from backend.services.batching import ContinuousBatcher
+from backend.services.inference_scheduler import InferenceScheduler
+from backend.services.llm_cache import ResponseCache
+from backend.services.model_registry import ModelRegistry
+from backend.settings import settings
+from backend.telemetry.metrics import REGISTRY
+from backend.telemetry.profiler import ProfilerMiddleware, SlowRequestProfiler
+from backend.telemetry.tracing import TRACER, Tracer, TracingMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load configured models once at startup and share them across requests.
+    With LLM_BACKGROUND_LOAD the server accepts connections while the models
+    load, and /ready reports 503 until they have.
+    """
+    TRACER.configure(settings.TRACING_ENABLED, Tracer.exporter_from_settings(settings), settings.TRACING_SAMPLE_RATE)
+    profiler = getattr(app.state, "profiler", None)
+    if profiler is not None:
+        profiler.start()
+    feature_flags = FeatureFlagManager(settings.FEATURE_FLAGS_PATH)
+    if settings.FEATURE_FLAGS_RELOAD_S:
+        feature_flags.start_watching(settings.FEATURE_FLAGS_RELOAD_S)
+    app.state.feature_flags = feature_flags
+    registry = ModelRegistry.from_settings(settings)
+    # Models run on LLM_N_THREADS cores, all of them by default (LLMService's default).
+    scheduler = InferenceScheduler.from_settings(settings, n_threads=settings.LLM_N_THREADS or os.cpu_count() or 1)
+    if settings.LLM_MAX_BATCH_SIZE > 1:
+        # Batched requests block a worker on the batcher's future, not on the model, so a
+        # batch only fills with as many workers as slots.
+        scheduler.max_workers = max(scheduler.max_workers, settings.LLM_MAX_BATCH_SIZE)
+    scheduler.start()
+    REGISTRY.gauge("llm_queue_depth", "Requests waiting for an inference worker", lambda: scheduler.stats()["queue_depth"])
+    REGISTRY.gauge("llm_inference_active", "Requests currently running inference", lambda: scheduler.active)
+    REGISTRY.gauge("llm_resident_model_bytes", "Size of resident models", registry.resident_bytes)
+    app.state.model_registry = registry
+    app.state.inference_scheduler = scheduler
+    app.state.batcher = None
+    app.state.response_cache = ResponseCache.from_settings(settings) if settings.LLM_RESPONSE_CACHE_SIZE else None
+    app.state.ready = False
+
+    async def warm_up():
+        await run_in_threadpool(registry.preload)
+        llm = await run_in_threadpool(registry.get) if settings.LLM_MAX_BATCH_SIZE > 1 else None
+        if llm is not None and llm.max_batch_sequences > 1:
+            batcher = ContinuousBatcher(llm, settings.LLM_MAX_BATCH_SIZE, settings.LLM_BATCH_WINDOW_MS)
+            batcher.start()
+            app.state.batcher = batcher
+        elif llm is not None:
+            print("Warning: llama-cpp-python has no multi-sequence batch API. Continuous batching is disabled.")
+        app.state.ready = True
+
+    async def warm_up_in_background():
+        try:
+            await warm_up()
+        except Exception as e:
+            print(f"Error loading models: {e}")
+
+    warm_up_task = None
+    if settings.LLM_BACKGROUND_LOAD:
+        warm_up_task = asyncio.create_task(warm_up_in_background())
+    else:
+        await warm_up()
+    try:
+        yield
+    finally:
+        if warm_up_task is not None:
+            # A load already running in the threadpool finishes before the task ends.
+            await warm_up_task
+        await scheduler.stop()
+        if app.state.batcher is not None:
+            app.state.batcher.stop()
+        registry.clear()
+        feature_flags.stop_watching()
+        if profiler is not None:
+            profiler.stop()
+        TRACER.shutdown()
+
+async def live() -> dict:
+    """Liveness: the process is up and serving the event loop."""
+    return {"status": "alive"}
+
+async def ready(request: Request) -> JSONResponse:
+    """Readiness: models are loaded and the inference queue is accepting work."""
+    state = request.app.state
+    if getattr(state, "ready", False) and state.inference_scheduler.running:
+        return JSONResponse({"status": "ready"})
+    return JSONResponse({"status": "loading"}, status_code=503)
+
+async def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+async def list_profiles(request: Request) -> dict:
+    """The slowest requests profiled so far, slowest first."""
+    profiles = request.app.state.profiler.profiles()
+    return {"profiles": [dict(profile.summary(), rank=rank) for rank, profile in enumerate(profiles)]}
+
+async def get_profile(request: Request, rank: int) -> PlainTextResponse:
+    """Collapsed stacks of the ``rank``-th slowest request, for flamegraph.pl or speedscope."""
+    profiles = request.app.state.profiler.profiles()
+    if not 0 <= rank < len(profiles):
+        return PlainTextResponse("No such profile", status_code=404)
+    return PlainTextResponse(profiles[rank].collapsed())
+
+# Reads whose bodies often repeat between polls; API_ETAGS answers them with 304s.
+CACHEABLE_PATHS = ("/llm/health", "/llm/queue", "/openapi.json", "/debug/profiles")
 
 def get_application() -> FastAPI:
+    response_class = JSONResponse
+    if settings.API_ORJSON:
+        if orjson_available():
+            response_class = ORJSONResponse
+        else:
+            print("Warning: API_ORJSON is set but orjson is not installed. Using the standard JSON encoder.")
     app = FastAPI(
         title="Code Morningstar API",
         version="1.0.0",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        default_response_class=response_class,
+        lifespan=lifespan
     )
     app.include_router(api_router)
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+    app.add_api_route("/live", live, methods=["GET"], include_in_schema=False)
+    app.add_api_route("/ready", ready, methods=["GET"], include_in_schema=False)
+    if settings.TRACING_ENABLED:
+        app.add_middleware(TracingMiddleware)
+    if settings.PROFILER_SLOWEST_N:
+        app.state.profiler = SlowRequestProfiler.from_settings(settings)
+        app.add_middleware(ProfilerMiddleware, profiler=app.state.profiler)
+        app.add_api_route("/debug/profiles", list_profiles, methods=["GET"], include_in_schema=False)
+        app.add_api_route("/debug/profiles/{rank}", get_profile, methods=["GET"], include_in_schema=False)
+    # Added last so they wrap the rest: ETags hash the uncompressed body, then it is compressed.
+    if settings.API_ETAGS:
+        app.add_middleware(ConditionalGetMiddleware, paths=CACHEABLE_PATHS)
+    if settings.API_COMPRESSION != "none":
+        if settings.API_COMPRESSION == "brotli" and not brotli_available():
+            print("Warning: API_COMPRESSION=brotli but brotli is not installed. Using gzip.")
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.API_COMPRESSION_MIN_BYTES,
+            gzip_level=settings.API_GZIP_LEVEL,
+            brotli_quality=settings.API_BROTLI_QUALITY,
+            brotli=settings.API_COMPRESSION == "brotli"
+        )
     return app
 
-app = get_application()
\ No newline at end of file
+app = get_application()
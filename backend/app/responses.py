@@ -0,0 +1,223 @@
+"""
+Code Morningstar - Response Encoding
+The opt-in response stack: orjson serialization, gzip/Brotli compression of
+responses above a size threshold (streamed ones included, flushed per chunk),
+and ETags with conditional GET for cacheable reads. The middlewares are pure
+ASGI so they do not buffer streaming responses they leave alone.
+"""
+import hashlib
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+Headers = List[Tuple[bytes, bytes]]
+
+# Compressing these would delay every event until a proxy or buffer fills.
+UNCOMPRESSED_TYPES = (b"text/event-stream", b"image/", b"audio/", b"video/", b"application/gzip", b"application/zip")
+
+class ORJSONResponse(JSONResponse):
+    """JSON rendered by orjson: several times faster than the stdlib for large bodies."""
+    def render(self, content: Any) -> bytes:
+        import orjson
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def orjson_available() -> bool:
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def brotli_available() -> bool:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _header(headers: Headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+def _without(headers: Headers, *names: bytes) -> Headers:
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Codings from an Accept-Encoding header, minus those refused with q=0."""
+    codings = []
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip() and quality > 0:
+            codings.append(coding.strip().lower())
+    return codings
+
+class _Encoder:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            import brotli
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            # wbits 31: a gzip container rather than a raw zlib stream.
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress ``data`` and flush it, so the client can decode it before the next chunk."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._gzip.compress(data) + self._gzip.flush()
+
+class CompressionMiddleware:
+    """
+    gzip or Brotli (``br``, preferred when the client accepts it and
+    ``brotli`` is installed) for responses of at least ``minimum_size``
+    bytes. Streamed responses are compressed chunk by chunk with a flush
+    after each, so NDJSON lines still reach the client as they are produced.
+    """
+    def __init__(self, app: Callable[..., Awaitable[None]], minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4, brotli: bool = True):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli = brotli and brotli_available()
+
+    def _choose(self, scope: Dict[str, Any]) -> Optional[str]:
+        accept = _header(scope.get("headers", []), b"accept-encoding")
+        if accept is None:
+            return None
+        codings = accepted_encodings(accept.decode("latin-1"))
+        if self.brotli and "br" in codings:
+            return "br"
+        if "gzip" in codings:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        encoding = self._choose(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Dict[str, Any]] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message: Dict[str, Any]) -> None:
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                headers = message.get("headers", [])
+                content_type = _header(headers, b"content-type") or b""
+                passthrough = (_header(headers, b"content-encoding") is not None
+                               or content_type.startswith(UNCOMPRESSED_TYPES))
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if start is not None:
+                headers = list(start.get("headers", []))
+                if not more and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                headers = _without(headers, b"content-length")
+                headers += [(b"content-encoding", encoding.encode()), (b"vary", b"Accept-Encoding")]
+                if not more:
+                    body = encoder.finish(body)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send(dict(start, headers=headers))
+                    start = None
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(dict(start, headers=headers))
+                start = None
+            body = encoder.chunk(body) if more else encoder.finish(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more})
+
+        await self.app(scope, receive, send_compressed)
+
+def make_etag(body: bytes) -> bytes:
+    """A weak validator: the same JSON compresses differently per coding, so byte equality isn't promised."""
+    return b'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest().encode() + b'"'
+
+def etag_matches(if_none_match: bytes, etag: bytes) -> bool:
+    """Weak comparison, as If-None-Match uses: W/"x" and "x" match each other."""
+    opaque = etag[2:] if etag.startswith(b"W/") else etag
+    for candidate in if_none_match.split(b","):
+        candidate = candidate.strip()
+        if candidate == b"*" or (candidate[2:] if candidate.startswith(b"W/") else candidate) == opaque:
+            return True
+    return False
+
+class ConditionalGetMiddleware:
+    """
+    ETags for GET requests to ``paths``: the body is hashed, and a request whose
+    If-None-Match carries the same tag gets a bodyless 304. The response is
+    still computed; what is saved is serialization-to-wire, compression and
+    transfer. ``Cache-Control: no-cache`` makes clients revalidate every time.
+    """
+    def __init__(self, app: Callable[..., Awaitable[None]], paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        if_none_match = _header(scope.get("headers", []), b"if-none-match")
+        start: Optional[Dict[str, Any]] = None
+        chunks: List[bytes] = []
+
+        async def send_tagged(message: Dict[str, Any]) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            headers = list(start.get("headers", []))
+            if start["status"] != 200 or _header(headers, b"etag") is not None:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+                return
+            etag = make_etag(body)
+            headers += [(b"etag", etag), (b"cache-control", b"no-cache")]
+            if if_none_match is not None and etag_matches(if_none_match, etag):
+                headers = _without(headers, b"content-length", b"content-type")
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(dict(start, headers=headers))
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_tagged)
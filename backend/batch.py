@@ -0,0 +1,99 @@
+"""
+Code Morningstar - Batch Generation
+Runs a JSONL file of prompts through the local model without the HTTP API:
+identical prompts are generated once, prompts are ordered by length, and
+results are appended to the output JSONL as they finish, so an interrupted
+run resumes where it stopped.
+
+    python -m backend.batch prompts.jsonl -o results.jsonl
+    python -m backend.batch prompts.jsonl -o results.jsonl --batch-size 8 --max-tokens 128
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate completions for a JSONL file of prompts")
+    parser.add_argument("input", help="JSONL prompts ('prompt' or 'title'/'body', optional 'id'); - for stdin")
+    parser.add_argument("-o", "--output", required=True, help="Output JSONL; existing results are kept and skipped")
+    parser.add_argument("--restart", action="store_true", help="Discard existing results instead of resuming")
+    parser.add_argument("--model", default=None, help="Configured model name (default: LLM_DEFAULT_MODEL)")
+    parser.add_argument("--max-tokens", type=int, default=256, help="Default max_tokens per prompt")
+    parser.add_argument("--temperature", type=float, default=0.7, help="Default sampling temperature")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Sequences decoded together (default: LLM_MAX_BATCH_SIZE; 1 = one at a time)")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="Seconds between progress lines on stderr")
+    parser.add_argument("--sync-every", type=int, default=100, help="fsync the output every N results")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    from backend.services.batch_jobs import BatchProgress, load_checkpoint, parse_jsonl, plan_groups, run_groups
+    from backend.services.batching import ContinuousBatcher
+    from backend.services.model_registry import ModelRegistry
+    from backend.settings import settings
+
+    if args.input == "-":
+        items = parse_jsonl(sys.stdin, args.max_tokens, args.temperature)
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            items = parse_jsonl(f, args.max_tokens, args.temperature)
+    output = Path(args.output)
+    if args.restart and output.exists():
+        output.unlink()
+    done = load_checkpoint(output)
+
+    llm = ModelRegistry.from_settings(settings).get(args.model)
+    groups = plan_groups(items, done, length=llm.count_tokens)
+    progress = BatchProgress(total=sum(len(group.ids) for group in groups), skipped=len(done))
+    print(f"{len(items)} prompts, {len(done)} already done, {len(groups)} distinct to generate", file=sys.stderr)
+
+    batch_size = args.batch_size or settings.LLM_MAX_BATCH_SIZE
+    batcher = executor = None
+    if batch_size > 1:
+        batcher = ContinuousBatcher(llm, max_batch_size=batch_size, batch_window_ms=settings.LLM_BATCH_WINDOW_MS)
+        batcher.start()
+        submit = lambda group: batcher.submit(group.prompt, group.max_tokens, group.temperature)
+    else:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch")
+        submit = lambda group: executor.submit(llm.generate, group.prompt, group.max_tokens, group.temperature)
+
+    last_report = time.monotonic()
+    written = 0
+    try:
+        # Twice the batch size in flight keeps the batcher's queue from running dry.
+        # Closing the records cancels whatever is still queued if the run is interrupted.
+        records = run_groups(groups, submit, concurrency=max(2, 2 * batch_size), progress=progress)
+        with output.open("a", encoding="utf-8") as out, closing(records):
+            for record in records:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                written += 1
+                if written % args.sync_every == 0:
+                    os.fsync(out.fileno())
+                if time.monotonic() - last_report >= args.progress_every:
+                    print(progress.line(), file=sys.stderr)
+                    last_report = time.monotonic()
+            os.fsync(out.fileno())
+    except KeyboardInterrupt:
+        print(f"Interrupted; rerun the same command to resume ({progress.line()})", file=sys.stderr)
+        return 130
+    finally:
+        if batcher is not None:
+            batcher.stop()
+        if executor is not None:
+            executor.shutdown(wait=False)
+    print(json.dumps(progress.summary()), file=sys.stderr)
+    return 1 if progress.failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
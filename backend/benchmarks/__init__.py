@@ -0,0 +1 @@
+# Marker for benchmarks package.
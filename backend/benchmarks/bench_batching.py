@@ -0,0 +1,79 @@
+"""
+Code Morningstar - Batching Benchmark
+Compares sequential and continuously batched generation throughput (tokens/s).
+With --model the GGUF runs both ways for real: batched, every step is one
+llama_decode over all active sequences. The mock backend only replays a cost
+model - a step of n sequences costs the per-token delay times
+1 + mock_batch_cost * (n - 1) - so its numbers show the batcher's overhead
+and scheduling, not a measured speedup.
+
+    python -m backend.benchmarks.bench_batching
+    python -m backend.benchmarks.bench_batching --model models/tiny.gguf
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.batching import ContinuousBatcher
+from backend.services.llm_service import LLMService
+
+def make_prompts(count: int):
+    return [f"Write a Python function number {i} that reverses a linked list" for i in range(count)]
+
+def run_sequential(llm: LLMService, prompts, max_tokens: int) -> int:
+    tokens = 0
+    for prompt in prompts:
+        tokens += sum(1 for _ in llm.generate_stream(prompt, max_tokens=max_tokens, temperature=0.0))
+    return tokens
+
+def run_batched(llm: LLMService, prompts, max_tokens: int, batch_size: int, window_ms: float) -> int:
+    batcher = ContinuousBatcher(llm, max_batch_size=batch_size, batch_window_ms=window_ms)
+    batcher.start()
+    try:
+        # Submit from many threads, as concurrent HTTP requests would.
+        with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+            list(pool.map(lambda p: batcher.generate(p, max_tokens=max_tokens, temperature=0.0), prompts))
+        return batcher.tokens_generated
+    finally:
+        batcher.stop()
+
+def measure(label: str, fn) -> None:
+    start = time.perf_counter()
+    tokens = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {tokens:>8} tokens {elapsed:>8.3f}s {tokens / elapsed:>10.1f} tokens/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs batched generation throughput")
+    parser.add_argument("--prompts", type=int, default=32, help="Number of concurrent prompts")
+    parser.add_argument("--batch-size", type=int, default=8, help="Maximum sequences per decode step")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="Batch collection window")
+    parser.add_argument("--max-tokens", type=int, default=32, help="Tokens per completion")
+    parser.add_argument("--mock-delay-ms", type=float, default=2.0, help="Simulated per-token decode latency in mock mode")
+    parser.add_argument("--mock-batch-cost", type=float, default=1.0,
+                        help="Cost of each extra sequence in a mock step, as a fraction of one token (1.0 = no gain)")
+    parser.add_argument("--model", default=os.environ.get("BENCH_GGUF_MODEL"), help="Tiny GGUF model to benchmark as well")
+    args = parser.parse_args()
+
+    prompts = make_prompts(args.prompts)
+    backends = [("mock", LLMService("/nonexistent/model.gguf", mock_token_delay=args.mock_delay_ms / 1000.0,
+                                    mock_batch_cost=args.mock_batch_cost))]
+    if args.model and Path(args.model).exists():
+        llm = LLMService(args.model, batch_slots=args.batch_size)
+        if llm.is_model_loaded():
+            backends.append((Path(args.model).name, llm))
+
+    for name, llm in backends:
+        label = f"mock_batch_cost={args.mock_batch_cost}" if name == "mock" else "llama_decode per step"
+        print(f"\n== {name} (batch slots: {min(args.batch_size, llm.max_batch_sequences)}, {label})")
+        measure("sequential", lambda: run_sequential(llm, prompts, args.max_tokens))
+        measure("continuous batching", lambda: run_batched(llm, prompts, args.max_tokens, args.batch_size, args.window_ms))
+
+if __name__ == "__main__":
+    main()
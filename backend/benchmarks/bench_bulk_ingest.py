@@ -0,0 +1,81 @@
+"""
+Code Morningstar - Bulk Ingestion Benchmark
+Streams generated documents through ElasticsearchService.bulk_index and
+MongoService.insert_many against in-process fake backends, reporting
+documents/s, round-trips and peak Python memory. Peak memory should stay
+flat as the document count grows.
+
+    python -m backend.benchmarks.bench_bulk_ingest --docs 10000 100000
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from pathlib import Path
+
+from elastic_transport import ApiResponseMeta, BaseNode, HttpHeaders
+from elasticsearch import Elasticsearch
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.elasticsearch_service import ElasticsearchService
+from backend.services.mongo_service import MongoService
+
+NodeResponse = namedtuple("NodeResponse", ["meta", "body"])
+
+class FakeNode(BaseNode):
+    """Acknowledges every bulk item without storing it."""
+    requests = 0
+
+    def perform_request(self, method, target, body=None, headers=None, request_timeout=None):
+        FakeNode.requests += 1
+        items = [{"index": {"status": 201}}] * (body.count(b"\n") // 2)
+        headers = HttpHeaders({"x-elastic-product": "Elasticsearch", "content-type": "application/json"})
+        data = json.dumps({"took": 1, "errors": False, "items": items}).encode()
+        return NodeResponse(ApiResponseMeta(200, "1.1", headers, 0.0, self.config), data)
+
+class FakeCollection:
+    requests = 0
+
+    def insert_many(self, documents, ordered=True):
+        FakeCollection.requests += 1
+        return type("InsertManyResult", (), {"inserted_ids": [None] * len(documents)})()
+
+class FakeMongoClient(dict):
+    def __missing__(self, name):
+        return {"docs": FakeCollection()}
+
+def documents(count: int):
+    for i in range(count):
+        yield {"id": i, "title": f"document {i}", "body": "lorem ipsum " * 20}
+
+def measure(label: str, count: int, fn, requests) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    before = requests()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {count:>9} docs {elapsed:>8.3f}s {count / elapsed:>10.0f} docs/s "
+          f"{requests() - before:>6} requests {peak / 1024:>8.0f} KiB peak")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingestion throughput and memory")
+    parser.add_argument("--docs", type=int, nargs="+", default=[10_000, 50_000], help="Document counts")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Documents per request")
+    args = parser.parse_args()
+
+    es = ElasticsearchService("fake", 0, client=Elasticsearch("http://localhost:9200", node_class=FakeNode))
+    mongo = MongoService("mongodb://fake", client=FakeMongoClient())
+    for count in args.docs:
+        measure("es bulk_index", count, lambda: es.bulk_index("docs", documents(count), chunk_size=args.chunk_size),
+                lambda: FakeNode.requests)
+        measure("mongo insert_many", count, lambda: mongo.insert_many("bench", "docs", documents(count), batch_size=args.chunk_size),
+                lambda: FakeCollection.requests)
+
+if __name__ == "__main__":
+    main()
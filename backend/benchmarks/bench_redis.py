@@ -0,0 +1,73 @@
+"""
+Code Morningstar - Redis Access Benchmark
+Reports ops/s for single-key calls, mget/mset, pipelines and near-cached
+reads through RedisService. Runs against an in-process fakeredis server by
+default (pip install fakeredis), or a real server with --host.
+
+    python -m backend.benchmarks.bench_redis --keys 2000
+    python -m backend.benchmarks.bench_redis --host localhost --port 6379
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.redis_service import RedisService
+
+def rate(label: str, count: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count:>8} ops {elapsed:>8.3f}s {count / elapsed:>12.0f} ops/s")
+
+def make_service(args, near_cache_size: int = 0) -> RedisService:
+    if args.host:
+        return RedisService(args.host, args.port, near_cache_size=near_cache_size)
+    try:
+        import fakeredis
+    except ImportError:
+        sys.exit("fakeredis is not installed; pass --host to benchmark a real server.")
+    if not hasattr(args, "server"):
+        args.server = fakeredis.FakeServer()
+    return RedisService("fake", 0, near_cache_size=near_cache_size,
+                        client=fakeredis.FakeRedis(server=args.server))
+
+def main():
+    parser = argparse.ArgumentParser(description="RedisService throughput")
+    parser.add_argument("--keys", type=int, default=2000, help="Keys per phase")
+    parser.add_argument("--reads", type=int, default=5, help="Read passes over the keys")
+    parser.add_argument("--host", default=None, help="Redis host (default: in-process fakeredis)")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    keys = [f"bench:{i}" for i in range(args.keys)]
+    mapping = {key: str(i) for i, key in enumerate(keys)}
+    reads = args.keys * args.reads
+
+    service = make_service(args)
+    try:
+        rate("set (one per call)", args.keys, lambda: [service.set(key, value) for key, value in mapping.items()])
+        rate("mset", args.keys, lambda: service.mset(mapping))
+
+        def pipelined_set():
+            with service.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, value)
+        rate("pipelined set", args.keys, pipelined_set)
+        rate("get (one per call)", reads, lambda: [service.get(key) for _ in range(args.reads) for key in keys])
+        rate("mget", reads, lambda: [service.mget(keys) for _ in range(args.reads)])
+    finally:
+        service.close()
+
+    cached = make_service(args, near_cache_size=args.keys)
+    try:
+        rate("get (near-cached)", reads, lambda: [cached.get(key) for _ in range(args.reads) for key in keys])
+        print(f"near-cache: {cached.near_cache.stats()}")
+    finally:
+        cached.close()
+
+if __name__ == "__main__":
+    main()
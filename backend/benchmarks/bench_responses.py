@@ -0,0 +1,131 @@
+"""
+Code Morningstar - Response Encoding Benchmark
+Serialization time (stdlib json as JSONResponse renders it, orjson, Pydantic)
+and wire size (identity, gzip, Brotli) for a batch-results payload and a page
+of users with posts, then the same responses end to end through the app with
+the response stack off and on.
+
+    python -m backend.benchmarks.bench_responses
+    python -m backend.benchmarks.bench_responses --records 5000 --repeat 50
+"""
+import argparse
+import sys
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from backend.app.main import get_application
+from backend.app.responses import ORJSONResponse, brotli_available
+from backend.db.model import UserWithPosts
+from backend.settings import settings
+
+def batch_payload(records: int) -> dict:
+    return {"results": [{
+        "id": f"request-{i}",
+        "response": "def fibonacci(n):\n    return n if n < 2 else fibonacci(n - 1) + fibonacci(n - 2)\n" * 3,
+        "prompt_tokens": 40 + i % 60,
+        "completion_tokens": 120,
+        "total_ms": 812.4 + i,
+        "cache": "miss",
+        "error": None,
+    } for i in range(records)]}
+
+def users_payload(users: int, posts: int) -> List[dict]:
+    now = datetime(2026, 1, 1)
+    return [{
+        "id": u, "username": f"user{u}", "email": f"user{u}@example.com", "is_active": True,
+        "created_at": now, "updated_at": now,
+        "posts": [{"id": u * posts + p, "title": f"post {p}", "body": "lorem ipsum " * 20,
+                   "created_at": now, "author_id": u} for p in range(posts)],
+    } for u in range(users)]
+
+def best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def report_serialization(label: str, content, repeat: int, adapter: TypeAdapter = None) -> bytes:
+    print(label)
+    timings = []
+    if adapter is None:
+        timings.append(("json (JSONResponse)", best_ms(lambda: JSONResponse(content), repeat)))
+        timings.append(("orjson (ORJSONResponse)", best_ms(lambda: ORJSONResponse(content), repeat)))
+        body = JSONResponse(content).body
+    else:
+        # Models are dumped to plain data first, as FastAPI does for a custom response class.
+        items = adapter.validate_python(content)
+        timings.append(("dump_python + json", best_ms(lambda: JSONResponse(adapter.dump_python(items, mode="json")), repeat)))
+        timings.append(("dump_python + orjson", best_ms(lambda: ORJSONResponse(adapter.dump_python(items, mode="json")), repeat)))
+        timings.append(("pydantic dump_json", best_ms(lambda: adapter.dump_json(items), repeat)))
+        body = adapter.dump_json(items)
+    for name, ms in timings:
+        print(f"  {name:<28} {ms:>8.2f} ms")
+    return body
+
+def report_sizes(body: bytes, repeat: int) -> None:
+    codings = [("identity", lambda: body), ("gzip level 6", lambda: _gzip(body, 6)), ("gzip level 9", lambda: _gzip(body, 9))]
+    if brotli_available():
+        import brotli
+        codings += [(f"brotli quality {q}", lambda q=q: brotli.compress(body, quality=q)) for q in (4, 9)]
+    for name, encode in codings:
+        size = len(encode())
+        ms = best_ms(encode, max(1, repeat // 5)) if name != "identity" else 0.0
+        print(f"  {name:<28} {size:>10,} bytes {size / len(body):>6.1%} {ms:>8.2f} ms")
+
+def _gzip(body: bytes, level: int) -> bytes:
+    encoder = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return encoder.compress(body) + encoder.flush()
+
+def end_to_end(requests: int, stack: bool) -> None:
+    settings.API_ORJSON = stack
+    settings.API_COMPRESSION = "brotli" if stack else "none"
+    settings.API_ETAGS = stack
+    with TestClient(get_application()) as client:
+        headers = {"Accept-Encoding": "br, gzip"}
+        first = client.get("/openapi.json", headers=headers)
+        wire = int(first.headers.get("content-length", len(first.content)))
+        etag = first.headers.get("etag")
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get("/openapi.json", headers=headers)
+        full = (time.perf_counter() - start) / requests * 1000
+        line = f"  {'on' if stack else 'off':<4} /openapi.json {wire:>8,} bytes on the wire, {full:.2f} ms"
+        if etag:
+            start = time.perf_counter()
+            for _ in range(requests):
+                client.get("/openapi.json", headers=dict(headers, **{"If-None-Match": etag}))
+            line += f", {(time.perf_counter() - start) / requests * 1000:.2f} ms revalidated (304)"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON serialization and compression benchmark")
+    parser.add_argument("--records", type=int, default=1000, help="Records in the batch payload")
+    parser.add_argument("--users", type=int, default=100, help="Users in the users-with-posts page")
+    parser.add_argument("--posts-per-user", type=int, default=10, help="Posts per user")
+    parser.add_argument("--repeat", type=int, default=20, help="Timing repetitions (best is reported)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per end-to-end run")
+    args = parser.parse_args()
+
+    body = report_serialization(f"batch results: {args.records} records", batch_payload(args.records), args.repeat)
+    report_sizes(body, args.repeat)
+    body = report_serialization(f"users with posts: {args.users} x {args.posts_per_user}",
+                                users_payload(args.users, args.posts_per_user), args.repeat,
+                                TypeAdapter(List[UserWithPosts]))
+    report_sizes(body, args.repeat)
+    print("end to end (response stack off / on)")
+    end_to_end(args.requests, stack=False)
+    end_to_end(args.requests, stack=True)
+
+if __name__ == "__main__":
+    main()
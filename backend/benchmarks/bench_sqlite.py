@@ -0,0 +1,70 @@
+"""
+Code Morningstar - SQLite Benchmark
+Compares inserts/s and reads/s of the pooled SQLiteService against the
+previous connect-per-call implementation.
+
+    python -m backend.benchmarks.bench_sqlite --rows 5000
+"""
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.sqlite_service import SQLiteService
+
+class LegacySQLiteService:
+    """The original implementation: a new connection and a commit per statement."""
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def execute(self, query: str, params: tuple = ()) -> Any:
+        with sqlite3.connect(self.db_path) as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            result = cur.fetchall() if cur.description else None
+            conn.commit()
+            return result
+
+SCHEMA = "CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name TEXT, value INTEGER)"
+
+def rate(label: str, count: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {count:>8} ops {elapsed:>8.3f}s {count / elapsed:>12.0f} ops/s")
+
+def run(name: str, service, rows: int, bulk: bool) -> None:
+    print(f"\n== {name}")
+    service.execute(SCHEMA)
+    rate("insert (one statement per call)", rows, lambda: [
+        service.execute("INSERT INTO items (name, value) VALUES (?, ?)", (f"item{i}", i)) for i in range(rows)
+    ])
+    if bulk:
+        rate("bulk_insert", rows * 10, lambda: service.bulk_insert(
+            "items", ["name", "value"], ((f"bulk{i}", i) for i in range(rows * 10))
+        ))
+    rate("point read", rows, lambda: [
+        service.execute("SELECT name, value FROM items WHERE id = ?", (i + 1,)) for i in range(rows)
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLiteService throughput")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per phase")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run("legacy (connect per call)", LegacySQLiteService(str(Path(tmp) / "legacy.db")), args.rows, bulk=False)
+        service = SQLiteService(str(Path(tmp) / "pooled.db"))
+        try:
+            run("pooled (WAL, cached statements)", service, args.rows, bulk=True)
+        finally:
+            service.close()
+
+if __name__ == "__main__":
+    main()
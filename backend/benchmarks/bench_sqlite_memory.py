@@ -0,0 +1,62 @@
+"""
+Code Morningstar - Result Streaming Memory Benchmark
+Compares peak Python memory of materializing a result set with
+SQLiteService.execute() against streaming it with iterate() and with
+keyset pages.
+
+    python -m backend.benchmarks.bench_sqlite_memory --sizes 10000 100000
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.pagination import iter_keyset_pages
+from backend.services.sqlite_service import SQLiteService
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of execute() vs iterate()")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Result sizes to test")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per fetch / page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = SQLiteService(str(Path(tmp) / "memory.db"))
+        try:
+            service.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, payload TEXT)")
+            loaded = 0
+            print(f"{'rows':>10} {'method':<10} {'seconds':>9} {'peak KiB':>10}")
+            for size in sorted(args.sizes):
+                service.bulk_insert("items", ["name", "payload"],
+                                    ((f"item{i}", "x" * 64) for i in range(loaded, size)))
+                loaded = max(loaded, size)
+                query = f"SELECT id, name, payload FROM items WHERE id <= {size}"
+                methods = {
+                    "execute": lambda: len(service.execute(query)),
+                    "iterate": lambda: sum(1 for _ in service.iterate(query, batch_size=args.batch_size)),
+                    "keyset": lambda: sum(len(page) for page in iter_keyset_pages(
+                        service, "items", ["id", "name", "payload"], page_size=args.batch_size,
+                        where="id <= ?", params=(size,))),
+                }
+                for name, fn in methods.items():
+                    count, elapsed, peak = measure(fn)
+                    print(f"{count:>10} {name:<10} {elapsed:>9.3f} {peak / 1024:>10.0f}")
+        finally:
+            service.close()
+
+if __name__ == "__main__":
+    main()
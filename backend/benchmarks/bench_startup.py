@@ -0,0 +1,98 @@
+"""
+Code Morningstar - Startup Benchmark
+Measures how long importing the app takes (via ``python -X importtime``) and,
+with --serve, how long a fresh server takes to answer /live and /ready.
+
+    python -m backend.benchmarks.bench_startup --top 15
+    python -m backend.benchmarks.bench_startup --serve --background-load
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+def import_profile(module: str):
+    """Return (total_us, [(cumulative_us, self_us, name)]) for importing ``module`` in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((int(match.group(2)), int(match.group(1)), match.group(4)))
+    total = sum(self_us for _, self_us, _ in rows)
+    return total, rows
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for(url: str, deadline: float) -> float:
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.monotonic()
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} not ready")
+
+def time_to_ready(background_load: bool, timeout: float):
+    port = free_port()
+    env = dict(os.environ, LLM_BACKGROUND_LOAD=str(background_load).lower())
+    start = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=project_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        live = wait_for(f"http://127.0.0.1:{port}/live", start + timeout) - start
+        ready = wait_for(f"http://127.0.0.1:{port}/ready", start + timeout) - start
+    finally:
+        server.terminate()
+        server.wait()
+    return live, ready
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and time-to-ready benchmark")
+    parser.add_argument("--module", default="backend.app.main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to average over")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    parser.add_argument("--serve", action="store_true", help="Also time a uvicorn server to /live and /ready")
+    parser.add_argument("--background-load", action="store_true", help="Start the server with LLM_BACKGROUND_LOAD")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for /ready")
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        total, rows = import_profile(args.module)
+        totals.append(total)
+    print(f"import {args.module}: median {statistics.median(totals) / 1000:.1f} ms over {args.runs} runs")
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    if args.serve:
+        live, ready = time_to_ready(args.background_load, args.timeout)
+        mode = "background" if args.background_load else "blocking"
+        print(f"\nserver ({mode} model load): /live after {live:.2f}s, /ready after {ready:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Code Morningstar - Multi-Worker Load Test
+Starts the production server with 1, 2, 4, ... workers and drives
+/llm/generate with concurrent keep-alive clients, reporting requests/s and
+latency percentiles for each worker count.
+
+    python -m backend.benchmarks.bench_workers --workers 1 2 4 --concurrency 32 --duration 10
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.benchmarks.bench_startup import free_port, wait_for
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def drive(port: int, concurrency: int, duration: float, body: bytes):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        local, failed = [], 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                conn.request("POST", "/llm/generate", body, {"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                continue
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), sum(errors)
+
+def run(workers: int, args) -> None:
+    port = free_port()
+    env = dict(os.environ, API_PORT=str(port), API_HOST="127.0.0.1", LLM_RESPONSE_CACHE_SIZE="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "backend.start", "--production", "--workers", str(workers)],
+        cwd=project_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + args.timeout
+        # Each probe may land on a different worker; wait until a run of them succeeds.
+        for _ in range(workers * 4):
+            wait_for(f"http://127.0.0.1:{port}/ready", deadline)
+        body = json.dumps({"prompt": args.prompt, "max_tokens": args.max_tokens}).encode()
+        latencies, errors = drive(port, args.concurrency, args.duration, body)
+    finally:
+        server.terminate()
+        server.wait()
+    print(f"{workers:>8} {len(latencies) / args.duration:>10.1f} {percentile(latencies, 0.5) * 1000:>9.1f} "
+          f"{percentile(latencies, 0.99) * 1000:>9.1f} {errors:>7}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/s by worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to compare")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per worker count")
+    parser.add_argument("--prompt", default="Write a Python function that reverses a string")
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for the server to be ready")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for workers in args.workers:
+        run(workers, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Code Morningstar - Load Test
+Drives POST /llm/generate at a fixed concurrency and reports latency
+percentiles and throughput. Without --url the app runs in-process (mock
+LLMService when no model file is present), so the numbers measure the API,
+scheduler and batching overhead rather than llama.cpp.
+
+    python -m backend.benchmarks.load_test --concurrency 32 --requests 2000
+    python -m backend.benchmarks.load_test --save-baseline backend/benchmarks/baselines/load_test.json
+    python -m backend.benchmarks.load_test --baseline backend/benchmarks/baselines/load_test.json --max-regression 20
+    python -m backend.benchmarks.load_test --url http://127.0.0.1:8000 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+# Metrics where a larger value is better; every other metric regresses upward.
+HIGHER_IS_BETTER = {"rps"}
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``; 0.0 when there are none."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """Latencies are in seconds; the summary reports milliseconds and requests per second."""
+    completed = len(latencies)
+    return {
+        "requests": completed + errors,
+        "errors": errors,
+        "rps": completed / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": 1000 * sum(latencies) / completed if completed else 0.0,
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+        "p99_ms": 1000 * percentile(latencies, 99),
+        "max_ms": 1000 * max(latencies, default=0.0),
+    }
+
+def compare(current: Dict[str, float], baseline: Dict[str, float], max_regression: float) -> List[str]:
+    """Descriptions of the metrics in ``current`` that are more than ``max_regression`` percent worse than ``baseline``."""
+    regressions = []
+    for metric in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+        old, new = baseline.get(metric), current.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        if metric in HIGHER_IS_BETTER:
+            change = -change
+        if change > max_regression:
+            regressions.append(f"{metric}: {old:.2f} -> {new:.2f} ({change:+.1f}% worse)")
+    if current.get("errors", 0) > baseline.get("errors", 0):
+        regressions.append(f"errors: {baseline.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+async def run_load(client: httpx.AsyncClient, concurrency: int, requests: int, duration: Optional[float],
+                   payload: Dict[str, Any], path: str = "/llm/generate") -> Dict[str, float]:
+    """
+    Send ``requests`` requests (or as many as fit in ``duration`` seconds)
+    from ``concurrency`` closed-loop clients, each waiting for its response
+    before sending the next.
+    """
+    latencies: List[float] = []
+    errors = 0
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    async def worker(worker_id: int):
+        nonlocal errors, issued
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+            elif issued >= requests:
+                return
+            issued += 1
+            # Distinct prompts so the response cache doesn't short-circuit generation.
+            body = dict(payload, prompt=f"{payload['prompt']} [{worker_id}:{issued}]")
+            sent = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - sent)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+async def run(args: argparse.Namespace) -> Dict[str, float]:
+    payload = {"prompt": args.prompt, "max_tokens": args.max_tokens, "temperature": args.temperature}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+            return await run_load(client, args.concurrency, args.requests, args.duration, payload)
+
+    from backend.app.main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=args.timeout) as client:
+            # Warm up imports, pools and the model registry before measuring.
+            await run_load(client, min(args.concurrency, 4), min(args.requests, 20), None, payload)
+            return await run_load(client, args.concurrency, args.requests, args.duration, payload)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for POST /llm/generate")
+    parser.add_argument("--url", default=None, help="Server to target (default: the app in-process)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=500, help="Total requests to send")
+    parser.add_argument("--duration", type=float, default=None, help="Run for this many seconds instead of --requests")
+    parser.add_argument("--prompt", default="Write a Python function that reverses a linked list.", help="Prompt text")
+    parser.add_argument("--max-tokens", type=int, default=64, help="max_tokens per request")
+    parser.add_argument("--temperature", type=float, default=0.7, help="Sampling temperature")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, default=None, help="Compare against this JSON baseline")
+    parser.add_argument("--max-regression", type=float, default=20, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    target = args.url or "in-process app"
+    print(f"{target}: {result['requests']} requests at concurrency {args.concurrency}, {result['errors']} errors")
+    print(f"  {result['rps']:.1f} req/s, latency mean {result['mean_ms']:.1f} ms, p50 {result['p50_ms']:.1f} ms, "
+          f"p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, max {result['max_ms']:.1f} ms")
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        record = dict(result, concurrency=args.concurrency, max_tokens=args.max_tokens)
+        args.save_baseline.write_text(json.dumps(record, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(result, json.loads(args.baseline.read_text()), args.max_regression)
+        if regressions:
+            print(f"Regressions beyond {args.max_regression:.0f}% against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.max_regression:.0f}% against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
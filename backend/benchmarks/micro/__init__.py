@@ -0,0 +1 @@
+# Marker for micro-benchmark package.
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from elasticsearch import Elasticsearch
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.benchmarks.micro.conftest import FakeElasticsearchNode
+from backend.services.cassandra_service import CassandraService
+from backend.services.db_cluster import DatabaseCluster, Endpoint, HashRing
+from backend.services.elasticsearch_service import ElasticsearchService
+from backend.services.mongo_service import MongoService
+from backend.services.neo4j_service import Neo4jService
+from backend.services.pagination import iter_keyset_pages, keyset_query
+from backend.services.redis_service import RedisService
+
+def test_sqlite_point_read(benchmark, sqlite):
+    benchmark(sqlite.execute, "SELECT name, value FROM items WHERE id = ?", (5000,))
+
+def test_sqlite_insert(benchmark, sqlite):
+    benchmark(sqlite.execute, "INSERT INTO items (name, value) VALUES (?, ?)", ("bench", 1))
+
+def test_sqlite_bulk_insert_1k(benchmark, sqlite):
+    rows = [(f"bulk{i}", i) for i in range(1000)]
+    benchmark(sqlite.bulk_insert, "items", ["name", "value"], rows)
+
+def test_sqlite_iterate_10k(benchmark, sqlite):
+    benchmark(lambda: sum(1 for _ in sqlite.iterate("SELECT id, name, value FROM items")))
+
+def test_sqlite_keyset_pages_10k(benchmark, sqlite):
+    benchmark(lambda: sum(len(page) for page in iter_keyset_pages(sqlite, "items", ["id", "name"], page_size=1000)))
+
+def test_keyset_query(benchmark):
+    benchmark(keyset_query, "items", ["id", "name", "value"], "id", 1000, 500)
+
+def test_routed_read(benchmark, sqlite):
+    cluster = DatabaseCluster(Endpoint("primary", sqlite), [Endpoint("replica", sqlite)])
+    benchmark(lambda: cluster.reader().execute("SELECT value FROM items WHERE id = ?", (1,)))
+
+def test_hash_ring_lookup(benchmark):
+    ring = HashRing([f"shard{i}" for i in range(8)])
+    benchmark(ring.get, "tenant-42")
+
+def test_redis_get(benchmark, redis_client):
+    service = RedisService("fake", 0, client=redis_client)
+    service.set("key", b"value")
+    benchmark(service.get, "key")
+
+def test_redis_near_cache_get(benchmark, redis_client):
+    service = RedisService("fake", 0, near_cache_size=1024, client=redis_client)
+    service.set("key", b"value")
+    benchmark(service.get, "key")
+
+def test_redis_mget_100(benchmark, redis_client):
+    service = RedisService("fake", 0, client=redis_client)
+    keys = [f"key{i}" for i in range(100)]
+    service.mset({key: b"value" for key in keys})
+    benchmark(service.mget, keys)
+
+def test_elasticsearch_bulk_index_1k(benchmark):
+    service = ElasticsearchService("fake", 0, client=Elasticsearch("http://localhost:9200", node_class=FakeElasticsearchNode))
+    documents = [{"id": i, "title": f"document {i}"} for i in range(1000)]
+    benchmark(service.bulk_index, "docs", documents)
+
+def test_mongo_insert_many_10k(benchmark):
+    client = MagicMock()
+    client["db"]["docs"].insert_many.side_effect = lambda batch, ordered: MagicMock(inserted_ids=batch)
+    service = MongoService("mongodb://fake", client=client)
+    documents = [{"n": i} for i in range(10_000)]
+    benchmark(service.insert_many, "db", "docs", documents)
+
+def test_cassandra_prepared_execute(benchmark):
+    service = CassandraService("fake", 0, session=MagicMock())
+    benchmark(service.execute, "SELECT * FROM users WHERE id = %s", (1,))
+
+def test_neo4j_execute_batch_10k(benchmark):
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    session.execute_write.side_effect = lambda fn, query, params: len(params["rows"])
+    service = Neo4jService("bolt://fake", "user", "password", driver=driver)
+    rows = [{"id": i} for i in range(10_000)]
+    benchmark(service.execute_batch, "MERGE (n:Node {id: row.id})", rows)
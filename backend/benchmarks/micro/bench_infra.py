@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.feature_flags.manager import FeatureFlagManager
+from backend.settings import settings
+from backend.telemetry.metrics import MetricsRegistry
+
+def test_flag_is_enabled(benchmark):
+    flags = FeatureFlagManager(settings.FEATURE_FLAGS_PATH)
+    benchmark(flags.is_enabled, "enable_llm")
+
+def test_flag_rollout(benchmark, tmp_path):
+    path = tmp_path / "flags.yaml"
+    path.write_text("sampler:\n  rollout: 50\n")
+    flags = FeatureFlagManager(path)
+    benchmark(flags.is_enabled, "sampler", "user-42")
+
+def test_histogram_observe(benchmark):
+    histogram = MetricsRegistry().histogram("bench_seconds", "Benchmark histogram")
+    benchmark(histogram.observe, 0.042, model="default")
+
+def test_metrics_render(benchmark):
+    registry = MetricsRegistry()
+    for i in range(20):
+        registry.histogram(f"bench_{i}_seconds", "Benchmark histogram").observe(0.1, model="default")
+    benchmark(registry.render)
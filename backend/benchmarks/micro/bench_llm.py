@@ -0,0 +1,73 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.batching import ContinuousBatcher
+from backend.services.inference_scheduler import InferenceScheduler
+from backend.services.llm_cache import PrefixCache, ResponseCache, make_cache_key
+from backend.services.llm_service import LLMService
+from backend.services.model_registry import ModelRegistry
+from backend.services.speculative import PromptLookupDraft
+
+PROMPT = "Write a Python function that parses an ISO 8601 date and returns a datetime object."
+
+def test_mock_generate(benchmark):
+    llm = LLMService("missing.gguf")
+    benchmark(llm.generate, PROMPT, 64, 0.7)
+
+def test_mock_stream(benchmark):
+    llm = LLMService("missing.gguf")
+    benchmark(lambda: list(llm.generate_stream(PROMPT, 64, 0.7)))
+
+def test_count_tokens(benchmark):
+    llm = LLMService("missing.gguf")
+    benchmark(llm.count_tokens, PROMPT * 20)
+
+def test_cache_key(benchmark):
+    benchmark(make_cache_key, "default", PROMPT, temperature=0, max_tokens=256)
+
+def test_response_cache_hit(benchmark):
+    cache = ResponseCache()
+    key = make_cache_key("default", PROMPT, temperature=0)
+    cache.set(key, {"text": "cached"})
+    benchmark(cache.get, key)
+
+def test_prefix_cache_lookup(benchmark):
+    cache = PrefixCache(max_bytes=1 << 30)
+    for i in range(64):
+        cache.store([i] * 8 + list(range(512)), object(), size=1024)
+    benchmark(cache.lookup, [5] * 8 + list(range(600)))
+
+def test_registry_get_resident(benchmark, tmp_path):
+    registry = ModelRegistry({"default": tmp_path / "missing.gguf"})
+    registry.preload()
+    benchmark(registry.get)
+
+def test_scheduler_submit(benchmark):
+    scheduler = InferenceScheduler(max_workers=2, max_queue_size=64)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(_start(scheduler))
+        benchmark(lambda: loop.run_until_complete(scheduler.submit(len, PROMPT)))
+        loop.run_until_complete(scheduler.stop())
+    finally:
+        loop.close()
+
+def test_batcher_generate(benchmark):
+    batcher = ContinuousBatcher(LLMService("missing.gguf"), max_batch_size=4, batch_window_ms=0)
+    batcher.start()
+    try:
+        benchmark(batcher.generate, PROMPT, 32, 0.7)
+    finally:
+        batcher.stop()
+
+async def _start(scheduler: InferenceScheduler) -> None:
+    scheduler.start()
+
+def test_prompt_lookup_propose_2k_context(benchmark):
+    draft = PromptLookupDraft(num_pred_tokens=8)
+    ids = [i % 500 for i in range(2048)]
+    benchmark(draft.propose, ids)
@@ -0,0 +1,69 @@
+import json
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import pytest
+from elastic_transport import ApiResponseMeta, BaseNode, HttpHeaders
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from backend.services.sqlite_service import SQLiteService
+
+NodeResponse = namedtuple("NodeResponse", ["meta", "body"])
+
+class FakeRedisClient:
+    """Dict-backed stand-in for redis.Redis."""
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def mset(self, mapping):
+        self.data.update(mapping)
+
+    def config_get(self, name):
+        return {name: "KA"}
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        class PubSub:
+            def psubscribe(self, **handlers):
+                pass
+
+            def run_in_thread(self, sleep_time, daemon):
+                return self
+
+            def stop(self):
+                pass
+        return PubSub()
+
+    def close(self):
+        pass
+
+class FakeElasticsearchNode(BaseNode):
+    """Acknowledges every bulk item without storing it."""
+    def perform_request(self, method, target, body=None, headers=None, request_timeout=None):
+        items = [{"index": {"status": 201}}] * (body.count(b"\n") // 2)
+        headers = HttpHeaders({"x-elastic-product": "Elasticsearch", "content-type": "application/json"})
+        data = json.dumps({"took": 1, "errors": False, "items": items}).encode()
+        return NodeResponse(ApiResponseMeta(200, "1.1", headers, 0.0, self.config), data)
+
+@pytest.fixture
+def sqlite(tmp_path):
+    service = SQLiteService(str(tmp_path / "bench.db"))
+    service.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, value INTEGER)")
+    service.bulk_insert("items", ["name", "value"], ((f"item{i}", i) for i in range(10_000)))
+    yield service
+    service.close()
+
+@pytest.fixture
+def redis_client():
+    return FakeRedisClient()
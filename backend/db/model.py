@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel, Field, EmailStr, constr
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+    Column, Integer, String, DateTime, Boolean, ForeignKey, Index, Text
 )
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
 
@@ -17,6 +17,8 @@ class UserORM(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, onupdate=datetime.utcnow)
+    # Relationships refuse to lazy-load: callers must eager-load (selectinload) instead of issuing one query per row.
+    posts: Mapped[List["PostORM"]] = relationship(back_populates="author", lazy="raise_on_sql", order_by="PostORM.id")
 
 class PostORM(Base):
     __tablename__ = "posts"
@@ -26,6 +28,9 @@ class PostORM(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, onupdate=datetime.utcnow)
     author_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
+    author: Mapped[UserORM] = relationship(back_populates="posts", lazy="raise_on_sql")
+    # Serves keyset pagination of an author's posts (WHERE author_id = ? AND id > ? ORDER BY id).
+    __table_args__ = (Index("ix_posts_author_id_id", "author_id", "id"),)
 
 class UserBase(BaseModel):
     username: constr(strip_whitespace=True, min_length=3, max_length=32)
@@ -39,7 +44,7 @@ class UserRead(UserBase):
     is_active: bool
     created_at: datetime
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class PostBase(BaseModel):
     title: constr(min_length=1, max_length=255)
@@ -53,4 +58,11 @@ class PostRead(PostBase):
     created_at: datetime
     author_id: int
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+class UserWithPosts(UserRead):
+    posts: List[PostRead] = []
+
+class PostPage(BaseModel):
+    items: List[PostRead]
+    next_after: Optional[int] = Field(default=None, description="Pass as ``after`` to fetch the next page")
@@ -0,0 +1,254 @@
+"""
+Code Morningstar - Repository
+Data access for users and posts on SQLAlchemy 2.0. Writes go through
+multi-row INSERT statements in batches, reads that cross the author -> posts
+relationship load it with one extra query per page (``selectinload``), and
+pages are serialized straight from result rows without building ORM objects.
+Each query is a module-level function taking a Session, shared by the sync
+Repository and, through ``run_sync``, the AsyncRepository.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db.model import Base, PostORM, PostPage, PostRead, UserORM, UserWithPosts
+
+_POST_LIST = TypeAdapter(List[PostRead])
+_USERS_WITH_POSTS = TypeAdapter(List[UserWithPosts])
+_POST_COLUMNS = (PostORM.id, PostORM.title, PostORM.body, PostORM.created_at, PostORM.author_id)
+# Columns an upsert may change; identity and creation time are kept.
+_USER_UPSERT_COLUMNS = ("email", "hashed_password", "is_active")
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def make_engine(url: str, pool_size: int = 10, max_overflow: int = 20, pool_recycle: int = 1800,
+                echo: bool = False) -> Engine:
+    """
+    A pooled engine for ``url``. SQLite connections are shared across
+    threads and switched to WAL so readers don't block the writer; in-memory
+    SQLite uses a single shared connection so every session sees the same data.
+    """
+    if url.startswith("sqlite"):
+        options: Dict[str, Any] = {"connect_args": {"check_same_thread": False}}
+        if ":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:"):
+            options["poolclass"] = StaticPool
+        engine = create_engine(url, echo=echo, **options)
+        event.listen(engine, "connect", _sqlite_pragmas)
+        return engine
+    return create_engine(url, echo=echo, pool_size=pool_size, max_overflow=max_overflow,
+                         pool_recycle=pool_recycle, pool_pre_ping=True)
+
+def to_async_url(url: str) -> str:
+    """``url`` with its dialect's asyncio driver, e.g. sqlite:// -> sqlite+aiosqlite://."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for database URL scheme: {scheme}")
+    return ASYNC_DRIVERS[dialect] + sep + rest
+
+def _sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def bulk_insert(session: Session, model: Any, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+    """
+    Insert ``rows`` (column -> value dicts) as executemany batches of
+    ``batch_size``, which SQLAlchemy sends as multi-row INSERTs. Column
+    defaults (timestamps, is_active) are filled in as for ORM adds.
+    """
+    inserted = 0
+    for chunk in _chunks(rows, batch_size):
+        session.execute(insert(model), chunk)
+        inserted += len(chunk)
+    return inserted
+
+def upsert_users(session: Session, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+    """Insert users, updating email, password and is_active of existing usernames."""
+    dialect = session.get_bind().dialect.name
+    now = datetime.utcnow()
+    written = 0
+    for chunk in _chunks(rows, batch_size):
+        chunk = [dict({"is_active": True, "created_at": now, "updated_at": now}, **row) for row in chunk]
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            stmt = dialect_insert(UserORM)
+            updates = {column: stmt.excluded[column] for column in _USER_UPSERT_COLUMNS if column in chunk[0]}
+            stmt = stmt.on_conflict_do_update(index_elements=[UserORM.username], set_=dict(updates, updated_at=now))
+        elif dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert as dialect_insert
+            stmt = dialect_insert(UserORM)
+            updates = {column: stmt.inserted[column] for column in _USER_UPSERT_COLUMNS if column in chunk[0]}
+            stmt = stmt.on_duplicate_key_update(dict(updates, updated_at=now))
+        else:
+            raise ValueError(f"Upsert is not supported for the {dialect} dialect")
+        session.execute(stmt, chunk)
+        written += len(chunk)
+    return written
+
+def users_with_posts(session: Session, user_ids: Optional[Sequence[int]] = None, after: Optional[int] = None,
+                     limit: int = 100) -> List[UserWithPosts]:
+    """
+    A keyset page of users with all their posts: two queries in total, one
+    for the users and one ``IN`` query for every post on the page.
+    """
+    query = select(UserORM).options(selectinload(UserORM.posts)).order_by(UserORM.id).limit(limit)
+    if user_ids is not None:
+        query = query.where(UserORM.id.in_(user_ids))
+    if after is not None:
+        query = query.where(UserORM.id > after)
+    users = session.scalars(query).all()
+    return _USERS_WITH_POSTS.validate_python(users, from_attributes=True)
+
+def posts_by_author(session: Session, author_id: int, after: Optional[int] = None, limit: int = 100) -> PostPage:
+    """
+    One page of an author's posts ordered by id, resuming after the id
+    ``after``. Uses the (author_id, id) index, so every page costs the same.
+    """
+    query = select(*_POST_COLUMNS).where(PostORM.author_id == author_id).order_by(PostORM.id).limit(limit)
+    if after is not None:
+        query = query.where(PostORM.id > after)
+    rows = session.execute(query).mappings().all()
+    items = _POST_LIST.validate_python(rows)
+    return PostPage(items=items, next_after=items[-1].id if len(items) == limit else None)
+
+class Repository:
+    """Users and posts over a pooled engine; each call runs in its own transaction."""
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.Session = sessionmaker(engine, expire_on_commit=False)
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "Repository":
+        return cls(make_engine(
+            settings.DATABASE_URL,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE_S,
+        ))
+
+    def create_all(self) -> None:
+        Base.metadata.create_all(self.engine)
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        """A session whose transaction commits on exit (rolls back on error)."""
+        with self.Session.begin() as session:
+            yield session
+
+    def _run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self.session() as session:
+            return fn(session, *args, **kwargs)
+
+    def bulk_insert_users(self, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        return self._run(bulk_insert, UserORM, rows, batch_size)
+
+    def bulk_insert_posts(self, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        return self._run(bulk_insert, PostORM, rows, batch_size)
+
+    def upsert_users(self, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        return self._run(upsert_users, rows, batch_size)
+
+    def users_with_posts(self, user_ids: Optional[Sequence[int]] = None, after: Optional[int] = None,
+                         limit: int = 100) -> List[UserWithPosts]:
+        return self._run(users_with_posts, user_ids, after, limit)
+
+    def posts_by_author(self, author_id: int, after: Optional[int] = None, limit: int = 100) -> PostPage:
+        return self._run(posts_by_author, author_id, after, limit)
+
+    def iter_posts_by_author(self, author_id: int, page_size: int = 1000) -> Iterator[List[PostRead]]:
+        """Every post of an author, one keyset page per query."""
+        after = None
+        while True:
+            page = self.posts_by_author(author_id, after, page_size)
+            if page.items:
+                yield page.items
+            if page.next_after is None:
+                return
+            after = page.next_after
+
+    def close(self) -> None:
+        self.engine.dispose()
+
+class AsyncRepository:
+    """
+    The same operations on SQLAlchemy's asyncio engine (aiosqlite, asyncpg or
+    aiomysql); each query function runs inside ``AsyncSession.run_sync``.
+    """
+    def __init__(self, engine: Any):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        self.engine = engine
+        self.Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "AsyncRepository":
+        return cls.from_url(
+            settings.DATABASE_URL,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE_S,
+        )
+
+    @classmethod
+    def from_url(cls, url: str, pool_size: int = 10, max_overflow: int = 20, pool_recycle: int = 1800) -> "AsyncRepository":
+        from sqlalchemy.ext.asyncio import create_async_engine
+        url = to_async_url(url)
+        if url.startswith("sqlite"):
+            options: Dict[str, Any] = {"poolclass": StaticPool} if ":memory:" in url else {}
+            engine = create_async_engine(url, **options)
+            event.listen(engine.sync_engine, "connect", _sqlite_pragmas)
+        else:
+            engine = create_async_engine(url, pool_size=pool_size, max_overflow=max_overflow,
+                                         pool_recycle=pool_recycle, pool_pre_ping=True)
+        return cls(engine)
+
+    async def create_all(self) -> None:
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        async with self.Session.begin() as session:
+            return await session.run_sync(fn, *args, **kwargs)
+
+    async def bulk_insert_users(self, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        return await self._run(bulk_insert, UserORM, rows, batch_size)
+
+    async def bulk_insert_posts(self, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        return await self._run(bulk_insert, PostORM, rows, batch_size)
+
+    async def upsert_users(self, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        return await self._run(upsert_users, rows, batch_size)
+
+    async def users_with_posts(self, user_ids: Optional[Sequence[int]] = None, after: Optional[int] = None,
+                               limit: int = 100) -> List[UserWithPosts]:
+        return await self._run(users_with_posts, user_ids, after, limit)
+
+    async def posts_by_author(self, author_id: int, after: Optional[int] = None, limit: int = 100) -> PostPage:
+        return await self._run(posts_by_author, author_id, after, limit)
+
+    async def close(self) -> None:
+        await self.engine.dispose()
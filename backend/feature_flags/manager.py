@@ -1,17 +1,172 @@
-import yaml
+import threading
+import zlib
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Tuple
+
+import yaml
+from fastapi import Request
+
+@dataclass(frozen=True)
+class Flag:
+    """
+    One compiled flag. A plain YAML value compiles to a flag that is on when
+    the value is truthy. The mapping form adds rollouts::
+
+        new_sampler:
+          enabled: true
+          rollout: 25          # percent of keys, by stable hash
+          tenants: [acme]      # always on for these tenants
+          value: top_p         # typed value returned by get()
+    """
+    name: str
+    enabled: bool
+    value: Any
+    rollout: float = 100.0
+    tenants: FrozenSet[str] = frozenset()
+    blocked_tenants: FrozenSet[str] = frozenset()
+
+    def evaluate(self, key: Optional[str] = None, tenant: Optional[str] = None) -> bool:
+        if not self.enabled:
+            return False
+        if tenant is not None:
+            if tenant in self.blocked_tenants:
+                return False
+            if tenant in self.tenants:
+                return True
+        if self.rollout >= 100:
+            return True
+        if self.rollout <= 0:
+            return False
+        bucket_key = key if key is not None else tenant
+        if bucket_key is None:
+            return False
+        return _bucket(self.name, bucket_key) < self.rollout * 100
+
+class FlagTable:
+    """Immutable snapshot of every flag, with unconditional answers precomputed."""
+    def __init__(self, flags: Dict[str, Flag], version: Tuple[int, int] = (0, 0)):
+        self.flags: Mapping[str, Flag] = MappingProxyType(flags)
+        # Flags that are on for everyone; is_enabled() without context only reads this.
+        self.enabled: Mapping[str, bool] = MappingProxyType({
+            name: flag.evaluate() for name, flag in flags.items()
+        })
+        self.version = version
 
 class FeatureFlagManager:
+    """
+    Feature flags read from YAML. The whole table is replaced in one
+    attribute assignment on reload, so lookups take no lock and always see a
+    consistent snapshot. ``start_watching`` polls the file's mtime and
+    reloads it when it changes; a file that fails to parse is ignored and the
+    previous table stays in effect.
+    """
     def __init__(self, flags_path: Path):
-        self.flags_path = flags_path
-        self.flags = self._load_flags()
+        self.flags_path = Path(flags_path)
+        self._table = self._load_table()
+        self._watch_stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @property
+    def flags(self) -> Mapping[str, Any]:
+        return MappingProxyType({name: flag.value for name, flag in self._table.flags.items()})
 
     def _load_flags(self) -> Dict[str, Any]:
         if not self.flags_path.exists():
             raise FileNotFoundError(f"Feature flags file not found: {self.flags_path}")
         with self.flags_path.open("r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
+            return yaml.safe_load(f) or {}
+
+    def _version(self) -> Tuple[int, int]:
+        stat = self.flags_path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_table(self) -> FlagTable:
+        version = self._version() if self.flags_path.exists() else (0, 0)
+        raw = self._load_flags()
+        if not isinstance(raw, dict):
+            raise ValueError(f"Feature flags file must contain a mapping: {self.flags_path}")
+        return FlagTable({str(name): _compile(str(name), spec) for name, spec in raw.items()}, version)
+
+    def is_enabled(self, feature: str, key: Optional[str] = None, tenant: Optional[str] = None) -> bool:
+        """
+        Whether ``feature`` is on. ``key`` (e.g. a user id) places the caller
+        in a percentage rollout; ``tenant`` applies per-tenant overrides.
+        """
+        if key is None and tenant is None:
+            return self._table.enabled.get(feature, False)
+        flag = self._table.flags.get(feature)
+        return flag is not None and flag.evaluate(key, tenant)
+
+    def get(self, feature: str, default: Any = None) -> Any:
+        """The flag's configured value; ``default`` when unset or of a different type than ``default``."""
+        flag = self._table.flags.get(feature)
+        if flag is None or flag.value is None:
+            return default
+        if default is not None and not isinstance(flag.value, type(default)):
+            return default
+        return flag.value
+
+    def reload(self) -> bool:
+        """Re-read the file if it changed; returns whether a new table was installed."""
+        try:
+            version = self._version()
+        except OSError as e:
+            print(f"Warning: could not stat feature flags file: {e}")
+            return False
+        if version == self._table.version:
+            return False
+        try:
+            self._table = self._load_table()
+        except Exception as e:
+            print(f"Warning: keeping previous feature flags, could not load {self.flags_path}: {e}")
+            return False
+        return True
+
+    def start_watching(self, interval: float = 2.0) -> None:
+        if self._watcher is not None:
+            return
+        self._watch_stop.clear()
+
+        def loop():
+            while not self._watch_stop.wait(interval):
+                self.reload()
+
+        self._watcher = threading.Thread(target=loop, name="feature-flags-watch", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._watch_stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+def get_feature_flags(request: Request) -> FeatureFlagManager:
+    return request.app.state.feature_flags
+
+def _compile(name: str, spec: Any) -> Flag:
+    if not isinstance(spec, dict):
+        return Flag(name=name, enabled=bool(spec), value=spec)
+    tenants = spec.get("tenants") or {}
+    if isinstance(tenants, dict):
+        allowed = frozenset(str(t) for t, on in tenants.items() if on)
+        blocked = frozenset(str(t) for t, on in tenants.items() if not on)
+    else:
+        allowed, blocked = frozenset(str(t) for t in tenants), frozenset()
+    rollout = float(spec.get("rollout", 100))
+    if not 0 <= rollout <= 100:
+        raise ValueError(f"Feature flag {name!r}: rollout must be between 0 and 100, got {rollout}")
+    enabled = bool(spec.get("enabled", True))
+    return Flag(
+        name=name,
+        enabled=enabled,
+        value=spec.get("value", enabled),
+        rollout=rollout,
+        tenants=allowed,
+        blocked_tenants=blocked,
+    )
 
-    def is_enabled(self, feature: str) -> bool:
-        return bool(self.flags.get(feature, False))
+def _bucket(name: str, key: str) -> int:
+    """Stable bucket in [0, 10000) for (flag, key), the same in every process."""
+    return zlib.crc32(f"{name}:{key}".encode("utf-8")) % 10000
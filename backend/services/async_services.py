@@ -0,0 +1,239 @@
+"""
+Async counterparts of the database services.
+
+Each class keeps the shape of its synchronous sibling (``execute``, ``find``,
+``get``/``set``) so request handlers can ``await`` it without blocking the
+event loop. Native async drivers are used where the ecosystem has one; any
+other service can be wrapped in ThreadOffloadService, which runs calls on a
+bounded thread pool. Drivers are imported when a service is first created,
+so importing this module stays cheap.
+"""
+import asyncio
+import functools
+import importlib
+import itertools
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, List, Optional
+
+from backend.services.sqlite_service import SQLiteService
+
+class ThreadOffloadService:
+    """
+    Async facade over a synchronous service. Every public method becomes a
+    coroutine that runs on a dedicated pool of ``max_workers`` threads, so at
+    most that many blocking calls are in flight and the event loop never waits.
+    """
+    def __init__(self, service: Any, max_workers: int = 8):
+        self.service = service
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-offload")
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def iterate(self, *args: Any, batch_size: int = 500, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Async iterator over the wrapped service's ``iterate``: rows are pulled
+        ``batch_size`` at a time on the thread pool and yielded on the loop.
+        """
+        rows = self.service.iterate(*args, batch_size=batch_size, **kwargs)
+        try:
+            while True:
+                batch = await self.run(_take, rows, batch_size)
+                if not batch:
+                    break
+                for row in batch:
+                    yield row
+        finally:
+            await self.run(rows.close)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self.service, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self.run(attr, *args, **kwargs)
+        return call
+
+    async def aclose(self) -> None:
+        close = getattr(self.service, "close", None)
+        if close is not None:
+            await self.run(close)
+        self._executor.shutdown(wait=False)
+
+
+class AsyncSQLiteService(ThreadOffloadService):
+    """
+    SQLite has no network round-trip to overlap, so the pooled SQLiteService is
+    offloaded to as many threads as it has connections.
+    """
+    def __init__(self, db_path: str, max_workers: int = 4, **kwargs: Any):
+        super().__init__(SQLiteService(db_path, pool_size=max_workers, **kwargs), max_workers)
+
+
+# Statements asyncpg should fetch rows for; anything else runs as conn.execute.
+_ROW_STATEMENT = re.compile(r"^\s*(SELECT|WITH|VALUES|TABLE|SHOW|EXPLAIN)\b|\bRETURNING\b", re.IGNORECASE)
+
+@functools.lru_cache(maxsize=256)
+def _to_numeric(query: str) -> str:
+    """psycopg2-style ``%s`` placeholders as asyncpg's ``$1, $2, ...``; ``%%`` becomes ``%``."""
+    counter = itertools.count(1)
+    return re.sub(r"%[s%]", lambda m: "%" if m.group() == "%%" else f"${next(counter)}", query)
+
+class AsyncPostgresService:
+    """
+    PostgreSQL over an asyncpg connection pool. Queries take ``%s``
+    placeholders, like PostgresService, and are rewritten to asyncpg's
+    ``$1``-style when parameters are passed (``$1`` queries work as they are).
+    asyncpg prepares and caches statements per connection by itself.
+    """
+    def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 10):
+        self._asyncpg = _require("asyncpg", "asyncpg is required for AsyncPostgresService (pip install asyncpg).")
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self._pool: Optional[Any] = None
+        self._pool_lock = asyncio.Lock()
+
+    async def _get_pool(self) -> Any:
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await self._asyncpg.create_pool(self.dsn, min_size=self.minconn, max_size=self.maxconn)
+        return self._pool
+
+    async def execute(self, query: str, params: tuple = ()) -> Any:
+        """Row tuples for statements that return rows, otherwise None (as PostgresService)."""
+        if params:
+            query = _to_numeric(query)
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            if _ROW_STATEMENT.search(query):
+                return [tuple(row) for row in await conn.fetch(query, *params)]
+            await conn.execute(query, *params)
+            return None
+
+    async def iterate(self, query: str, params: tuple = (), batch_size: int = 1000) -> AsyncIterator[tuple]:
+        """Stream rows through a server-side cursor, prefetching ``batch_size`` rows."""
+        if params:
+            query = _to_numeric(query)
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                async for row in conn.cursor(query, *params, prefetch=batch_size):
+                    yield tuple(row)
+
+    async def aclose(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+class AsyncMySQLService:
+    """MySQL over an aiomysql connection pool."""
+    def __init__(self, pool_size: int = 10, **db_config: Any):
+        self._aiomysql = _require("aiomysql", "aiomysql is required for AsyncMySQLService (pip install aiomysql).")
+        self.pool_size = pool_size
+        self.db_config = db_config
+        self._pool: Optional[Any] = None
+        self._pool_lock = asyncio.Lock()
+
+    async def _get_pool(self) -> Any:
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await self._aiomysql.create_pool(maxsize=self.pool_size, **self.db_config)
+        return self._pool
+
+    async def execute(self, query: str, params: tuple = ()) -> Any:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(query, params)
+                result = await cursor.fetchall() if cursor.description else None
+            await conn.commit()
+            return result
+
+    async def iterate(self, query: str, params: tuple = (), batch_size: int = 1000) -> AsyncIterator[tuple]:
+        """Stream rows through an unbuffered server-side cursor."""
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor(self._aiomysql.SSCursor) as cursor:
+                await cursor.execute(query, params)
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
+
+    async def aclose(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+
+
+class AsyncMongoService:
+    """MongoDB through PyMongo's native asyncio client."""
+    def __init__(self, uri: str, client: Optional[Any] = None):
+        if client is None:
+            pymongo = _require("pymongo", "pymongo>=4.9 is required for AsyncMongoService.")
+            if not hasattr(pymongo, "AsyncMongoClient"):
+                raise ImportError("pymongo>=4.9 is required for AsyncMongoService.")
+            client = pymongo.AsyncMongoClient(uri)
+        self.client = client
+
+    async def find(self, db: str, collection: str, query: dict) -> list:
+        return await self.client[db][collection].find(query).to_list(None)
+
+    async def iterate(self, db: str, collection: str, query: dict, batch_size: int = 1000) -> AsyncIterator[dict]:
+        cursor = self.client[db][collection].find(query).batch_size(batch_size)
+        try:
+            async for document in cursor:
+                yield document
+        finally:
+            await cursor.close()
+
+    async def aclose(self) -> None:
+        await self.client.close()
+
+
+class AsyncRedisService:
+    """Redis through redis-py's asyncio client."""
+    def __init__(self, host: str, port: int, client: Optional[Any] = None):
+        if client is None:
+            aioredis = _require("redis.asyncio", "redis>=4.2 is required for AsyncRedisService.")
+            client = aioredis.Redis(host=host, port=port)
+        self.client = client
+
+    async def get(self, key: str) -> Any:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: Any, ex: int = None):
+        await self.client.set(key, value, ex=ex)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def _require(module: str, message: str) -> Any:
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(message)
+
+
+def _take(rows: Iterator[Any], count: int) -> List[Any]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= count:
+            break
+    return batch
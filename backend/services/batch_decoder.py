@@ -0,0 +1,196 @@
+"""
+Code Morningstar - Multi-Sequence Decoding
+Several sequences decoded in one llama.cpp context through llama-cpp-python's
+low-level API. Each sequence owns a sequence id (a slot of ``n_seq_max``) in
+the shared KV cache; every step packs each sequence's next input - a chunk of
+its prompt or the token it sampled last - into one ``llama_batch`` and runs a
+single ``llama_decode``, so the weights are read once per step for the whole
+batch. Each sequence is then sampled from its own row of logits.
+"""
+import codecs
+from typing import Any, Callable, List, Optional, Sequence
+
+Sampler = Callable[[Any, int, float], int]
+
+_rng = None
+
+def supports_batching(lib: Any) -> bool:
+    """Whether a llama_cpp module exposes what BatchDecoder needs."""
+    return (hasattr(lib, "llama_batch_init") and hasattr(lib, "llama_get_logits_ith")
+            and (hasattr(lib, "llama_init_from_model") or hasattr(lib, "llama_new_context_with_model")))
+
+def sample_logits(logits: Any, n_vocab: int, temperature: float, top_k: int = 40) -> int:
+    """Greedy at temperature 0, otherwise top-k sampling from a ctypes row of ``n_vocab`` logits."""
+    global _rng
+    # numpy ships with llama-cpp-python.
+    import numpy as np
+    row = np.ctypeslib.as_array(logits, shape=(n_vocab,))
+    if temperature <= 0:
+        return int(row.argmax())
+    if _rng is None:
+        _rng = np.random.default_rng()
+    top = np.argpartition(row, -top_k)[-top_k:]
+    scaled = row[top] / temperature
+    probs = np.exp(scaled - scaled.max())
+    return int(top[_rng.choice(len(top), p=probs / probs.sum())])
+
+class DecodeSequence:
+    """One prompt in a BatchDecoder: its slot, position in the KV cache, and the text decoded so far."""
+    def __init__(self, decoder: "BatchDecoder", slot: int, tokens: Sequence[int], max_tokens: int,
+                 temperature: float, stop: Sequence[str]):
+        self.decoder = decoder
+        self.slot: Optional[int] = slot
+        # Tokens not yet in the KV cache: the prompt, then the last sampled token.
+        self.pending = list(tokens)
+        self.n_past = 0
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.stop = list(stop)
+        self.generated = 0
+        self.text = ""
+        self.finished = False
+        # Index in the current batch whose logits this sequence samples from.
+        self.logits_index: Optional[int] = None
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def accept(self, token: int) -> Optional[str]:
+        """Record a sampled token; returns its text, or None when it ends the sequence."""
+        decoder = self.decoder
+        if token == decoder.eos:
+            self.finished = True
+            return None
+        self.generated += 1
+        # A character split across tokens comes out with the token that completes it.
+        piece = self._utf8.decode(decoder.llama.detokenize([token]))
+        before = len(self.text)
+        self.text += piece
+        for stop in self.stop:
+            at = self.text.find(stop, max(0, before - len(stop) + 1))
+            if at != -1:
+                self.finished = True
+                piece = self.text[before:at] if at > before else ""
+                self.text = self.text[:at]
+                return piece
+        if self.generated >= self.max_tokens or self.n_past + 1 >= decoder.n_ctx:
+            self.finished = True
+        else:
+            self.pending = [token]
+        return piece
+
+    def close(self) -> None:
+        self.decoder.release(self)
+
+class BatchDecoder:
+    """
+    Up to ``slots`` sequences sharing one llama.cpp context. The context is
+    separate from the model's own (which keeps serving non-batched calls)
+    and holds ``n_ctx`` tokens of KV cache per slot. Not thread-safe: one
+    thread, the batcher's, opens, steps and closes sequences.
+    """
+    def __init__(self, llama: Any, lib: Any, slots: int, n_ctx: int, n_threads: int, n_batch: int = 512,
+                 sampler: Optional[Sampler] = None):
+        self.llama = llama
+        self.lib = lib
+        self.slots = slots
+        self.n_ctx = n_ctx
+        # Every generating sequence must fit in one step, beside any prompt chunks.
+        self.n_batch = max(n_batch, slots)
+        self.sampler = sampler or sample_logits
+        params = lib.llama_context_default_params()
+        params.n_ctx = n_ctx * slots
+        params.n_batch = self.n_batch
+        params.n_seq_max = slots
+        params.n_threads = n_threads
+        params.n_threads_batch = n_threads
+        new_context = getattr(lib, "llama_init_from_model", None) or lib.llama_new_context_with_model
+        self.ctx = new_context(llama._model.model, params)
+        if not self.ctx:
+            raise RuntimeError(f"Could not create a {slots}-sequence llama.cpp context.")
+        self.batch = lib.llama_batch_init(self.n_batch, 0, 1)
+        self.n_vocab = llama.n_vocab()
+        self.eos = llama.token_eos()
+        self._free = list(range(slots - 1, -1, -1))
+
+    @property
+    def free_slots(self) -> int:
+        return len(self._free)
+
+    def open(self, tokens: Sequence[int], max_tokens: int, temperature: float,
+             stop: Sequence[str] = ()) -> DecodeSequence:
+        if not self._free:
+            raise RuntimeError(f"All {self.slots} sequence slots are in use.")
+        if not tokens:
+            raise ValueError("Prompt cannot be empty.")
+        return DecodeSequence(self, self._free.pop(), tokens, max_tokens, temperature, stop)
+
+    def release(self, sequence: DecodeSequence) -> None:
+        """Drop a sequence's KV cache entries and free its slot."""
+        if sequence.slot is None:
+            return
+        if self.ctx:
+            self._seq_rm(sequence.slot)
+        self._free.append(sequence.slot)
+        sequence.slot = None
+        sequence.finished = True
+
+    def _seq_rm(self, slot: int) -> None:
+        # Renamed across llama.cpp releases: kv_cache -> kv_self -> memory.
+        lib = self.lib
+        if hasattr(lib, "llama_memory_seq_rm"):
+            lib.llama_memory_seq_rm(lib.llama_get_memory(self.ctx), slot, -1, -1)
+        elif hasattr(lib, "llama_kv_self_seq_rm"):
+            lib.llama_kv_self_seq_rm(self.ctx, slot, -1, -1)
+        else:
+            lib.llama_kv_cache_seq_rm(self.ctx, slot, -1, -1)
+
+    def step(self, sequences: Sequence[DecodeSequence]) -> List[Optional[str]]:
+        """
+        One llama_decode for all ``sequences``. Returns each one's new text,
+        "" while its prompt is still being evaluated, or None once it has
+        finished. Sequences that are generating go first; prompts fill the
+        rest of the batch and are split across steps when they do not fit.
+        """
+        if not self.ctx:
+            raise RuntimeError("The batch decoder has been closed.")
+        results: List[Optional[str]] = [None if sequence.finished else "" for sequence in sequences]
+        live = [sequence for sequence in sequences if not sequence.finished and sequence.pending]
+        order = [s for s in live if len(s.pending) == 1] + [s for s in live if len(s.pending) > 1]
+        batch = self.batch
+        n_tokens = 0
+        for sequence in order:
+            take = min(len(sequence.pending), self.n_batch - n_tokens)
+            if take <= 0:
+                sequence.logits_index = None
+                continue
+            for offset, token in enumerate(sequence.pending[:take]):
+                batch.token[n_tokens] = token
+                batch.pos[n_tokens] = sequence.n_past + offset
+                batch.n_seq_id[n_tokens] = 1
+                batch.seq_id[n_tokens][0] = sequence.slot
+                batch.logits[n_tokens] = False
+                n_tokens += 1
+            done = take == len(sequence.pending)
+            # Only a sequence whose whole input is in the cache has a token to sample.
+            batch.logits[n_tokens - 1] = done
+            sequence.logits_index = n_tokens - 1 if done else None
+            sequence.pending = sequence.pending[take:]
+            sequence.n_past += take
+        if not n_tokens:
+            return results
+        batch.n_tokens = n_tokens
+        status = self.lib.llama_decode(self.ctx, batch)
+        if status != 0:
+            raise RuntimeError(f"llama_decode failed with status {status}.")
+        for index, sequence in enumerate(sequences):
+            if sequence.logits_index is None or sequence.finished:
+                continue
+            logits = self.lib.llama_get_logits_ith(self.ctx, sequence.logits_index)
+            sequence.logits_index = None
+            results[index] = sequence.accept(self.sampler(logits, self.n_vocab, sequence.temperature))
+        return results
+
+    def close(self) -> None:
+        if self.ctx:
+            self.lib.llama_batch_free(self.batch)
+            self.lib.llama_free(self.ctx)
+            self.ctx = None
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from backend.services.llm_service import GenerationResult
+
+
+@dataclass
+class BatchItem:
+    id: str
+    prompt: str
+    max_tokens: int
+    temperature: float
+
+
+@dataclass
+class BatchGroup:
+    """One distinct (prompt, max_tokens, temperature) and every item that asked for it."""
+    prompt: str
+    max_tokens: int
+    temperature: float
+    ids: List[str] = field(default_factory=list)
+
+
+def parse_jsonl(lines: Iterable[Union[str, bytes]], max_tokens: int = 256, temperature: float = 0.7) -> List[BatchItem]:
+    """
+    Read one prompt per JSON line. The prompt is ``prompt``, or ``title`` and
+    ``body`` joined as in requests.jsonl; the id is ``id``, ``request_id`` or
+    the line number. ``max_tokens``/``temperature`` override the defaults per line.
+    """
+    items = []
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON: {e}")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number}: expected a JSON object")
+        prompt = record.get("prompt")
+        if prompt is None:
+            prompt = "\n\n".join(str(record[key]) for key in ("title", "body") if record.get(key))
+        if not str(prompt).strip():
+            raise ValueError(f"Line {number}: no prompt (expected 'prompt' or 'title'/'body')")
+        items.append(BatchItem(
+            id=str(record.get("id", record.get("request_id", number))),
+            prompt=str(prompt),
+            max_tokens=int(record.get("max_tokens", max_tokens)),
+            temperature=float(record.get("temperature", temperature)),
+        ))
+    return items
+
+
+def load_checkpoint(path: Path) -> Set[str]:
+    """
+    Ids already written to the output file ``path`` without an error; failed
+    ones are generated again on resume. A last line cut short by a crash is
+    removed from the file so that appending resumes cleanly.
+    """
+    if not path.exists():
+        return set()
+    done = set()
+    with path.open("rb+") as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if isinstance(record, dict) and "id" in record and not record.get("error"):
+                done.add(str(record["id"]))
+            valid_end += len(line)
+        f.truncate(valid_end)
+    return done
+
+
+def plan_groups(items: Iterable[BatchItem], done: Set[str] = frozenset(),
+                length: Callable[[str], int] = len) -> List[BatchGroup]:
+    """
+    Merge identical requests, drop items already in ``done`` and order the
+    rest by prompt ``length``, so prompts decoded together finish together
+    and similar prompts reuse each other's cached prefixes.
+    """
+    groups: Dict[Any, BatchGroup] = {}
+    for item in items:
+        if item.id in done:
+            continue
+        key = (item.prompt, item.max_tokens, item.temperature)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = BatchGroup(item.prompt, item.max_tokens, item.temperature)
+        group.ids.append(item.id)
+    return sorted(groups.values(), key=lambda group: length(group.prompt))
+
+
+def group_records(group: BatchGroup, result: Optional[GenerationResult] = None,
+                  error: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Output lines for every id in ``group``; duplicates after the first are marked ``cache: dedup``."""
+    if result is None:
+        return [{"id": id, "error": error} for id in group.ids]
+    records = []
+    for index, id in enumerate(group.ids):
+        records.append({
+            "id": id,
+            "response": result.text,
+            "prompt_tokens": result.prompt_tokens,
+            "completion_tokens": result.completion_tokens,
+            "total_ms": round(result.total_ms, 2),
+            "cache": result.cache if index == 0 else "dedup",
+            "error": result.error,
+        })
+    return records
+
+
+class BatchProgress:
+    """Counts prompts and generated tokens; ``line()`` renders progress with throughput and ETA."""
+    def __init__(self, total: int, skipped: int = 0):
+        self.total = total
+        self.skipped = skipped
+        self.done = 0
+        self.failed = 0
+        self.generated_tokens = 0
+        self.started = time.perf_counter()
+
+    def update(self, records: List[Dict[str, Any]], result: Optional[GenerationResult]) -> None:
+        self.done += len(records)
+        if result is None or result.error:
+            self.failed += len(records)
+        elif result.cache != "hit":
+            self.generated_tokens += result.completion_tokens
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.generated_tokens / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "prompts": self.done,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "generated_tokens": self.generated_tokens,
+            "elapsed_s": round(self.elapsed, 3),
+            "tokens_per_second": round(self.tokens_per_second, 2),
+        }
+
+    def line(self) -> str:
+        rate = self.done / self.elapsed if self.elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate else float("inf")
+        return (f"{self.done}/{self.total} prompts, {self.tokens_per_second:.1f} tokens/s, "
+                f"{self.failed} failed, ETA {eta:.0f}s")
+
+
+def run_groups(groups: List[BatchGroup], submit: Callable[[BatchGroup], Future], concurrency: int,
+               progress: Optional[BatchProgress] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Submit groups in order with at most ``concurrency`` in flight and yield
+    output records as they complete. ``submit`` returns a Future of a
+    GenerationResult (a ContinuousBatcher's, or an executor's).
+    """
+    pending = iter(groups)
+    in_flight: Dict[Future, BatchGroup] = {}
+    try:
+        while True:
+            while len(in_flight) < concurrency:
+                group = next(pending, None)
+                if group is None:
+                    break
+                in_flight[_submit(submit, group)] = group
+            if not in_flight:
+                return
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                group = in_flight.pop(future)
+                yield from _finish(group, future.result, progress)
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+async def run_groups_async(groups: List[BatchGroup], submit: Callable[[BatchGroup], Awaitable[GenerationResult]],
+                           concurrency: int, progress: Optional[BatchProgress] = None) -> AsyncIterator[Dict[str, Any]]:
+    """run_groups for coroutines, e.g. jobs submitted to the InferenceScheduler."""
+    pending = iter(groups)
+    in_flight: Dict[asyncio.Task, BatchGroup] = {}
+    try:
+        while True:
+            while len(in_flight) < concurrency:
+                group = next(pending, None)
+                if group is None:
+                    break
+                in_flight[asyncio.ensure_future(submit(group))] = group
+            if not in_flight:
+                return
+            finished, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                group = in_flight.pop(task)
+                for record in _finish(group, task.result, progress):
+                    yield record
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+def _submit(submit: Callable[[BatchGroup], Future], group: BatchGroup) -> Future:
+    try:
+        return submit(group)
+    except Exception as e:
+        future: Future = Future()
+        future.set_exception(e)
+        return future
+
+
+def _finish(group: BatchGroup, get_result: Callable[[], GenerationResult],
+            progress: Optional[BatchProgress]) -> List[Dict[str, Any]]:
+    try:
+        result: Optional[GenerationResult] = get_result()
+        records = group_records(group, result)
+    except Exception as e:
+        result = None
+        records = group_records(group, error=str(e) or type(e).__name__)
+    if progress is not None:
+        progress.update(records, result)
+    return records
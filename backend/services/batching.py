@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from backend.services.inference_scheduler import QueueFullError, SchedulerClosedError
+from backend.services.llm_service import GenerationResult, LLMService
+
+
+@dataclass
+class _Sequence:
+    prompt: str
+    max_tokens: int
+    temperature: float
+    future: Future
+    tokens: Optional[Iterator[str]] = None
+    pieces: List[str] = field(default_factory=list)
+    submitted_at: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+
+
+class ContinuousBatcher:
+    """
+    Continuous batching in front of an LLMService.
+
+    Concurrent prompts collected within a short window are decoded together,
+    one token per sequence per step, in a single forward pass of the model
+    (see LLMService.decode_step). A sequence leaves the batch as soon as it
+    finishes and a queued one takes its slot at the next step, so the batch
+    never has to drain before new work joins it.
+    """
+    def __init__(self, llm: LLMService, max_batch_size: int = 8, batch_window_ms: float = 5.0, max_pending: int = 256):
+        self.llm = llm
+        self.max_batch_size = max(1, min(max_batch_size, llm.max_batch_sequences))
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_pending = max_pending
+        self._pending: Deque[_Sequence] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.steps = 0
+        self.tokens_generated = 0
+        self.completed = 0
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7) -> Future:
+        """Queue a prompt for the next decode step; the future resolves to a GenerationResult."""
+        if not prompt.strip():
+            raise ValueError("Prompt cannot be empty.")
+        sequence = _Sequence(prompt, max_tokens, temperature, Future())
+        with self._cond:
+            if not self._running:
+                raise SchedulerClosedError("Batcher is not running.")
+            if len(self._pending) >= self.max_pending:
+                raise QueueFullError(f"Batch queue is full ({self.max_pending} prompts waiting).")
+            self._pending.append(sequence)
+            self._cond.notify()
+        return sequence.future
+
+    def generate(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7) -> GenerationResult:
+        """Blocking drop-in for LLMService.generate."""
+        return self.submit(prompt, max_tokens, temperature).result()
+
+    def _admit(self, active: List[_Sequence]) -> bool:
+        with self._cond:
+            if not active:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                # Give concurrent requests a moment to arrive so the first step starts full.
+                deadline = time.monotonic() + self.batch_window
+                while self._running and len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            if not self._running:
+                return False
+            while self._pending and len(active) < self.max_batch_size:
+                active.append(self._pending.popleft())
+        return True
+
+    def _run(self) -> None:
+        active: List[_Sequence] = []
+        while self._admit(active):
+            for sequence in active:
+                if sequence.tokens is None and not sequence.future.done():
+                    try:
+                        sequence.tokens = self.llm.open_sequence(sequence.prompt, sequence.max_tokens, sequence.temperature)
+                    except Exception as ex:
+                        sequence.future.set_exception(ex)
+            active = self._drop_finished(active)
+            if not active:
+                continue
+
+            try:
+                pieces = self.llm.decode_step([sequence.tokens for sequence in active])
+            except Exception as ex:
+                for sequence in active:
+                    if not sequence.future.done():
+                        sequence.future.set_exception(ex)
+                active = self._drop_finished(active)
+                continue
+
+            self.steps += 1
+            now = time.perf_counter()
+            for sequence, piece in zip(active, pieces):
+                if piece is None:
+                    self.completed += 1
+                    sequence.future.set_result(self._result(sequence, now))
+                elif piece:  # "" while the prompt is still being evaluated
+                    self.tokens_generated += 1
+                    sequence.pieces.append(piece)
+                    if sequence.first_token_at is None:
+                        sequence.first_token_at = now
+            active = self._drop_finished(active)
+
+        for sequence in active + list(self._pending):
+            if not sequence.future.done():
+                sequence.future.set_exception(SchedulerClosedError("Batcher is shutting down."))
+        self._drop_finished(active)
+        self._pending.clear()
+
+    def _result(self, sequence: _Sequence, finished_at: float) -> GenerationResult:
+        completion_tokens = len(sequence.pieces)
+        total_ms = (finished_at - sequence.submitted_at) * 1000
+        first_token_at = sequence.first_token_at or finished_at
+        return GenerationResult(
+            text="".join(sequence.pieces).strip(),
+            prompt_tokens=self.llm.count_tokens(sequence.prompt),
+            completion_tokens=completion_tokens,
+            decode_ms_per_token=(finished_at - first_token_at) * 1000 / max(1, completion_tokens - 1),
+            tokens_per_second=completion_tokens / (total_ms / 1000) if total_ms else None,
+            ttft_ms=(first_token_at - sequence.submitted_at) * 1000,
+            total_ms=total_ms
+        )
+
+    def _drop_finished(self, active: List[_Sequence]) -> List[_Sequence]:
+        remaining = []
+        for sequence in active:
+            if sequence.future.done():  # finished, failed or cancelled by the caller
+                close = getattr(sequence.tokens, "close", None)
+                if close is not None:
+                    close()
+            else:
+                remaining.append(sequence)
+        return remaining
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "pending": len(self._pending),
+            "steps": self.steps,
+            "tokens_generated": self.tokens_generated,
+            "completed": self.completed,
+            "avg_batch_occupancy": round(self.tokens_generated / self.steps, 3) if self.steps else 0.0,
+        }
@@ -1,10 +1,82 @@
-from cassandra.cluster import Cluster
-from typing import Any
+import re
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from backend.telemetry.tracing import traced
 
 class CassandraService:
-    def __init__(self, host: str, port: int):
-        self.cluster = Cluster([host], port=port)
-        self.session = self.cluster.connect()
+    """
+    Cassandra access through one long-lived session. Parameterized CQL is
+    prepared once and reused, so the cluster parses it once and the driver can
+    route each call straight to a replica that owns the partition
+    (token-aware, preferring ``local_dc``). Results are paged by ``fetch_size``.
+    """
+    def __init__(self, host: str, port: int, keyspace: Optional[str] = None, local_dc: Optional[str] = None,
+                 fetch_size: int = 5000, session: Optional[Any] = None):
+        self.cluster = None
+        if session is None:
+            from cassandra.cluster import EXEC_PROFILE_DEFAULT, Cluster, ExecutionProfile
+            from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+            profile = ExecutionProfile(
+                load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy(local_dc=local_dc))
+            )
+            self.cluster = Cluster([host], port=port, execution_profiles={EXEC_PROFILE_DEFAULT: profile})
+            session = self.cluster.connect(keyspace)
+        self.session = session
+        self.session.default_fetch_size = fetch_size
+        self.fetch_size = fetch_size
+        self._prepared: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def prepare(self, cql: str) -> Any:
+        """The prepared statement for ``cql`` (``%s`` or ``?`` placeholders), preparing it on first use."""
+        statement = self._prepared.get(cql)
+        if statement is None:
+            with self._lock:
+                statement = self._prepared.get(cql)
+                if statement is None:
+                    statement = self._prepared[cql] = self.session.prepare(_to_qmark(cql))
+        return statement
 
+    @traced("cassandra.execute", "cassandra")
     def execute(self, cql: str, params: tuple = ()) -> Any:
-        return self.session.execute(cql, params)
+        if params:
+            return self.session.execute(self.prepare(cql), params)
+        return self.session.execute(cql)
+
+    def execute_async(self, cql: str, params: tuple = ()) -> Any:
+        """Start the query and return the driver's ResponseFuture."""
+        if params:
+            return self.session.execute_async(self.prepare(cql), params)
+        return self.session.execute_async(cql)
+
+    def execute_concurrent(self, cql: str, params_seq: Iterable[Sequence[Any]], concurrency: int = 100,
+                           raise_on_first_error: bool = True) -> List[Any]:
+        """
+        Run one statement for every parameter set with at most ``concurrency``
+        requests in flight; returns ``(success, result_or_exception)`` pairs in input order.
+        """
+        from cassandra.concurrent import execute_concurrent_with_args
+        return execute_concurrent_with_args(
+            self.session, self.prepare(cql), params_seq,
+            concurrency=concurrency, raise_on_first_error=raise_on_first_error,
+        )
+
+    def iterate(self, cql: str, params: tuple = (), fetch_size: Optional[int] = None) -> Iterator[Any]:
+        """Yield rows page by page; the next page is requested only when the current one is consumed."""
+        if params:
+            statement = self.prepare(cql).bind(params)
+            statement.fetch_size = fetch_size or self.fetch_size
+            yield from self.session.execute(statement)
+        else:
+            from cassandra.query import SimpleStatement
+            yield from self.session.execute(SimpleStatement(cql, fetch_size=fetch_size or self.fetch_size))
+
+    def close(self) -> None:
+        if self.cluster is not None:
+            self.cluster.shutdown()
+
+def _to_qmark(cql: str) -> str:
+    # Rewrite %s placeholders outside single-quoted literals.
+    parts = re.split(r"('(?:[^']|'')*')", cql)
+    return "".join(part if part.startswith("'") else part.replace("%s", "?") for part in parts)
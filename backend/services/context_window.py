@@ -0,0 +1,134 @@
+"""
+Code Morningstar - Context Window
+Token budgeting done before any inference: a memoized tokenizer, the plan
+that decides whether a prompt plus its completion fits the model's context
+(and how much of the prompt to drop when it does not), and overlapping
+windows for map-reduce over inputs longer than any context.
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+# "error" rejects oversized prompts; the others name the part of the prompt that is kept.
+TRUNCATION_STRATEGIES = ("error", "head", "tail", "middle_out")
+
+@dataclass
+class ContextPlan:
+    """How a request fits the context: prompt size after truncation and the clamped completion length."""
+    n_ctx: int
+    prompt_tokens: int
+    max_tokens: int
+    truncated_tokens: int = 0
+
+class TokenCache:
+    """LRU of text -> token ids, so counting and then generating a prompt tokenizes it once."""
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str, tokenize: Callable[[str], Sequence[int]]) -> List[int]:
+        with self._lock:
+            tokens = self._entries.get(text)
+            if tokens is not None:
+                self._entries.move_to_end(text)
+                self.hits += 1
+                return list(tokens)
+            self.misses += 1
+        tokens = tuple(tokenize(text))
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[text] = tokens
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return list(tokens)
+
+def check_strategy(strategy: str) -> None:
+    if strategy not in TRUNCATION_STRATEGIES:
+        raise ValueError(f"Unknown truncation strategy: {strategy}")
+
+def plan_context(prompt_tokens: int, max_tokens: int, n_ctx: int, strategy: str = "error",
+                 min_completion: int = 64) -> ContextPlan:
+    """
+    Fit ``prompt_tokens`` and up to ``max_tokens`` new tokens into ``n_ctx``.
+    A prompt that leaves room for at least ``min_completion`` tokens (or all of
+    ``max_tokens``, if fewer) is kept whole and ``max_tokens`` is clamped to
+    the room left. A longer prompt raises ValueError under "error"; otherwise
+    it is cut so the completion gets ``max_tokens``, up to half the context
+    (so a prompt shorter than that is kept whole, with less room than
+    ``min_completion`` when that is above half the context).
+    """
+    check_strategy(strategy)
+    reserve = min(max_tokens, min_completion)
+    if prompt_tokens + reserve <= n_ctx:
+        return ContextPlan(n_ctx, prompt_tokens, min(max_tokens, n_ctx - prompt_tokens))
+    if strategy == "error":
+        raise ValueError(
+            f"Prompt is {prompt_tokens} tokens; a {n_ctx}-token context fits at most "
+            f"{n_ctx - reserve} with {reserve} tokens left to generate. Shorten it or pick a truncation strategy."
+        )
+    keep = min(prompt_tokens, n_ctx - min(max_tokens, n_ctx // 2))
+    return ContextPlan(n_ctx, keep, min(max_tokens, n_ctx - keep), truncated_tokens=prompt_tokens - keep)
+
+def truncate(tokens: Sequence[Any], keep: int, strategy: str) -> List[Any]:
+    """The ``keep`` tokens a strategy retains: the head, the tail, or both ends (middle_out)."""
+    tokens = list(tokens)
+    if keep >= len(tokens):
+        return tokens
+    if keep <= 0:
+        return []
+    if strategy == "head":
+        return tokens[:keep]
+    if strategy == "tail":
+        return tokens[-keep:]
+    if strategy == "middle_out":
+        tail = keep // 2
+        return tokens[:keep - tail] + (tokens[-tail:] if tail else [])
+    raise ValueError(f"Cannot truncate with strategy: {strategy}")
+
+def windows(length: int, window: int, overlap: int) -> List[Tuple[int, int]]:
+    """[start, end) token ranges of ``window`` tokens covering ``length``, each overlapping the previous by ``overlap``."""
+    if window <= overlap:
+        raise ValueError(f"Window ({window} tokens) must be larger than the overlap ({overlap} tokens).")
+    if length <= window:
+        return [(0, length)]
+    ranges = []
+    start = 0
+    while True:
+        end = min(start + window, length)
+        ranges.append((start, end))
+        if end == length:
+            return ranges
+        start = end - overlap
+
+def map_prompt(instruction: str, chunk: str, index: int, total: int) -> str:
+    return f"{instruction}\n\n[Part {index + 1} of {total}]\n{chunk}"
+
+def reduce_prompt(instruction: str, answers: Sequence[str]) -> str:
+    parts = "\n\n".join(f"[Part {index + 1}]\n{answer}" for index, answer in enumerate(answers))
+    return f"{instruction}\n\nCombine these answers, one per part of the input, into a single answer:\n\n{parts}"
+
+async def map_reduce(chunks: Sequence[str], instruction: str,
+                     run: Callable[[str, Optional[str]], Awaitable[Any]], concurrency: int = 1,
+                     reduce: bool = True) -> Tuple[List[Any], Optional[Any]]:
+    """
+    Run ``instruction`` over every chunk, at most ``concurrency`` at a time,
+    then once more over the partial answers. ``run(prompt, truncation)``
+    generates one completion; the reduce step truncates middle_out so the
+    instruction and the last answers survive an oversized combination.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(index: int, chunk: str) -> Any:
+        async with semaphore:
+            return await run(map_prompt(instruction, chunk, index, len(chunks)), None)
+
+    parts = list(await asyncio.gather(*(one(index, chunk) for index, chunk in enumerate(chunks))))
+    if not reduce or len(parts) < 2:
+        return parts, None
+    combined = await run(reduce_prompt(instruction, [part.text for part in parts]), "middle_out")
+    return parts, combined
@@ -0,0 +1,286 @@
+"""
+Endpoints, replica sets and shards behind DatabaseRouter.
+
+An Endpoint wraps one service (one node) and records latency, in-flight
+calls and failures for every call made through it. A DatabaseCluster is a
+primary plus read replicas; reads go to the healthy replica with the lowest
+expected wait. A ShardedDatabase maps a tenant key to one cluster with a
+consistent-hash ring, so adding a shard only moves a fraction of the keys.
+"""
+import bisect
+import functools
+import hashlib
+import inspect
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from backend.telemetry.metrics import REGISTRY
+
+QUERY_SECONDS = REGISTRY.histogram("db_query_seconds", "Database call latency by endpoint")
+QUERY_ERRORS = REGISTRY.counter("db_query_errors_total", "Failed database calls by endpoint")
+
+
+class NoHealthyEndpointError(RuntimeError):
+    """Raised when every endpoint able to serve a call is down or tripped."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is made through an endpoint whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed → open after ``failure_threshold`` consecutive failures; after
+    ``reset_timeout`` seconds one trial call is let through (half-open) and
+    its outcome closes or re-opens the breaker.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def available(self) -> bool:
+        """Whether a call could be let through now (without claiming the half-open trial)."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self._trial_in_flight)
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class Endpoint:
+    """
+    One database node. Public methods of ``service`` are proxied and timed;
+    failures feed the circuit breaker. ``probe`` is the health check, by
+    default ``service.execute("SELECT 1")``.
+    """
+    def __init__(self, name: str, service: Any, role: str = "replica", weight: float = 1.0,
+                 probe: Optional[Callable[[Any], Any]] = None, breaker: Optional[CircuitBreaker] = None,
+                 window: int = 256, smoothing: float = 0.2):
+        self.name = name
+        self.service = service
+        self.role = role
+        self.weight = weight
+        self.probe = probe or _default_probe
+        self.breaker = breaker or CircuitBreaker()
+        self.smoothing = smoothing
+        self.healthy = True
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.latency_ewma: Optional[float] = None
+        self._latencies: "deque[float]" = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and self.breaker.available()
+
+    def load_score(self) -> float:
+        """Expected wait for one more call: (in-flight + 1) × typical latency, divided by weight."""
+        latency = self.latency_ewma if self.latency_ewma is not None else 0.001
+        return (self.in_flight + 1) * latency / self.weight
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit open for endpoint {self.name!r}")
+        with self._lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._finish(time.perf_counter() - start, failed=True)
+            self.breaker.record_failure()
+            raise
+        if inspect.isgenerator(result):
+            # Streaming methods (``iterate``) do their work as rows are pulled.
+            return self._iterate(result, start)
+        self._finish(time.perf_counter() - start, failed=False)
+        self.breaker.record_success()
+        return result
+
+    def _iterate(self, rows: Iterator[Any], start: float) -> Iterator[Any]:
+        """Time and count a streaming call from its start until it is exhausted or closed."""
+        failed = False
+        try:
+            yield from rows
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._finish(time.perf_counter() - start, failed=failed)
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+    def check_health(self) -> bool:
+        """Run the probe directly (bypassing the breaker) and update ``healthy``."""
+        try:
+            self.probe(self.service)
+        except Exception as e:
+            if self.healthy:
+                print(f"Warning: database endpoint {self.name!r} failed its health check: {e}")
+            self.healthy = False
+        else:
+            if not self.healthy:
+                self.breaker.record_success()
+            self.healthy = True
+        return self.healthy
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                "role": self.role,
+                "healthy": self.healthy,
+                "circuit": self.breaker.state,
+                "in_flight": self.in_flight,
+                "requests": self.requests,
+                "errors": self.errors,
+                "latency_ms_avg": round(self.latency_ewma * 1000, 3) if self.latency_ewma is not None else None,
+            }
+        for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            stats[f"latency_ms_{label}"] = round(_percentile(latencies, q) * 1000, 3) if latencies else None
+        return stats
+
+    def _finish(self, elapsed: float, failed: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.requests += 1
+            self._latencies.append(elapsed)
+            if self.latency_ewma is None:
+                self.latency_ewma = elapsed
+            else:
+                self.latency_ewma += self.smoothing * (elapsed - self.latency_ewma)
+            if failed:
+                self.errors += 1
+        QUERY_SECONDS.observe(elapsed, endpoint=self.name)
+        if failed:
+            QUERY_ERRORS.inc(endpoint=self.name)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self.service, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return self.call(attr, *args, **kwargs)
+        return call
+
+
+class DatabaseCluster:
+    """A primary and its read replicas."""
+    def __init__(self, primary: Endpoint, replicas: Sequence[Endpoint] = ()):
+        primary.role = "primary"
+        self.primary = primary
+        self.replicas = list(replicas)
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        return [self.primary] + self.replicas
+
+    def writer(self) -> Endpoint:
+        if not self.primary.available:
+            raise NoHealthyEndpointError(f"Primary {self.primary.name!r} is unavailable")
+        return self.primary
+
+    def reader(self) -> Endpoint:
+        """The least-loaded available replica, else the primary."""
+        candidates = [endpoint for endpoint in self.replicas if endpoint.available]
+        if not candidates:
+            if self.primary.available:
+                return self.primary
+            raise NoHealthyEndpointError("No healthy endpoint for reads")
+        return min(candidates, key=Endpoint.load_score)
+
+
+class HashRing:
+    """Consistent-hash ring with ``vnodes`` virtual points per node."""
+    def __init__(self, nodes: Sequence[str] = (), vnodes: int = 100):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: str) -> None:
+        for i in range(self.vnodes):
+            point = _hash(f"{node}#{i}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        kept = [(p, o) for p, o in zip(self._points, self._owners) if o != node]
+        self._points = [p for p, _ in kept]
+        self._owners = [o for _, o in kept]
+
+    def get(self, key: str) -> str:
+        if not self._points:
+            raise ValueError("Hash ring has no nodes")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class ShardedDatabase:
+    """Named shards, each a DatabaseCluster, selected by a consistent hash of the shard key."""
+    def __init__(self, shards: Dict[str, DatabaseCluster], vnodes: int = 100):
+        self.shards = dict(shards)
+        self.ring = HashRing(list(self.shards), vnodes)
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        return [endpoint for cluster in self.shards.values() for endpoint in cluster.endpoints]
+
+    def for_key(self, key: Any) -> DatabaseCluster:
+        return self.shards[self.ring.get(str(key))]
+
+
+def _default_probe(service: Any) -> Any:
+    return service.execute("SELECT 1")
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
@@ -1,12 +1,99 @@
+import threading
+from typing import Any, Dict, Optional, Union
+
+from backend.services.async_services import ThreadOffloadService
+from backend.services.db_cluster import DatabaseCluster, Endpoint, ShardedDatabase
+
 class DatabaseRouter:
     """
     Production-grade, pluggable DB router for multi-DB/multi-tenant patterns.
+
+    ``get_service(db_type, use_async=True)`` returns the async counterpart:
+    the one registered in ``async_services`` or, failing that, the sync
+    service wrapped in a bounded thread offload. Both take the same query
+    text: AsyncPostgresService accepts PostgresService's ``%s`` placeholders.
+
+    Logical databases registered with ``add_cluster`` are served by several
+    endpoints: writes go to the primary, ``readonly=True`` calls to the
+    least-loaded healthy replica, and a ``shard_key`` picks the tenant's shard.
+    ``start_health_checks`` probes every endpoint in the background.
     """
-    def __init__(self, db_services: dict):
+    def __init__(self, db_services: dict, async_services: Optional[dict] = None, offload_workers: int = 8):
         self._db_services = db_services
+        self._async_services: Dict[str, Any] = dict(async_services or {})
+        self._offload_workers = offload_workers
+        self._clusters: Dict[str, Union[DatabaseCluster, ShardedDatabase]] = {}
+        self._endpoint_offloads: Dict[int, ThreadOffloadService] = {}
+        self._health_stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def add_cluster(self, db_type: str, cluster: Union[DatabaseCluster, ShardedDatabase]) -> None:
+        self._clusters[db_type] = cluster
 
-    def get_service(self, db_type: str):
+    def get_service(self, db_type: str, use_async: bool = False, readonly: bool = False,
+                    shard_key: Optional[Any] = None):
+        cluster = self._clusters.get(db_type)
+        if cluster is not None:
+            endpoint = self._select_endpoint(cluster, readonly, shard_key)
+            return self._offload_endpoint(endpoint) if use_async else endpoint
+        if use_async:
+            return self._get_async_service(db_type)
         service = self._db_services.get(db_type)
         if not service:
             raise ValueError(f"Unsupported database type: {db_type}")
         return service
+
+    def _select_endpoint(self, cluster: Union[DatabaseCluster, ShardedDatabase], readonly: bool,
+                         shard_key: Optional[Any]) -> Endpoint:
+        if isinstance(cluster, ShardedDatabase):
+            if shard_key is None:
+                raise ValueError("A shard_key is required for a sharded database")
+            cluster = cluster.for_key(shard_key)
+        return cluster.reader() if readonly else cluster.writer()
+
+    def _offload_endpoint(self, endpoint: Endpoint) -> ThreadOffloadService:
+        service = self._endpoint_offloads.get(id(endpoint))
+        if service is None:
+            service = self._endpoint_offloads[id(endpoint)] = ThreadOffloadService(endpoint, self._offload_workers)
+        return service
+
+    def _get_async_service(self, db_type: str):
+        service = self._async_services.get(db_type)
+        if service is None:
+            sync_service = self._db_services.get(db_type)
+            if not sync_service:
+                raise ValueError(f"Unsupported database type: {db_type}")
+            service = self._async_services[db_type] = ThreadOffloadService(sync_service, self._offload_workers)
+        return service
+
+    def endpoints(self) -> Dict[str, Endpoint]:
+        return {
+            endpoint.name: endpoint
+            for cluster in self._clusters.values()
+            for endpoint in cluster.endpoints
+        }
+
+    def check_health(self) -> Dict[str, bool]:
+        return {name: endpoint.check_health() for name, endpoint in self.endpoints().items()}
+
+    def start_health_checks(self, interval: float = 10.0) -> None:
+        if self._health_thread is not None:
+            return
+        self._health_stop.clear()
+
+        def loop():
+            while not self._health_stop.wait(interval):
+                self.check_health()
+
+        self._health_thread = threading.Thread(target=loop, name="db-health", daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self) -> None:
+        self._health_stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint health, circuit state, load and latency percentiles."""
+        return {name: endpoint.stats() for name, endpoint in self.endpoints().items()}
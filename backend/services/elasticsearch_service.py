@@ -1,9 +1,83 @@
-from elasticsearch import Elasticsearch
-from typing import Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from backend.telemetry.tracing import traced
 
 class ElasticsearchService:
-    def __init__(self, host: str, port: int):
-        self.client = Elasticsearch([{"host": host, "port": port}])
+    def __init__(self, host: str, port: int, client: Optional[Any] = None):
+        if client is None:
+            from elasticsearch import Elasticsearch
+            client = Elasticsearch([{"host": host, "port": port}])
+        self.client = client
 
+    @traced("elasticsearch.search", "elasticsearch", statement=False)
     def search(self, index: str, query: dict) -> Any:
         return self.client.search(index=index, body=query)
+
+    def bulk_index(self, index: str, documents: Iterable[Dict[str, Any]], id_field: Optional[str] = None,
+                   chunk_size: int = 500, max_chunk_bytes: int = 10 * 1024 * 1024, max_retries: int = 3,
+                   initial_backoff: float = 2.0, thread_count: int = 1, max_errors: int = 100) -> Dict[str, Any]:
+        """
+        Index ``documents`` (any iterable, consumed lazily) through the bulk API
+        in requests of at most ``chunk_size`` documents / ``max_chunk_bytes``.
+        Single-threaded, documents rejected with 429 are retried with
+        exponential backoff; ``thread_count`` > 1 sends chunks in parallel
+        without retries. Returns counts and the first ``max_errors`` failures.
+        """
+        from elasticsearch import helpers
+        actions = (_index_action(index, document, id_field) for document in documents)
+        if thread_count > 1:
+            results = helpers.parallel_bulk(
+                self.client, actions, thread_count=thread_count, chunk_size=chunk_size,
+                max_chunk_bytes=max_chunk_bytes, raise_on_error=False, raise_on_exception=False,
+            )
+        else:
+            results = helpers.streaming_bulk(
+                self.client, actions, chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes,
+                max_retries=max_retries, initial_backoff=initial_backoff, raise_on_error=False, raise_on_exception=False,
+            )
+        summary: Dict[str, Any] = {"indexed": 0, "failed": 0, "errors": []}
+        for ok, item in results:
+            if ok:
+                summary["indexed"] += 1
+                continue
+            summary["failed"] += 1
+            if len(summary["errors"]) < max_errors:
+                summary["errors"].append(item)
+        return summary
+
+    def export(self, index: str, query: Optional[dict] = None, batch_size: int = 1000,
+               keep_alive: str = "1m", sort: Optional[List[Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every hit of ``query`` using a point-in-time and ``search_after``,
+        ``batch_size`` hits per request, without the 10k ``from + size`` limit.
+        """
+        pit_id = self.client.open_point_in_time(index=index, keep_alive=keep_alive)["id"]
+        try:
+            search_after = None
+            while True:
+                response = self.client.search(
+                    pit={"id": pit_id, "keep_alive": keep_alive},
+                    query=query or {"match_all": {}},
+                    size=batch_size,
+                    sort=sort or [{"_shard_doc": "asc"}],
+                    search_after=search_after,
+                )
+                pit_id = response.get("pit_id", pit_id)
+                hits = response["hits"]["hits"]
+                if not hits:
+                    break
+                yield from hits
+                if len(hits) < batch_size:
+                    break
+                search_after = hits[-1]["sort"]
+        finally:
+            try:
+                self.client.close_point_in_time(id=pit_id)
+            except Exception as e:
+                print(f"Warning: could not close Elasticsearch point-in-time: {e}")
+
+def _index_action(index: str, document: Dict[str, Any], id_field: Optional[str]) -> Dict[str, Any]:
+    action = {"_index": index, "_source": document}
+    if id_field is not None:
+        action["_id"] = document[id_field]
+    return action
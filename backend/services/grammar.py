@@ -0,0 +1,133 @@
+"""
+Code Morningstar - Constrained Generation
+JSON schemas and GBNF grammars compiled to llama.cpp ``LlamaGrammar`` objects,
+which mask every token the grammar does not allow while sampling. Compiling a
+schema (schema -> GBNF -> parsed rules) costs milliseconds, so compiled
+grammars are kept in a per-model LRU keyed by a hash of their source.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+def grammar_key(json_schema: Optional[Dict[str, Any]] = None, grammar: Optional[str] = None) -> str:
+    """Stable hash of a constraint; key order in the schema does not matter."""
+    if json_schema is not None:
+        source = "schema:" + json.dumps(json_schema, sort_keys=True, separators=(",", ":"))
+    else:
+        source = "gbnf:" + (grammar or "")
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+def check_constraint(json_schema: Optional[Dict[str, Any]], grammar: Optional[str]) -> None:
+    if json_schema is not None and grammar is not None:
+        raise ValueError("Pass either json_schema or grammar, not both.")
+    if grammar is not None and not grammar.strip():
+        raise ValueError("Grammar cannot be empty.")
+
+class GrammarCache:
+    """LRU of compiled grammars. ``compile_schema``/``compile_gbnf`` build one on a miss."""
+    def __init__(self, max_entries: int = 64, compile_schema: Optional[Callable[[str], Any]] = None,
+                 compile_gbnf: Optional[Callable[[str], Any]] = None):
+        self.max_entries = max_entries
+        self.compile_schema = compile_schema
+        self.compile_gbnf = compile_gbnf
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_llama_cpp(cls, llama_cpp: Any, max_entries: int = 64) -> "GrammarCache":
+        grammar = llama_cpp.LlamaGrammar
+        return cls(
+            max_entries,
+            compile_schema=lambda schema: grammar.from_json_schema(schema, verbose=False),
+            compile_gbnf=lambda gbnf: grammar.from_string(gbnf, verbose=False),
+        )
+
+    def get(self, json_schema: Optional[Dict[str, Any]] = None, grammar: Optional[str] = None) -> Tuple[Any, bool]:
+        """The compiled grammar for a schema or GBNF source, and whether it was cached."""
+        check_constraint(json_schema, grammar)
+        key = grammar_key(json_schema, grammar)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled, True
+            self.misses += 1
+        try:
+            if json_schema is not None:
+                compiled = self.compile_schema(json.dumps(json_schema))
+            else:
+                compiled = self.compile_gbnf(grammar)
+        except Exception as e:
+            kind = "JSON schema" if json_schema is not None else "grammar"
+            raise ValueError(f"Invalid {kind}: {e}")
+        with self._lock:
+            self._entries[key] = compiled
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compiled, False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class JsonEndScanner:
+    """
+    Tracks bracket depth over streamed text, outside string literals, and
+    reports when the top-level object or array has closed. The grammar would
+    still allow trailing whitespace before end-of-text; stopping here saves
+    those tokens.
+    """
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> bool:
+        for char in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+                self.started = True
+            elif char in "}]":
+                self.depth -= 1
+                if self.started and self.depth == 0:
+                    return True
+        return False
+
+def mock_instance(schema: Dict[str, Any]) -> Any:
+    """A minimal value matching ``schema``, for mock mode: required properties, first enum value, zero."""
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if schema.get(combinator):
+            return mock_instance(schema[combinator][0])
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = kind[0]
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {name: mock_instance(properties.get(name, {})) for name in schema.get("required", [])}
+    if kind == "array":
+        return [mock_instance(schema.get("items", {})) for _ in range(schema.get("minItems", 0))]
+    if kind == "string":
+        return "x" * schema.get("minLength", 0)
+    if kind in ("integer", "number"):
+        return schema.get("minimum", 0)
+    if kind == "boolean":
+        return False
+    return None
@@ -0,0 +1,258 @@
+import asyncio
+import contextvars
+import functools
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+
+class SchedulerError(Exception):
+    """Base class for requests the scheduler could not run."""
+
+class QueueFullError(SchedulerError):
+    """The request queue is saturated; the client should retry later."""
+
+class DeadlineExceededError(SchedulerError):
+    """The request did not finish before its deadline."""
+
+class SchedulerClosedError(SchedulerError):
+    """The scheduler is not accepting work (not started or shutting down)."""
+
+
+_END = object()
+
+@dataclass
+class _Job:
+    fn: Callable[[], Any]
+    future: asyncio.Future
+    enqueued_at: float
+    deadline: Optional[float] = None
+    started_at: Optional[float] = None
+
+
+class TokenStream:
+    """
+    Pieces of a streamed generation, produced on a scheduler worker and read
+    with ``async for``. The worker never waits on the reader: pieces are
+    buffered (at most a generation's max_tokens of them), so a slow client
+    does not keep the model busy. close() stops the worker at the next piece.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._pieces: asyncio.Queue = asyncio.Queue()
+        self._closed = threading.Event()
+        self._finished = False
+        self.future: Optional[asyncio.Future] = None
+
+    def _drain(self, source: Iterator[Any], deadline: Optional[float]) -> int:
+        """Runs on the worker: move ``source`` into the buffer until it ends, is closed or runs out of time."""
+        count = 0
+        try:
+            for piece in source:
+                if self._closed.is_set():
+                    break
+                self._loop.call_soon_threadsafe(self._pieces.put_nowait, piece)
+                count += 1
+                if deadline is not None and time.monotonic() > deadline:
+                    raise DeadlineExceededError("Stream did not complete within its deadline.")
+        finally:
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+        return count
+
+    def _end(self, future: asyncio.Future) -> None:
+        # Done callbacks run on the loop after the pieces the worker queued.
+        self._pieces.put_nowait(_END)
+
+    def __aiter__(self) -> "TokenStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        if self._finished:
+            raise StopAsyncIteration
+        piece = await self._pieces.get()
+        if piece is _END:
+            self._finished = True
+            if not self.future.cancelled():
+                self.future.result()  # re-raise what stopped the worker
+            raise StopAsyncIteration
+        return piece
+
+    def close(self) -> None:
+        self._closed.set()
+        if self.future is not None and not self.future.done():
+            self.future.cancel()  # dropped if still queued
+
+
+class InferenceScheduler:
+    """
+    Runs blocking inference calls on a dedicated worker pool so the event loop
+    stays responsive. Requests wait in a bounded priority queue (lower number
+    runs first) and are rejected up front when the queue is full.
+    """
+    def __init__(self, max_workers: int = 1, max_queue_size: int = 32, default_timeout: Optional[float] = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be at least 1.")
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.default_timeout = default_timeout
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._wait_times: Deque[float] = deque(maxlen=1024)
+        self.active = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+
+    @classmethod
+    def from_settings(cls, settings: Any, n_threads: int) -> "InferenceScheduler":
+        """Size the pool so that workers * n_threads does not oversubscribe the CPU."""
+        workers = settings.LLM_INFERENCE_WORKERS or max(1, (os.cpu_count() or 1) // max(1, n_threads))
+        return cls(
+            max_workers=workers,
+            max_queue_size=settings.LLM_MAX_QUEUE_SIZE,
+            default_timeout=settings.LLM_REQUEST_DEADLINE_S or None,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def start(self) -> None:
+        """Start the workers. Must be called from the serving event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers. Queued and running requests fail with SchedulerClosedError."""
+        if not self.running:
+            return
+        queue, self._queue = self._queue, None
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not queue.empty():
+            _, _, job = queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(SchedulerClosedError("Inference scheduler is shutting down."))
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    async def submit(self, fn: Callable[..., Any], *args: Any, priority: int = 0,
+                     timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Queue ``fn(*args, **kwargs)`` and wait for its result.
+
+        Raises QueueFullError when the queue is saturated and
+        DeadlineExceededError when the result is not ready within ``timeout``
+        seconds (a job that has not started by then is dropped).
+        """
+        timeout = timeout if timeout is not None else self.default_timeout
+        job = self._enqueue(functools.partial(fn, *args, **kwargs), priority, timeout)
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), timeout)
+        except asyncio.TimeoutError:
+            if job.started_at is None:
+                self.expired += 1
+            job.future.cancel()
+            raise DeadlineExceededError(f"Request did not complete within {timeout:g}s.")
+
+    def submit_stream(self, source: Iterator[Any], priority: int = 0, timeout: Optional[float] = None) -> TokenStream:
+        """
+        Queue the iteration of ``source`` (a lazy generator, such as
+        LLMService.generate_stream returns) and return its pieces as a
+        TokenStream. Queue limits and priority apply as for submit; the
+        deadline also stops a stream that is still running when it passes.
+        """
+        timeout = timeout if timeout is not None else self.default_timeout
+        stream = TokenStream(asyncio.get_running_loop())
+        deadline = time.monotonic() + timeout if timeout else None
+        job = self._enqueue(functools.partial(stream._drain, source, deadline), priority, timeout)
+        stream.future = job.future
+        job.future.add_done_callback(stream._end)
+        return stream
+
+    def _enqueue(self, fn: Callable[[], Any], priority: int, timeout: Optional[float]) -> _Job:
+        if not self.running:
+            raise SchedulerClosedError("Inference scheduler is not running.")
+        if self._queue.full():
+            self.rejected += 1
+            raise QueueFullError(f"Inference queue is full ({self.max_queue_size} requests waiting).")
+        now = time.monotonic()
+        job = _Job(
+            # Run in the submitter's context so tracing spans follow the job to its worker thread.
+            fn=functools.partial(contextvars.copy_context().run, fn),
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=now,
+            deadline=now + timeout if timeout else None,
+        )
+        self._queue.put_nowait((priority, next(self._sequence), job))
+        self.submitted += 1
+        return job
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            _, _, job = await queue.get()
+            try:
+                if job.future.done():
+                    continue  # the caller gave up while the job was queued
+                job.started_at = time.monotonic()
+                self._wait_times.append(job.started_at - job.enqueued_at)
+                if job.deadline is not None and job.started_at > job.deadline:
+                    self.expired += 1
+                    job.future.set_exception(DeadlineExceededError("Request expired while queued."))
+                    continue
+                self.active += 1
+                try:
+                    result = await loop.run_in_executor(self._executor, job.fn)
+                except asyncio.CancelledError:
+                    # stop() cancelled this worker; its thread may still finish, but nobody will collect it.
+                    if not job.future.done():
+                        job.future.set_exception(SchedulerClosedError("Inference scheduler shut down mid-request."))
+                    raise
+                except Exception as ex:
+                    if not job.future.done():
+                        job.future.set_exception(ex)
+                else:
+                    if not job.future.done():
+                        job.future.set_result(result)
+                finally:
+                    self.active -= 1
+                    self.completed += 1
+            finally:
+                queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and queue wait times (in ms)."""
+        waits = sorted(self._wait_times)
+        return {
+            "running": self.running,
+            "workers": self.max_workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "active": self.active,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "wait_time_avg_ms": round(1000 * sum(waits) / len(waits), 3) if waits else 0.0,
+            "wait_time_p95_ms": round(1000 * waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+            "wait_time_max_ms": round(1000 * waits[-1], 3) if waits else 0.0,
+        }
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+
+def make_cache_key(model: str, prompt: str, **params: Any) -> str:
+    """Stable key for a generation call: model + prompt + sampling parameters."""
+    payload = json.dumps({"model": model, "prompt": prompt, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Exact-match cache of completed generations, for deterministic
+    (temperature 0) calls only. Entries live in an in-process LRU with a TTL
+    and, optionally, in Redis so that several workers share hits.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, redis: Optional[Any] = None,
+                 namespace: str = "llm:response:"):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis = redis
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "ResponseCache":
+        redis = None
+        if settings.REDIS_HOST:
+            from backend.services.redis_service import RedisService
+            redis = RedisService.from_settings(settings)
+        return cls(
+            max_entries=settings.LLM_RESPONSE_CACHE_SIZE,
+            ttl_seconds=settings.LLM_RESPONSE_CACHE_TTL_S,
+            redis=redis,
+        )
+
+    @staticmethod
+    def is_cacheable(temperature: float) -> bool:
+        return temperature == 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._redis_get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._store_local(key, value)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._store_local(key, value)
+        if self.redis is not None:
+            try:
+                self.redis.set(self.namespace + key, json.dumps(value), ex=int(self.ttl_seconds) or None)
+            except Exception as e:
+                print(f"Warning: could not write response cache entry to Redis: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _store_local(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.redis is None:
+            return None
+        try:
+            raw = self.redis.get(self.namespace + key)
+        except Exception as e:
+            print(f"Warning: could not read response cache entry from Redis: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+
+class PrefixCache:
+    """
+    Saved llama.cpp states keyed by the tokens they contain. Restoring the
+    state that shares the longest prefix with a new prompt means only the
+    remaining suffix has to be evaluated. Bounded by total state size, LRU.
+    A state is only worth saving for a prompt whose opening tokens have been
+    seen before (a shared system prompt, a repeated document); one-off
+    prompts are not snapshotted.
+    """
+    def __init__(self, max_bytes: int, min_prefix_tokens: int = 16, max_seen: int = 1024):
+        self.max_bytes = max_bytes
+        self.min_prefix_tokens = min_prefix_tokens
+        self.max_seen = max_seen
+        self._states: "OrderedDict[Tuple[int, ...], Tuple[Any, int]]" = OrderedDict()
+        # Opening min_prefix_tokens of recent prompts, LRU.
+        self._seen: "OrderedDict[Tuple[int, ...], None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    def lookup(self, tokens: Sequence[int]) -> Tuple[Optional[Any], int]:
+        """Return the state sharing the longest usable prefix with ``tokens`` and that prefix length."""
+        best_key, best_len = None, 0
+        with self._lock:
+            for key in self._states:
+                length = _common_prefix_length(key, tokens)
+                if length > best_len:
+                    best_key, best_len = key, length
+            # The last prompt token is always re-evaluated to produce logits.
+            best_len = min(best_len, len(tokens) - 1)
+            if best_key is None or best_len < self.min_prefix_tokens:
+                self.misses += 1
+                return None, 0
+            self._states.move_to_end(best_key)
+            self.hits += 1
+            self.tokens_saved += best_len
+            return self._states[best_key][0], best_len
+
+    def covers(self, tokens: Sequence[int]) -> bool:
+        """True when a saved state already contains all of ``tokens``."""
+        with self._lock:
+            return self._covers(tokens)
+
+    def _covers(self, tokens: Sequence[int]) -> bool:
+        return any(_common_prefix_length(key, tokens) >= len(tokens) for key in self._states)
+
+    def should_save(self, tokens: Sequence[int]) -> bool:
+        """
+        Record a prompt and decide whether to snapshot the context after it:
+        it is long enough, an earlier prompt opened the same way, and no saved
+        state already covers it.
+        """
+        if len(tokens) < self.min_prefix_tokens:
+            return False
+        head = tuple(tokens[:self.min_prefix_tokens])
+        with self._lock:
+            seen = head in self._seen
+            self._seen[head] = None
+            self._seen.move_to_end(head)
+            if len(self._seen) > self.max_seen:
+                self._seen.popitem(last=False)
+            if not seen:
+                return False
+            return not self._covers(tokens)
+
+    def store(self, tokens: Sequence[int], state: Any, size: int) -> None:
+        if len(tokens) < self.min_prefix_tokens or size > self.max_bytes:
+            return
+        key = tuple(tokens)
+        with self._lock:
+            self._states[key] = (state, size)
+            self._states.move_to_end(key)
+            while sum(entry_size for _, entry_size in self._states.values()) > self.max_bytes:
+                self._states.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._states),
+            "bytes": sum(size for _, size in self._states.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+def _common_prefix_length(a: Sequence[int], b: Sequence[int]) -> int:
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
@@ -1,65 +1,546 @@
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Union, Any
+from typing import Dict, Optional, Union, Any, Iterator, List, Tuple
+import json
 import os
+import re
+import sys
+import threading
+import time
+import zlib
 
-try:
-    from llama_cpp import Llama
-    LLAMA_CPP_AVAILABLE = True
-except ImportError:
-    LLAMA_CPP_AVAILABLE = False
-    Llama = None
+from backend.services.batch_decoder import BatchDecoder, DecodeSequence, supports_batching
+from backend.services.context_window import (ContextPlan, TokenCache, check_strategy, map_prompt, plan_context,
+                                              truncate, windows)
+from backend.services.grammar import GrammarCache, JsonEndScanner, check_constraint, mock_instance
+from backend.services.llm_cache import PrefixCache
+from backend.services.speculative import SPECULATIVE_MODES, CountingDraft, make_draft
+from backend.telemetry.tracing import TRACER, span
+
+# llama_cpp is imported on the first model load (see _llama_cpp), not at module import.
+llama_cpp: Optional[Any] = None
+
+STOP_SEQUENCES = ["Human:", "Assistant:", "\n\n"]
+
+@dataclass
+class GenerationResult:
+    """Generated text plus how it was produced. Times are in milliseconds."""
+    text: str
+    cache: str = "miss"
+    tokens_saved: int = 0
+    error: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    prompt_eval_ms: Optional[float] = None
+    decode_ms_per_token: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    ttft_ms: Optional[float] = None
+    queue_wait_ms: float = 0.0
+    total_ms: float = 0.0
+    speculative: Optional[str] = None
+    draft_tokens: int = 0
+    accepted_tokens: int = 0
+    acceptance_rate: Optional[float] = None
+    speedup: Optional[float] = None
+    truncated_tokens: int = 0
 
 class LLMService:
     """
     Local GGUF LLM inference service for Code Morningstar.
     """
-    def __init__(self, model_path: str, n_ctx: int = 2048, n_threads: int = -1):
+    def __init__(self, model_path: str, n_ctx: int = 2048, n_threads: int = -1, mock_token_delay: float = 0.0,
+                 prefix_cache_bytes: int = 0, use_mmap: bool = True, use_mlock: bool = False,
+                 speculative: str = "off", draft_model_path: Optional[str] = None, draft_tokens: int = 8,
+                 grammar_cache_size: int = 64, truncation: str = "error", min_completion_tokens: int = 64,
+                 tokenizer_cache_size: int = 1024, batch_slots: int = 1, mock_batch_cost: float = 1.0):
         self.model_path = Path(model_path)
         self.n_ctx = n_ctx
         self.n_threads = n_threads if n_threads > 0 else os.cpu_count()
+        # mmap shares the weights' page cache between processes; mlock pins them in RAM.
+        self.use_mmap = use_mmap
+        self.use_mlock = use_mlock
+        # Simulated per-token latency in mock mode, for benchmarks. A batched step costs
+        # mock_token_delay * (1 + mock_batch_cost * (sequences - 1)): 1.0 means batching gains nothing.
+        self.mock_token_delay = mock_token_delay
+        self.mock_batch_cost = mock_batch_cost
+        # Sequences decode_step can advance together; more than one needs a multi-sequence context.
+        self.batch_slots = max(1, batch_slots)
+        self._batch_decoder: Optional[BatchDecoder] = None
+        # Guards creating, stepping and closing the batch decoder; separate from the
+        # model's own context, so batched and plain requests still run side by side.
+        self._batch_lock = threading.Lock()
+        self.prefix_cache: Optional[PrefixCache] = PrefixCache(prefix_cache_bytes) if prefix_cache_bytes > 0 else None
+        if speculative not in SPECULATIVE_MODES:
+            raise ValueError(f"Unknown speculative mode: {speculative}")
+        # Default drafting mode; requests may pick another or turn it off.
+        self.speculative = speculative
+        self.draft_model_path = Path(draft_model_path) if draft_model_path else None
+        self.draft_tokens = draft_tokens
+        self._drafts: Dict[str, CountingDraft] = {}
+        check_strategy(truncation)
+        # What to do with prompts that leave fewer than min_completion_tokens of context.
+        self.truncation = truncation
+        self.min_completion_tokens = min_completion_tokens
+        self.token_cache = TokenCache(tokenizer_cache_size)
+        # Running average of plain decode time per token, the baseline for reported speedups.
+        self._plain_decode_ms: Optional[float] = None
+        # A llama.cpp context is not thread-safe; the service is shared across requests.
+        self._lock = threading.Lock()
         self._llm: Optional[Any] = self._load_model()
+        if self._llm is None and self.speculative != "off":
+            # Mock mode drafts nothing, but checks requested modes against the same proposers.
+            self._load_drafts(load_model=False)
+        # Compiled JSON-schema/GBNF grammars; only built when a real model is loaded.
+        self.grammar_cache: Optional[GrammarCache] = (
+            GrammarCache.for_llama_cpp(llama_cpp, grammar_cache_size) if self._llm is not None else None
+        )
 
     def _load_model(self) -> Optional[Any]:
-        if not LLAMA_CPP_AVAILABLE or Llama is None:
-            print("Warning: llama-cpp-python not available. Using mock responses.")
-            return None
-            
         if not self.model_path.exists():
             print(f"Warning: Model file not found: {self.model_path}. Using mock responses.")
             return None
+
+        if _llama_cpp() is None:
+            print("Warning: llama-cpp-python not available. Using mock responses.")
+            return None
             
+        draft = None
+        if self.speculative != "off":
+            # Drafting is an optimization: a broken draft setup must not cost the model.
+            try:
+                draft = self._load_drafts()
+            except Exception as e:
+                print(f"Warning: could not set up speculative decoding: {e}. Speculative decoding is off.")
+                self._drafts.clear()
+                self.speculative = "off"
         try:
-            return Llama(
+            # A draft_model makes llama.cpp keep logits for every position, needed to verify drafts.
+            return llama_cpp.Llama(
                 model_path=str(self.model_path),
                 n_ctx=self.n_ctx,
                 n_threads=self.n_threads,
+                use_mmap=self.use_mmap,
+                use_mlock=self.use_mlock,
+                draft_model=draft,
                 verbose=False
             )
         except Exception as e:
             print(f"Error loading model: {e}. Using mock responses.")
             return None
 
-    def generate(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7) -> str:
+    def _load_drafts(self, load_model: bool = True) -> CountingDraft:
+        """
+        Build the proposers this model can use; returns the default one. A
+        draft model that is missing or fails to load leaves prompt lookup,
+        which also becomes the default if draft_model was.
+        """
+        self._drafts["prompt_lookup"] = make_draft("prompt_lookup", self.draft_tokens)
+        if self.draft_model_path is not None and load_model:
+            if self.draft_model_path.exists():
+                try:
+                    draft_llama = llama_cpp.Llama(
+                        model_path=str(self.draft_model_path),
+                        n_ctx=self.n_ctx,
+                        n_threads=self.n_threads,
+                        use_mmap=self.use_mmap,
+                        verbose=False
+                    )
+                    self._drafts["draft_model"] = make_draft("draft_model", self.draft_tokens, draft_llama)
+                except Exception as e:
+                    print(f"Warning: could not load draft model {self.draft_model_path}: {e}. Using prompt lookup.")
+            else:
+                print(f"Warning: Draft model file not found: {self.draft_model_path}. Using prompt lookup.")
+        if self.speculative not in self._drafts:
+            self.speculative = "prompt_lookup"
+        return self._drafts[self.speculative]
+
+    def generate(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7,
+                 speculative: Optional[str] = None, json_schema: Optional[Dict[str, Any]] = None,
+                 grammar: Optional[str] = None, truncation: Optional[str] = None) -> GenerationResult:
+        """
+        ``speculative`` overrides the service's drafting mode for this call
+        ("off", "prompt_lookup" or "draft_model"); None uses the default.
+        ``json_schema`` or a GBNF ``grammar`` restricts sampling to text that
+        matches it; with a schema, decoding stops once the JSON value closes.
+        ``truncation`` overrides how a prompt too long for the context is
+        handled (see fit_context).
+        """
+        with span("llm.generate", **{"llm.max_tokens": max_tokens, "llm.mock": self._llm is None}) as current:
+            result = self._generate(prompt, max_tokens, temperature, speculative, json_schema, grammar, truncation)
+            current.set_attribute("llm.cache", result.cache)
+            current.set_attribute("llm.completion_tokens", result.completion_tokens)
+            if result.speculative is not None:
+                current.set_attribute("llm.speculative", result.speculative)
+                current.set_attribute("llm.draft_accepted_tokens", result.accepted_tokens)
+            return result
+
+    def _generate(self, prompt: str, max_tokens: int, temperature: float, speculative: Optional[str] = None,
+                  json_schema: Optional[Dict[str, Any]] = None, grammar: Optional[str] = None,
+                  truncation: Optional[str] = None) -> GenerationResult:
         if not prompt.strip():
             raise ValueError("Prompt cannot be empty.")
+        check_constraint(json_schema, grammar)
+        prompt, plan = self.fit_context(prompt, max_tokens, truncation)
+        max_tokens = plan.max_tokens
             
+        draft = self._select_draft(speculative)
+
         # If no model loaded, return mock response
         if self._llm is None:
-            return f"[MOCK] Generated response for: {prompt[:50]}..."
+            start = time.perf_counter()
+            # Mock mode cannot follow a GBNF grammar; a schema gets its smallest valid instance.
+            response = json.dumps(mock_instance(json_schema)) if json_schema is not None else self._mock_response(prompt)
+            completion_tokens = len(self._mock_tokens(response))
+            if self.mock_token_delay:
+                time.sleep(self.mock_token_delay * completion_tokens)
+            total_ms = (time.perf_counter() - start) * 1000
+            return GenerationResult(
+                text=response,
+                prompt_tokens=self.count_tokens(prompt),
+                completion_tokens=completion_tokens,
+                prompt_eval_ms=0.0,
+                decode_ms_per_token=total_ms / completion_tokens,
+                tokens_per_second=completion_tokens / (total_ms / 1000) if total_ms else None,
+                ttft_ms=total_ms / completion_tokens,
+                total_ms=total_ms,
+                truncated_tokens=plan.truncated_tokens
+            )
             
+        constraint = None
+        if json_schema is not None or grammar is not None:
+            with span("llm.grammar_compile") as compile_span:
+                constraint, cached = self.grammar_cache.get(json_schema, grammar)
+                compile_span.set_attribute("llm.grammar_cached", cached)
+        # Stop sequences could cut a constrained output short of its grammar.
+        params = dict(max_tokens=max_tokens, temperature=temperature,
+                      stop=STOP_SEQUENCES if constraint is None else [], grammar=constraint, echo=False)
+        try:
+            tokens = self.tokenize(prompt)
+            with self._lock:
+                self._llm.draft_model = draft
+                if draft is not None:
+                    draft.reset()
+                start = time.perf_counter()
+                reused = self._restore_prefix(tokens)
+                self._reset_perf()
+                if json_schema is not None:
+                    response = self._complete_json(prompt, params)
+                else:
+                    response = self._llm(prompt, **params)
+                perf = self._read_perf()
+                total_ms = (time.perf_counter() - start) * 1000
+                finished_ns = time.time_ns()
+                self._save_prefix(tokens)
+            usage = response.get('usage') or {}
+            result = GenerationResult(
+                text=response['choices'][0]['text'].strip(),
+                cache="prefix" if reused else "miss",
+                tokens_saved=reused,
+                prompt_tokens=usage.get('prompt_tokens', len(tokens)),
+                completion_tokens=usage.get('completion_tokens', 0),
+                total_ms=total_ms,
+                truncated_tokens=plan.truncated_tokens
+            )
+            if result.completion_tokens:
+                result.tokens_per_second = result.completion_tokens / (total_ms / 1000)
+                result.decode_ms_per_token = total_ms / result.completion_tokens
+            if perf is not None:
+                # Everything before the decode loop (restore + prompt eval) delays the first token.
+                result.prompt_eval_ms = perf.t_p_eval_ms
+                result.ttft_ms = total_ms - perf.t_eval_ms
+                if perf.n_eval:
+                    result.decode_ms_per_token = perf.t_eval_ms / perf.n_eval
+                # llama.cpp reports phase durations, not timestamps; decoding ends the call.
+                decode_start_ns = finished_ns - int(perf.t_eval_ms * 1e6)
+                TRACER.record("llm.prompt_eval", decode_start_ns - int(perf.t_p_eval_ms * 1e6), decode_start_ns,
+                              **{"llm.prompt_tokens": result.prompt_tokens, "llm.prefix_tokens_reused": reused})
+                TRACER.record("llm.decode", decode_start_ns, finished_ns, **{"llm.tokens": perf.n_eval})
+            self._record_speculation(result, draft)
+            return result
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            return GenerationResult(text=f"[ERROR] Could not generate response: {str(e)}", error=str(e))
+
+    def _complete_json(self, prompt: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Stream a schema-constrained completion and stop as soon as the JSON
+        value is closed. Returns the shape of a non-streamed completion. Call
+        with the lock held.
+        """
+        scanner = JsonEndScanner()
+        pieces: List[str] = []
+        finish_reason = "length"
+        chunks = self._llm(prompt, stream=True, **params)
+        try:
+            for chunk in chunks:
+                choice = chunk['choices'][0]
+                if choice['text']:
+                    pieces.append(choice['text'])
+                    if scanner.feed(choice['text']):
+                        finish_reason = "stop"
+                        break
+                if choice.get('finish_reason'):
+                    finish_reason = choice['finish_reason']
+        finally:
+            chunks.close()
+        # Streamed chunks are single tokens, except characters split across tokens.
+        return {
+            'choices': [{'text': "".join(pieces), 'finish_reason': finish_reason}],
+            'usage': {'completion_tokens': len(pieces)}
+        }
+
+    def _select_draft(self, mode: Optional[str]) -> Optional[CountingDraft]:
+        mode = mode or self.speculative
+        if mode == "off":
+            return None
+        if mode not in SPECULATIVE_MODES:
+            raise ValueError(f"Unknown speculative mode: {mode}")
+        if not self._drafts:
+            raise ValueError("Speculative decoding is not enabled for this model (set LLM_SPECULATIVE).")
+        if mode not in self._drafts:
+            raise ValueError(f"Speculative mode {mode!r} is not available for this model.")
+        return self._drafts[mode]
+
+    def _record_speculation(self, result: GenerationResult, draft: Optional[CountingDraft]) -> None:
+        """Fill in acceptance and speedup against the running plain-decoding baseline."""
+        if not result.completion_tokens:
+            return
+        decode_ms = (result.total_ms - (result.prompt_eval_ms or 0.0)) / result.completion_tokens
+        if draft is None:
+            previous = self._plain_decode_ms
+            self._plain_decode_ms = decode_ms if previous is None else 0.8 * previous + 0.2 * decode_ms
+            return
+        result.speculative = draft.mode
+        # Per emitted token, including drafting and verifying rejected drafts.
+        result.decode_ms_per_token = decode_ms
+        result.draft_tokens = draft.proposed
+        result.accepted_tokens = draft.accepted(result.completion_tokens)
+        if draft.proposed:
+            result.acceptance_rate = result.accepted_tokens / draft.proposed
+        if self._plain_decode_ms is not None and decode_ms > 0:
+            result.speedup = self._plain_decode_ms / decode_ms
+
+    def tokenize(self, text: str) -> List[int]:
+        """Token ids as the model sees them (mock mode: one id per word). Memoized per text."""
+        return self.token_cache.get(text, self._tokenize)
+
+    def _tokenize(self, text: str) -> List[int]:
+        if self._llm is None:
+            return [zlib.crc32(token.encode("utf-8")) for token in self._mock_tokens(text)]
+        return self._llm.tokenize(text.encode("utf-8"))
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenize(text))
+
+    def _split_tokens(self, text: str) -> List[Any]:
+        """Tokens that _join_tokens turns back into text; no BOS (mock mode: word pieces)."""
+        if self._llm is None:
+            return self._mock_tokens(text)
+        return self._llm.tokenize(text.encode("utf-8"), add_bos=False)
+
+    def _join_tokens(self, tokens: List[Any]) -> str:
+        if self._llm is None:
+            return "".join(tokens)
+        return self._llm.detokenize(tokens).decode("utf-8", errors="ignore")
+
+    def fit_context(self, prompt: str, max_tokens: int, truncation: Optional[str] = None) -> Tuple[str, ContextPlan]:
+        """
+        Check the prompt against ``n_ctx`` before anything is evaluated and
+        clamp ``max_tokens`` to the room left. A prompt that leaves less than
+        ``min_completion_tokens`` is rejected with ValueError ("error") or
+        cut down to its "head", "tail" or both ends ("middle_out").
+        """
+        strategy = truncation or self.truncation
+        prompt_tokens = self.count_tokens(prompt)
+        plan = plan_context(prompt_tokens, max_tokens, self.n_ctx, strategy, self.min_completion_tokens)
+        if not plan.truncated_tokens:
+            return prompt, plan
+        pieces = self._split_tokens(prompt)
+        special = prompt_tokens - len(pieces)
+        prompt = self._join_tokens(truncate(pieces, plan.prompt_tokens - special, strategy))
+        # Re-tokenizing the joined text can merge tokens at the cut.
+        plan.prompt_tokens = self.count_tokens(prompt)
+        plan.max_tokens = max(1, min(plan.max_tokens, self.n_ctx - plan.prompt_tokens))
+        return prompt, plan
+
+    def chunk_text(self, text: str, instruction: str, max_tokens: int, overlap_tokens: int = 64,
+                   window_tokens: Optional[int] = None) -> List[str]:
+        """
+        Split ``text`` into overlapping windows that each fit the context
+        together with ``instruction`` and ``max_tokens`` of output.
+        """
+        # A few tokens of slack for the part header and tokens merging at the joins.
+        fits = self.n_ctx - max_tokens - self.count_tokens(map_prompt(instruction, "", 999, 999)) - 8
+        window = min(window_tokens, fits) if window_tokens else fits
+        if window <= 0:
+            raise ValueError(f"Instruction and max_tokens={max_tokens} leave no room for input in a {self.n_ctx}-token context.")
+        pieces = self._split_tokens(text)
+        return [self._join_tokens(pieces[start:end]) for start, end in windows(len(pieces), window, overlap_tokens)]
+
+    def _reset_perf(self) -> None:
+        """Reset llama.cpp's per-context timings. Call with the lock held."""
+        reset = getattr(llama_cpp, "llama_perf_context_reset", None)
+        if reset is not None:
+            reset(self._llm._ctx.ctx)
+
+    def _read_perf(self) -> Optional[Any]:
+        """llama.cpp prompt-eval/decode timings since the last reset, if this binding exposes them."""
+        perf = getattr(llama_cpp, "llama_perf_context", None)
+        if perf is None:
+            return None
         try:
-            response = self._llm(
+            return perf(self._llm._ctx.ctx)
+        except Exception:
+            return None
+
+    def _restore_prefix(self, tokens: List[int]) -> int:
+        """Load the cached state sharing the longest prefix with the prompt. Call with the lock held."""
+        if self.prefix_cache is None:
+            return 0
+        state, reused = self.prefix_cache.lookup(tokens)
+        if state is None:
+            return 0
+        # Skip the copy when the live context already holds that prefix.
+        current = list(getattr(self._llm, "_input_ids", []))[:reused]
+        if current != list(tokens[:reused]):
+            self._llm.load_state(state)
+        return reused
+
+    def _save_prefix(self, tokens: List[int]) -> None:
+        """Snapshot the context after a prompt whose prefix recurs and no saved state covers. Call with the lock held."""
+        if self.prefix_cache is None or not self.prefix_cache.should_save(tokens):
+            return
+        state = self._llm.save_state()
+        self.prefix_cache.store(state.input_ids[:state.n_tokens].tolist(), state, state.llama_state_size)
+
+    def generate_stream(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7,
+                        speculative: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield generated text piece by piece as llama.cpp decodes it.
+        Closing the iterator stops decoding and releases the model.
+        ``speculative`` picks the drafting mode as in generate.
+        """
+        if not prompt.strip():
+            raise ValueError("Prompt cannot be empty.")
+        prompt, plan = self.fit_context(prompt, max_tokens)
+        max_tokens = plan.max_tokens
+        draft = self._select_draft(speculative)
+
+        if self._llm is None:
+            return self._mock_stream(prompt, self.mock_token_delay)
+
+        return self._stream_tokens(prompt, max_tokens, temperature, draft)
+
+    @property
+    def max_batch_sequences(self) -> int:
+        """
+        Number of sequences that can share one decode step: ``batch_slots``
+        with a real model (one if this llama-cpp-python lacks the batch API),
+        no limit in mock mode.
+        """
+        if self._llm is None:
+            return sys.maxsize
+        return self.batch_slots if self.batch_slots > 1 and supports_batching(llama_cpp) else 1
+
+    def open_sequence(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7) -> Union[DecodeSequence, Iterator[str]]:
+        """Start a sequence to be advanced with decode_step, from one thread only."""
+        if not prompt.strip():
+            raise ValueError("Prompt cannot be empty.")
+        prompt, plan = self.fit_context(prompt, max_tokens)
+        max_tokens = plan.max_tokens
+
+        if self._llm is None:
+            return self._mock_stream(prompt, 0.0)
+
+        if self.max_batch_sequences > 1:
+            return self._get_batch_decoder().open(self.tokenize(prompt), max_tokens, temperature, STOP_SEQUENCES)
+
+        # The batcher advances one token per sequence per step; it never speculates.
+        return self._stream_tokens(prompt, max_tokens, temperature, None)
+
+    def decode_step(self, sequences: List[Union[DecodeSequence, Iterator[str]]]) -> List[Optional[str]]:
+        """
+        Advance each open sequence by one token in a single decode step.
+        Returns the new piece of text per sequence ("" while a prompt is still
+        being evaluated), or None once it has finished.
+        """
+        if self._llm is None:
+            if self.mock_token_delay and sequences:
+                time.sleep(self.mock_token_delay * (1 + self.mock_batch_cost * (len(sequences) - 1)))
+            return [next(sequence, None) for sequence in sequences]
+        if sequences and isinstance(sequences[0], DecodeSequence):
+            with self._batch_lock:
+                return sequences[0].decoder.step(sequences)
+        return [next(sequence, None) for sequence in sequences]
+
+    def _get_batch_decoder(self) -> BatchDecoder:
+        """The multi-sequence context, created on the first batched sequence."""
+        decoder = self._batch_decoder
+        if decoder is None:
+            with self._batch_lock:
+                decoder = self._batch_decoder
+                if decoder is None:
+                    decoder = BatchDecoder(self._llm, llama_cpp, self.batch_slots, self.n_ctx, self.n_threads)
+                    self._batch_decoder = decoder
+        return decoder
+
+    def close(self) -> None:
+        """
+        Free the multi-sequence context. The model itself is released with the
+        last reference to the service; batched sequences still open fail.
+        """
+        with self._batch_lock:
+            decoder, self._batch_decoder = self._batch_decoder, None
+            if decoder is not None:
+                decoder.close()
+
+    def _stream_tokens(self, prompt: str, max_tokens: int, temperature: float,
+                       draft: Optional[CountingDraft]) -> Iterator[str]:
+        tokens = self.tokenize(prompt)
+        # Held until the stream ends: read it from a worker that does not wait on
+        # a client (InferenceScheduler.submit_stream).
+        with self._lock:
+            self._llm.draft_model = draft
+            if draft is not None:
+                draft.reset()
+            self._restore_prefix(tokens)
+            chunks = self._llm(
                 prompt,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                stop=["Human:", "Assistant:", "\n\n"],
-                echo=False
+                stop=STOP_SEQUENCES,
+                echo=False,
+                stream=True
             )
-            return response['choices'][0]['text'].strip()
-        except Exception as e:
-            print(f"Error generating response: {e}")
-            return f"[ERROR] Could not generate response: {str(e)}"
+            for chunk in chunks:
+                text = chunk['choices'][0]['text']
+                if text:
+                    yield text
+            self._save_prefix(tokens)
+
+    def _mock_response(self, prompt: str) -> str:
+        return f"[MOCK] Generated response for: {prompt[:50]}..."
+
+    def _mock_tokens(self, text: str) -> List[str]:
+        return re.findall(r"\S+\s*", text)
+
+    def _mock_stream(self, prompt: str, delay: float) -> Iterator[str]:
+        for token in self._mock_tokens(self._mock_response(prompt)):
+            if delay:
+                time.sleep(delay)
+            yield token
 
     def is_model_loaded(self) -> bool:
         """Check if a model is successfully loaded."""
-        return self._llm is not None
\ No newline at end of file
+        return self._llm is not None
+
+def _llama_cpp() -> Optional[Any]:
+    """Import llama_cpp on first use; it loads the native library and takes a noticeable part of startup."""
+    global llama_cpp
+    if llama_cpp is None:
+        try:
+            import llama_cpp as module
+        except ImportError:
+            return None
+        llama_cpp = module
+    return llama_cpp
@@ -0,0 +1,188 @@
+import functools
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.services.llm_service import LLMService
+from backend.telemetry.tracing import span
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of named LLM models.
+
+    Each configured model is loaded at most once and shared across requests.
+    When a memory budget is set, the least recently used models are evicted
+    to make room for a model that is about to be loaded.
+    """
+    def __init__(
+        self,
+        models: Dict[str, Any],
+        default_model: Optional[str] = None,
+        memory_budget_bytes: int = 0,
+        loader: Optional[Callable[[str], LLMService]] = None,
+    ):
+        if not models:
+            raise ValueError("At least one model must be configured.")
+        self._paths: Dict[str, Path] = {name: Path(path) for name, path in models.items()}
+        self.default_model = default_model or next(iter(self._paths))
+        if self.default_model not in self._paths:
+            raise ValueError(f"Unknown default model: {self.default_model}")
+        self.memory_budget_bytes = max(0, memory_budget_bytes)
+        self._loader = loader or LLMService
+        self._loaded: "OrderedDict[str, LLMService]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {name: threading.Lock() for name in self._paths}
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "ModelRegistry":
+        return cls(
+            models=settings.llm_models,
+            default_model=settings.LLM_DEFAULT_MODEL,
+            memory_budget_bytes=settings.LLM_MEMORY_BUDGET_MB * 1024 * 1024,
+            loader=functools.partial(
+                LLMService,
+                n_ctx=settings.LLM_N_CTX,
+                n_threads=settings.LLM_N_THREADS or -1,
+                prefix_cache_bytes=settings.LLM_PREFIX_CACHE_MB * 1024 * 1024,
+                use_mmap=settings.LLM_USE_MMAP,
+                use_mlock=settings.LLM_USE_MLOCK,
+                speculative=settings.LLM_SPECULATIVE,
+                draft_model_path=settings.LLM_DRAFT_MODEL_PATH,
+                draft_tokens=settings.LLM_DRAFT_TOKENS,
+                grammar_cache_size=settings.LLM_GRAMMAR_CACHE_SIZE,
+                truncation=settings.LLM_TRUNCATION,
+                min_completion_tokens=settings.LLM_MIN_COMPLETION_TOKENS,
+                tokenizer_cache_size=settings.LLM_TOKENIZER_CACHE_SIZE,
+                batch_slots=settings.LLM_MAX_BATCH_SIZE,
+            ),
+        )
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._paths)
+
+    def resolve(self, name: Optional[str] = None) -> str:
+        name = name or self.default_model
+        if name not in self._paths:
+            raise ValueError(f"Unknown model: {name}")
+        return name
+
+    def get(self, name: Optional[str] = None) -> LLMService:
+        """Return the named model, loading it on first use."""
+        name = self.resolve(name)
+        with self._lock:
+            service = self._loaded.get(name)
+            if service is not None:
+                self._loaded.move_to_end(name)
+                return service
+
+        # Loading can take seconds; only callers asking for the same model wait.
+        with self._load_locks[name]:
+            with self._lock:
+                service = self._loaded.get(name)
+                if service is not None:
+                    self._loaded.move_to_end(name)
+                    return service
+            size = self._estimate_size(name)
+            self._make_room(size)
+            with span("llm.model_load", model=name):
+                service = self._loader(str(self._paths[name]))
+            with self._lock:
+                self._loaded[name] = service
+                self._sizes[name] = size
+            return service
+
+    def peek(self, name: Optional[str] = None) -> Optional[LLMService]:
+        """Return the named model if resident, without loading or touching LRU order."""
+        with self._lock:
+            return self._loaded.get(self.resolve(name))
+
+    def is_resident(self, name: Optional[str] = None) -> bool:
+        return self.peek(name) is not None
+
+    def preload(self, names: Optional[List[str]] = None) -> None:
+        """
+        Load the given models (default: all configured) ahead of the first
+        request. With a memory budget, the default model comes first and the
+        rest are loaded only while they fit; the default is loaded last so it
+        is the most recently used, not the first eviction candidate.
+        """
+        names = [self.resolve(name) for name in names or self.names]
+        if self.default_model in names:
+            names.remove(self.default_model)
+            names.insert(0, self.default_model)
+        if self.memory_budget_bytes:
+            selected, total = [], 0
+            for name in names:
+                size = self._estimate_size(name)
+                if total + size > self.memory_budget_bytes and selected:
+                    print(f"Warning: not preloading model '{name}'; it does not fit the memory budget.")
+                    continue
+                selected.append(name)
+                total += size
+            names = selected
+        for name in names[1:] + names[:1]:
+            self.get(name)
+
+    def evict(self, name: str) -> bool:
+        """
+        Drop a model from the registry. Its batch context is freed now; the
+        weights are released once in-flight requests holding a reference to
+        it have finished.
+        """
+        with self._lock:
+            self._sizes.pop(name, None)
+            service = self._loaded.pop(name, None)
+        if service is None:
+            return False
+        service.close()
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            services = list(self._loaded.values())
+            self._loaded.clear()
+            self._sizes.clear()
+        for service in services:
+            service.close()
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Describe every configured model. Never triggers a load."""
+        with self._lock:
+            loaded = dict(self._loaded)
+            sizes = dict(self._sizes)
+        return [
+            {
+                "name": name,
+                "model_path": str(path),
+                "default": name == self.default_model,
+                "resident": name in loaded,
+                "model_loaded": name in loaded and loaded[name].is_model_loaded(),
+                "size_bytes": sizes.get(name, 0),
+            }
+            for name, path in self._paths.items()
+        ]
+
+    def _estimate_size(self, name: str) -> int:
+        path = self._paths[name]
+        return path.stat().st_size if path.exists() else 0
+
+    def _make_room(self, size: int) -> None:
+        if not self.memory_budget_bytes:
+            return
+        evicted = []
+        with self._lock:
+            while self._loaded and sum(self._sizes.values()) + size > self.memory_budget_bytes:
+                name, service = self._loaded.popitem(last=False)
+                self._sizes.pop(name, None)
+                evicted.append(service)
+                print(f"Evicted model '{name}' to stay within the memory budget.")
+        for service in evicted:
+            service.close()
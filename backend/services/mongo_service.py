@@ -1,9 +1,82 @@
-from pymongo import MongoClient
-from typing import Any
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from backend.telemetry.tracing import traced
 
 class MongoService:
-    def __init__(self, uri: str):
-        self.client = MongoClient(uri)
+    def __init__(self, uri: str, client: Optional[Any] = None):
+        if client is None:
+            from pymongo import MongoClient
+            client = MongoClient(uri)
+        self.client = client
     
+    @traced("mongodb.find", "mongodb", statement=False)
     def find(self, db: str, collection: str, query: dict) -> list:
         return list(self.client[db][collection].find(query))
+
+    def iterate(self, db: str, collection: str, query: dict, batch_size: int = 1000) -> Iterator[dict]:
+        """Yield documents as the server returns them, ``batch_size`` per round-trip."""
+        cursor = self.client[db][collection].find(query).batch_size(batch_size)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def find_page(self, db: str, collection: str, query: dict, after: Optional[Any] = None,
+                  limit: int = 100, key: str = "_id") -> List[dict]:
+        """
+        Keyset pagination: the next ``limit`` documents ordered by ``key`` after
+        the value ``after``. Pass the last document's ``key`` to get the next page.
+        """
+        if after is not None:
+            query = {"$and": [query, {key: {"$gt": after}}]} if query else {key: {"$gt": after}}
+        return list(self.client[db][collection].find(query).sort(key, 1).limit(limit))
+
+    def insert_many(self, db: str, collection: str, documents: Iterable[dict], batch_size: int = 1000,
+                    ordered: bool = False, max_errors: int = 100) -> Dict[str, Any]:
+        """
+        Insert ``documents`` (any iterable, consumed lazily) ``batch_size`` at a
+        time. Unordered by default, so one bad document does not stop the rest.
+        """
+        from pymongo.errors import BulkWriteError
+        summary: Dict[str, Any] = {"inserted": 0, "errors": []}
+        for batch in _chunks(documents, batch_size):
+            try:
+                summary["inserted"] += len(self.client[db][collection].insert_many(batch, ordered=ordered).inserted_ids)
+            except BulkWriteError as e:
+                summary["inserted"] += e.details.get("nInserted", 0)
+                _collect_errors(summary, e, max_errors)
+                if ordered:
+                    break
+        return summary
+
+    def bulk_write(self, db: str, collection: str, operations: Iterable[Any], batch_size: int = 1000,
+                   ordered: bool = False, max_errors: int = 100) -> Dict[str, Any]:
+        """Apply pymongo write operations (InsertOne, UpdateOne, ...) in unordered batches."""
+        from pymongo.errors import BulkWriteError
+        summary: Dict[str, Any] = {"inserted": 0, "matched": 0, "modified": 0, "deleted": 0, "upserted": 0, "errors": []}
+        for batch in _chunks(operations, batch_size):
+            try:
+                details = self.client[db][collection].bulk_write(batch, ordered=ordered).bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+                _collect_errors(summary, e, max_errors)
+            for field, name in (("nInserted", "inserted"), ("nMatched", "matched"), ("nModified", "modified"),
+                                ("nRemoved", "deleted"), ("nUpserted", "upserted")):
+                summary[name] += details.get(field, 0)
+            if ordered and summary["errors"]:
+                break
+        return summary
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _collect_errors(summary: Dict[str, Any], error: Any, max_errors: int) -> None:
+    room = max_errors - len(summary["errors"])
+    if room > 0:
+        summary["errors"].extend(error.details.get("writeErrors", [])[:room])
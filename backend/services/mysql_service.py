@@ -1,11 +1,13 @@
-import mysql.connector
-from mysql.connector.pooling import MySQLConnectionPool
-from typing import Any
+from typing import Any, Iterator
+
+from backend.telemetry.tracing import traced
 
 class MySQLService:
     def __init__(self, pool_name: str, pool_size: int, **db_config):
+        from mysql.connector.pooling import MySQLConnectionPool
         self.pool = MySQLConnectionPool(pool_name=pool_name, pool_size=pool_size, **db_config)
 
+    @traced("mysql.execute", "mysql")
     def execute(self, query: str, params: tuple = ()) -> Any:
         conn = self.pool.get_connection()
         try:
@@ -17,3 +19,21 @@ class MySQLService:
         finally:
             cursor.close()
             conn.close()
+
+    def iterate(self, query: str, params: tuple = (), batch_size: int = 1000) -> Iterator[tuple]:
+        """Stream rows through an unbuffered cursor, fetching ``batch_size`` rows at a time."""
+        conn = self.pool.get_connection()
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            # Unread rows of an unbuffered result must be drained before the connection is reused.
+            if conn.unread_result:
+                conn.consume_results()
+            cursor.close()
+            conn.close()
@@ -1,10 +1,67 @@
-from neo4j import GraphDatabase
-from typing import Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from backend.telemetry.tracing import traced
 
 class Neo4jService:
-    def __init__(self, uri: str, user: str, password: str):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    """
+    Neo4j access through one pooled driver. Queries run in managed
+    transactions (retried on transient errors) and their records are consumed
+    before the session closes.
+    """
+    def __init__(self, uri: str, user: str, password: str, max_connection_pool_size: int = 50,
+                 fetch_size: int = 1000, database: Optional[str] = None, driver: Optional[Any] = None):
+        self.fetch_size = fetch_size
+        self.database = database
+        if driver is None:
+            from neo4j import GraphDatabase
+            driver = GraphDatabase.driver(uri, auth=(user, password), max_connection_pool_size=max_connection_pool_size)
+        self.driver = driver
+
+    def _session(self) -> Any:
+        return self.driver.session(database=self.database, fetch_size=self.fetch_size)
+
+    @traced("neo4j.execute", "neo4j")
+    def execute(self, cypher: str, params: dict = None, write: bool = True) -> List[Dict[str, Any]]:
+        """Run ``cypher`` and return its records as dicts. Use ``write=False`` for reads (routable to followers)."""
+        with self._session() as session:
+            run = session.execute_write if write else session.execute_read
+            return run(_fetch_all, cypher, params or {})
+
+    def iterate(self, cypher: str, params: dict = None) -> Iterator[Dict[str, Any]]:
+        """Yield records lazily, ``fetch_size`` per round-trip, keeping the session open until exhausted."""
+        with self._session() as session:
+            with session.begin_transaction() as tx:
+                for record in tx.run(cypher, params or {}):
+                    yield record.data()
+
+    @traced("neo4j.execute_batch", "neo4j")
+    def execute_batch(self, cypher: str, rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """
+        Apply ``cypher`` to many parameter sets with one ``UNWIND $rows AS row``
+        query per ``batch_size`` rows; ``cypher`` refers to each set as ``row``,
+        e.g. ``MERGE (p:Person {id: row.id}) SET p.name = row.name``.
+        Returns the number of rows sent.
+        """
+        query = "UNWIND $rows AS row " + cypher
+        sent = 0
+        batch: List[Dict[str, Any]] = []
+        with self._session() as session:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    session.execute_write(_consume, query, {"rows": batch})
+                    sent += len(batch)
+                    batch = []
+            if batch:
+                session.execute_write(_consume, query, {"rows": batch})
+                sent += len(batch)
+        return sent
+
+    def close(self) -> None:
+        self.driver.close()
+
+def _fetch_all(tx: Any, cypher: str, params: dict) -> List[Dict[str, Any]]:
+    return [record.data() for record in tx.run(cypher, params)]
 
-    def execute(self, cypher: str, params: dict = None) -> Any:
-        with self.driver.session() as session:
-            return session.run(cypher, params or {})
+def _consume(tx: Any, cypher: str, params: dict) -> Any:
+    return tx.run(cypher, params).consume()
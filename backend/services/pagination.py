@@ -0,0 +1,45 @@
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from backend.services.sqlite_service import _quote
+
+PLACEHOLDERS = {"qmark": "?", "format": "%s"}
+
+def keyset_query(table: str, columns: Sequence[str], key: str = "id", after: Optional[Any] = None,
+                 limit: int = 1000, where: Optional[str] = None, params: tuple = (),
+                 paramstyle: str = "qmark", quote=_quote) -> Tuple[str, tuple]:
+    """
+    Build one keyset-pagination query: rows ordered by ``key`` that come after
+    ``after``. Unlike OFFSET, each page costs an index seek no matter how deep
+    it is. ``paramstyle`` is "qmark" (SQLite) or "format" (psycopg2, MySQL);
+    pass ``quote`` to change identifier quoting (e.g. backticks for MySQL).
+    """
+    placeholder = PLACEHOLDERS[paramstyle]
+    conditions, args = [], list(params)
+    if where:
+        conditions.append(f"({where})")
+    if after is not None:
+        conditions.append(f"{quote(key)} > {placeholder}")
+        args.append(after)
+    query = "SELECT {} FROM {}".format(", ".join(quote(column) for column in columns), quote(table))
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {quote(key)} LIMIT {int(limit)}"
+    return query, tuple(args)
+
+def iter_keyset_pages(service: Any, table: str, columns: Sequence[str], key: str = "id",
+                      page_size: int = 1000, where: Optional[str] = None, params: tuple = (),
+                      paramstyle: str = "qmark", quote=_quote) -> Iterator[List[tuple]]:
+    """Yield successive pages from any service with an ``execute(query, params)`` method."""
+    if key not in columns:
+        raise ValueError(f"Keyset column {key!r} must be selected.")
+    key_index = list(columns).index(key)
+    after = None
+    while True:
+        query, args = keyset_query(table, columns, key, after, page_size, where, params, paramstyle, quote)
+        rows = service.execute(query, args)
+        if not rows:
+            return
+        yield rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1][key_index]
@@ -1,11 +1,14 @@
-import psycopg2
-from psycopg2.pool import ThreadedConnectionPool
-from typing import Any
+import uuid
+from typing import Any, Iterator
+
+from backend.telemetry.tracing import traced
 
 class PostgresService:
     def __init__(self, dsn: str, minconn: int = 1, maxconn: int = 5):
+        from psycopg2.pool import ThreadedConnectionPool
         self.pool = ThreadedConnectionPool(minconn, maxconn, dsn=dsn)
 
+    @traced("postgresql.execute", "postgresql")
     def execute(self, query: str, params: tuple = ()) -> Any:
         conn = self.pool.getconn()
         try:
@@ -16,3 +19,23 @@ class PostgresService:
                 conn.commit()
         finally:
             self.pool.putconn(conn)
+
+    def iterate(self, query: str, params: tuple = (), batch_size: int = 1000) -> Iterator[tuple]:
+        """
+        Stream rows through a named (server-side) cursor, ``batch_size`` rows
+        per round-trip, so the result set is never held in memory at once.
+        """
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+                cur.itersize = batch_size
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+        finally:
+            # A named cursor lives in its own transaction; end it before reuse.
+            conn.rollback()
+            self.pool.putconn(conn)
@@ -1,12 +1,189 @@
-import redis
-from typing import Any
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+_MISSING = object()
+
+class NearCache:
+    """In-process LRU of recently read Redis values, each kept for at most ``ttl_seconds``."""
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        """The cached value (which may be None for a missing key), or ``_MISSING``."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return _MISSING
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
 
 class RedisService:
-    def __init__(self, host: str, port: int):
-        self.client = redis.Redis(host=host, port=port)
+    """
+    Redis access over a bounded connection pool, with bulk and pipelined
+    calls. With ``near_cache_size`` set, reads are served from an in-process
+    cache that is invalidated by this service's own writes and by keyspace
+    notifications for writes made elsewhere; the TTL bounds staleness if a
+    notification is missed. The near-cache is turned off when the server does
+    not publish those notifications, unless ``configure_notifications`` allows
+    this client to enable them (a server-wide CONFIG SET).
+    """
+    def __init__(self, host: str, port: int, db: int = 0, max_connections: int = 50,
+                 near_cache_size: int = 0, near_cache_ttl: float = 30.0, client: Optional[Any] = None,
+                 configure_notifications: bool = False):
+        self.db = db
+        self.configure_notifications = configure_notifications
+        if client is None:
+            import redis
+            pool = redis.ConnectionPool(host=host, port=port, db=db, max_connections=max_connections)
+            client = redis.Redis(connection_pool=pool)
+        self.client = client
+        self.near_cache = NearCache(near_cache_size, near_cache_ttl) if near_cache_size else None
+        self._invalidator: Optional[Any] = None
+        if self.near_cache is not None:
+            self._subscribe_invalidations()
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "RedisService":
+        return cls(
+            settings.REDIS_HOST,
+            settings.REDIS_PORT,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            near_cache_size=settings.REDIS_NEAR_CACHE_SIZE,
+            near_cache_ttl=settings.REDIS_NEAR_CACHE_TTL_S,
+            configure_notifications=settings.REDIS_CONFIGURE_KEYSPACE_EVENTS,
+        )
 
     def get(self, key: str) -> Any:
-        return self.client.get(key)
+        if self.near_cache is not None:
+            value = self.near_cache.get(key)
+            if value is not _MISSING:
+                return value
+        value = self.client.get(key)
+        if self.near_cache is not None:
+            self.near_cache.put(key, value)
+        return value
 
     def set(self, key: str, value: Any, ex: int = None):
         self.client.set(key, value, ex=ex)
+        self._invalidate(key)
+
+    def mget(self, keys: Sequence[str]) -> List[Any]:
+        """Values for ``keys`` in one round-trip (none for keys held in the near-cache)."""
+        values: List[Any] = [_MISSING] * len(keys)
+        if self.near_cache is not None:
+            values = [self.near_cache.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is _MISSING]
+        if missing:
+            fetched = self.client.mget([keys[i] for i in missing])
+            for i, value in zip(missing, fetched):
+                values[i] = value
+                if self.near_cache is not None:
+                    self.near_cache.put(keys[i], value)
+        return values
+
+    def mset(self, mapping: Dict[str, Any], ex: int = None) -> None:
+        """Set many keys in one round-trip; with ``ex`` they go through one pipelined transaction."""
+        if ex is None:
+            self.client.mset(mapping)
+        else:
+            with self.pipeline() as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, value, ex=ex)
+        self._invalidate(*mapping)
+
+    def delete(self, *keys: str) -> int:
+        deleted = self.client.delete(*keys)
+        self._invalidate(*keys)
+        return deleted
+
+    @contextmanager
+    def pipeline(self, transaction: bool = True) -> Iterator[Any]:
+        """
+        Queue commands and send them in one round-trip when the block exits
+        (as MULTI/EXEC when ``transaction``). Nothing is sent if the block raises.
+        The results are available as ``pipe.results`` afterwards.
+        """
+        pipe = self.client.pipeline(transaction=transaction)
+        try:
+            yield pipe
+            pipe.results = pipe.execute()
+        finally:
+            pipe.reset()
+            if self.near_cache is not None:
+                # The queued commands' keys are not tracked, and a failed execute
+                # may have applied some of them, so drop everything.
+                self.near_cache.clear()
+
+    def close(self) -> None:
+        if self._invalidator is not None:
+            self._invalidator.stop()
+            self._invalidator = None
+        self.client.close()
+
+    def _invalidate(self, *keys: str) -> None:
+        if self.near_cache is not None:
+            self.near_cache.invalidate(*keys)
+
+    def _subscribe_invalidations(self) -> None:
+        try:
+            flags = self.client.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+        except Exception as e:
+            # Managed servers often refuse CONFIG; notifications may still be on.
+            print(f"Warning: could not read Redis notify-keyspace-events; near-cache relies on its TTL: {e}")
+            flags = None
+        if flags is not None and ("K" not in flags or not ({"A", "g", "$"} & set(flags))):
+            if not self.configure_notifications:
+                print(f"Warning: Redis keyspace notifications are off (notify-keyspace-events={flags!r}). "
+                      "Near-cache disabled; enable 'KA' on the server or set REDIS_CONFIGURE_KEYSPACE_EVENTS.")
+                self.near_cache = None
+                return
+            try:
+                self.client.config_set("notify-keyspace-events", "".join(sorted(set(flags) | {"K", "A"})))
+            except Exception as e:
+                print(f"Warning: could not enable Redis keyspace notifications. Near-cache disabled: {e}")
+                self.near_cache = None
+                return
+        try:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(**{f"__keyspace@{self.db}__:*": self._on_keyspace_event})
+            self._invalidator = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception as e:
+            print(f"Warning: could not subscribe to Redis keyspace notifications; near-cache relies on its TTL: {e}")
+
+    def _on_keyspace_event(self, message: Dict[str, Any]) -> None:
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8", "replace")
+        self.near_cache.invalidate(channel.split(":", 1)[1])
@@ -0,0 +1,89 @@
+"""
+Code Morningstar - Speculative Decoding
+Draft proposers plugged into llama-cpp-python's ``Llama.draft_model`` hook:
+the draft guesses the next few tokens and the main model checks all of them
+in one forward pass, keeping the longest prefix it agrees with.
+"""
+from typing import Any, List, Optional, Sequence
+
+SPECULATIVE_MODES = ("off", "prompt_lookup", "draft_model")
+
+class PromptLookupDraft:
+    """
+    Proposes the tokens that followed the most recent earlier occurrence of
+    the context's last n-gram (longest n first). Needs no second model and
+    works well when the output repeats the prompt, as code edits and
+    completions do.
+    """
+    def __init__(self, max_ngram_size: int = 3, num_pred_tokens: int = 8):
+        self.max_ngram_size = max_ngram_size
+        self.num_pred_tokens = num_pred_tokens
+
+    def propose(self, ids: Sequence[int]) -> List[int]:
+        ids = list(ids)
+        for size in range(min(self.max_ngram_size, len(ids) - 1), 0, -1):
+            ngram = ids[-size:]
+            # Search backwards so the closest earlier match wins.
+            for start in range(len(ids) - size - 1, -1, -1):
+                if ids[start:start + size] == ngram:
+                    follow = ids[start + size:start + size + self.num_pred_tokens]
+                    if follow:
+                        return follow
+        return []
+
+    def __call__(self, input_ids: Any, **kwargs: Any) -> Any:
+        import numpy as np
+        return np.array(self.propose(input_ids.tolist()), dtype=np.intc)
+
+class ModelDraft:
+    """Greedy proposals from a small GGUF model sharing the main model's tokenizer."""
+    def __init__(self, llama: Any, num_pred_tokens: int = 8):
+        self.llama = llama
+        self.num_pred_tokens = num_pred_tokens
+
+    def propose(self, ids: Sequence[int]) -> List[int]:
+        proposed: List[int] = []
+        # generate() reuses whatever prefix the draft context already holds.
+        for token in self.llama.generate(list(ids), top_k=1, temp=0.0, reset=True):
+            proposed.append(int(token))
+            if len(proposed) >= self.num_pred_tokens:
+                break
+        return proposed
+
+    def __call__(self, input_ids: Any, **kwargs: Any) -> Any:
+        import numpy as np
+        return np.array(self.propose(input_ids.tolist()), dtype=np.intc)
+
+class CountingDraft:
+    """
+    Wraps a proposer to count verification passes and proposed tokens. The
+    main model emits each pass's accepted draft tokens plus one token of its
+    own, so accepted = completion tokens - passes.
+    """
+    def __init__(self, draft: Any, mode: str):
+        self.draft = draft
+        self.mode = mode
+        self.passes = 0
+        self.proposed = 0
+
+    def reset(self) -> None:
+        self.passes = 0
+        self.proposed = 0
+
+    def accepted(self, completion_tokens: int) -> int:
+        return max(0, min(self.proposed, completion_tokens - self.passes))
+
+    def __call__(self, input_ids: Any, **kwargs: Any) -> Any:
+        tokens = self.draft(input_ids, **kwargs)
+        self.passes += 1
+        self.proposed += len(tokens)
+        return tokens
+
+def make_draft(mode: str, num_pred_tokens: int, draft_llama: Optional[Any] = None) -> CountingDraft:
+    if mode == "prompt_lookup":
+        return CountingDraft(PromptLookupDraft(num_pred_tokens=num_pred_tokens), mode)
+    if mode == "draft_model":
+        if draft_llama is None:
+            raise ValueError("Speculative mode 'draft_model' needs LLM_DRAFT_MODEL_PATH.")
+        return CountingDraft(ModelDraft(draft_llama, num_pred_tokens), mode)
+    raise ValueError(f"Unknown speculative mode: {mode}")
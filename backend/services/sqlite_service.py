@@ -1,14 +1,163 @@
+import queue
 import sqlite3
-from typing import Any
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, List, Sequence
+
+from backend.telemetry.tracing import traced
 
 class SQLiteService:
-    def __init__(self, db_path: str):
+    """
+    SQLite access over a pool of long-lived connections.
+
+    Connections are opened lazily (up to ``pool_size``), configured once with
+    WAL journaling, ``synchronous=NORMAL``, memory-mapped I/O and a busy
+    timeout, and keep their compiled statements cached between calls.
+    """
+    def __init__(self, db_path: str, pool_size: int = 5, timeout: float = 30.0,
+                 mmap_size: int = 256 * 1024 * 1024, cached_statements: int = 256,
+                 journal_mode: str = "WAL", synchronous: str = "NORMAL"):
         self.db_path = db_path
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
 
-    def execute(self, query: str, params: tuple = ()) -> Any:
-        with sqlite3.connect(self.db_path) as conn:
-            cur = conn.cursor()
-            cur.execute(query, params)
-            result = cur.fetchall() if cur.description else None
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+            uri=self.db_path.startswith("file:")
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._connections) < self.pool_size:
+                conn = self._connect()
+                self._connections.append(conn)
+                return conn
+        try:
+            return self._pool.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No SQLite connection available after {self.timeout}s (pool_size={self.pool_size}).")
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        self._pool.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection (the transaction's connection inside ``transaction()``)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run every call made on this thread inside one transaction, committed
+        on success and rolled back on error. Nested use joins the outer one.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            yield self._local.conn
+            return
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
             conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def _in_transaction(self) -> bool:
+        return getattr(self._local, "conn", None) is not None
+
+    @traced("sqlite.execute", "sqlite")
+    def execute(self, query: str, params: tuple = ()) -> Any:
+        with self.connection() as conn:
+            cur = conn.execute(query, params)
+            try:
+                result = cur.fetchall() if cur.description else None
+            finally:
+                cur.close()
+            if not self._in_transaction():
+                conn.commit()
             return result
+
+    @traced("sqlite.executemany", "sqlite")
+    def executemany(self, query: str, seq_of_params: Iterable[Sequence[Any]]) -> int:
+        """Run one statement for many parameter sets in a single transaction; returns rows affected."""
+        with self.transaction() as conn:
+            return conn.executemany(query, seq_of_params).rowcount
+
+    def bulk_insert(self, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]], batch_size: int = 1000) -> int:
+        """Insert rows in batches of ``batch_size`` within one transaction; returns rows inserted."""
+        query = "INSERT INTO {} ({}) VALUES ({})".format(
+            _quote(table), ", ".join(_quote(column) for column in columns), ", ".join("?" * len(columns))
+        )
+        inserted = 0
+        batch: List[Sequence[Any]] = []
+        with self.transaction() as conn:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    inserted += conn.executemany(query, batch).rowcount
+                    batch = []
+            if batch:
+                inserted += conn.executemany(query, batch).rowcount
+        return inserted
+
+    def iterate(self, query: str, params: tuple = (), batch_size: int = 500) -> Iterator[tuple]:
+        """Yield rows as the cursor produces them instead of materializing the result."""
+        with self.connection() as conn:
+            cur = conn.execute(query, params)
+            try:
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cur.close()
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        while True:
+            try:
+                self._pool.get_nowait()
+            except queue.Empty:
+                break
+        for conn in connections:
+            conn.close()
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
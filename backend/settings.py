@@ -1,4 +1,4 @@
-from typing import List, Optional, Union
+from typing import Dict, List, Literal, Optional, Union
 from pydantic_settings import BaseSettings
 from pydantic import Field, SecretStr, field_validator
 from pathlib import Path
@@ -8,16 +8,72 @@ class Settings(BaseSettings):
     SECRET_KEY: SecretStr = Field(default=SecretStr("local-fastapi-dev-key"), description="Cryptographic secret")
     ALLOWED_HOSTS: Union[str, List[str]] = Field(default="localhost", description="Allowed hosts (comma-separated)")
     FEATURE_FLAGS_PATH: Path = Field(default=Path(__file__).parent / "feature_flags" / "flags.yaml", description="Path to feature flags YAML")
+    FEATURE_FLAGS_RELOAD_S: float = Field(default=2.0, ge=0, description="How often to check the flags file for changes (0 = never reload)")
+
+    # Tracing and profiling
+    TRACING_ENABLED: bool = Field(default=False, description="Record request spans and send Server-Timing headers")
+    TRACING_EXPORTER: Literal["none", "console", "file"] = Field(default="none", description="Where finished traces are written as OTLP/JSON")
+    TRACING_FILE: Path = Field(default=Path("traces.jsonl"), description="Trace file for TRACING_EXPORTER=file")
+    TRACING_SAMPLE_RATE: float = Field(default=1.0, ge=0, le=1, description="Fraction of requests traced (callers' traceparent decisions are honoured)")
+    PROFILER_SLOWEST_N: int = Field(default=0, ge=0, description="Keep stack-sample profiles of the N slowest requests at /debug/profiles (0 = disabled)")
+    PROFILER_INTERVAL_MS: float = Field(default=5.0, gt=0, description="Stack sampling interval while requests are in flight")
 
     # Database configurations
     DATABASE_URL: str = Field(default="sqlite:///./code_morningstar.db", description="Database URL")
+    DATABASE_POOL_SIZE: int = Field(default=10, ge=1, description="Connections kept open by the SQLAlchemy engine")
+    DATABASE_MAX_OVERFLOW: int = Field(default=20, ge=0, description="Extra connections opened under load beyond the pool size")
+    DATABASE_POOL_RECYCLE_S: int = Field(default=1800, ge=-1, description="Reconnect pooled connections older than this (-1 = never)")
     
+    # Optional Redis tier for shared caches
+    REDIS_HOST: Optional[str] = Field(default=None, description="Redis host (unset = in-process caches only)")
+    REDIS_PORT: int = Field(default=6379, description="Redis port")
+    REDIS_MAX_CONNECTIONS: int = Field(default=50, ge=1, description="Redis connection pool size")
+    REDIS_NEAR_CACHE_SIZE: int = Field(default=0, ge=0, description="Keys kept in the in-process Redis near-cache (0 = disabled)")
+    REDIS_NEAR_CACHE_TTL_S: float = Field(default=30, gt=0, description="Longest time a near-cached value is served")
+    REDIS_CONFIGURE_KEYSPACE_EVENTS: bool = Field(default=False, description="Let the near-cache turn on keyspace notifications server-wide (CONFIG SET)")
+
     # API Configuration
     API_HOST: str = Field(default="0.0.0.0", description="API host")
     API_PORT: int = Field(default=8000, description="API port")
+    API_WORKERS: int = Field(default=0, ge=0, description="Server processes in production mode (0 = autotune from CPUs and memory)")
+    API_WORKER_MEMORY_MB: int = Field(default=512, ge=1, description="Memory each worker needs besides shared model weights, for autotuning")
+    API_GRACEFUL_TIMEOUT_S: int = Field(default=30, ge=0, description="Seconds a worker may finish in-flight requests when restarted or stopped")
+    API_HTTP: Literal["auto", "h11", "httptools"] = Field(default="auto", description="uvicorn HTTP/1.1 parser (httptools is the faster C parser)")
+    API_LOOP: Literal["auto", "asyncio", "uvloop"] = Field(default="auto", description="uvicorn event loop implementation")
+    API_KEEPALIVE_S: int = Field(default=5, ge=1, description="Seconds an idle keep-alive connection stays open")
+    API_ORJSON: bool = Field(default=False, description="Serialize JSON responses with orjson")
+    API_COMPRESSION: Literal["none", "gzip", "brotli"] = Field(default="none", description="Response compression; brotli also serves gzip to clients without br")
+    API_COMPRESSION_MIN_BYTES: int = Field(default=1024, ge=0, description="Smaller responses are sent uncompressed")
+    API_GZIP_LEVEL: int = Field(default=6, ge=1, le=9, description="gzip compression level")
+    API_BROTLI_QUALITY: int = Field(default=4, ge=0, le=11, description="Brotli quality (higher compresses more, slower)")
+    API_ETAGS: bool = Field(default=False, description="ETag and If-None-Match (304) for cacheable GET endpoints")
 
     # LLM Configuration
     LLM_MODEL_PATH: Path = Field(default=Path(__file__).parent.parent / "models" / "codellama-7b-instruct.Q4_K_M.gguf", description="Path to GGUF model file")
+    LLM_MODELS: Dict[str, Path] = Field(default_factory=dict, description="Additional named GGUF models (JSON object of name -> path)")
+    LLM_DEFAULT_MODEL: str = Field(default="default", description="Name of the model served when a request does not pick one")
+    LLM_N_THREADS: int = Field(default=0, ge=0, description="llama.cpp threads per model (0 = all CPUs, or autotuned per worker)")
+    LLM_N_CTX: int = Field(default=2048, ge=256, description="Context window in tokens (prompt plus completion)")
+    LLM_TRUNCATION: Literal["error", "head", "tail", "middle_out"] = Field(default="error", description="Oversized prompts: reject (400) or keep the head, tail or both ends")
+    LLM_MIN_COMPLETION_TOKENS: int = Field(default=64, ge=1, description="Context a prompt must leave for the completion before truncation applies")
+    LLM_TOKENIZER_CACHE_SIZE: int = Field(default=1024, ge=0, description="Tokenized prompts memoized per model (0 = disabled)")
+    LLM_MEMORY_BUDGET_MB: int = Field(default=0, ge=0, description="Memory budget for resident models in MB (0 = unlimited)")
+    LLM_INFERENCE_WORKERS: int = Field(default=0, ge=0, description="Inference worker threads (0 = CPU count / model n_threads)")
+    LLM_MAX_QUEUE_SIZE: int = Field(default=32, ge=1, description="Requests allowed to wait for a worker before returning 429")
+    LLM_REQUEST_DEADLINE_S: float = Field(default=0, ge=0, description="Default per-request deadline in seconds (0 = none)")
+    LLM_MAX_BATCH_SIZE: int = Field(default=1, ge=1, description="Sequences decoded together by the default model, each with LLM_N_CTX tokens of KV cache (1 = no batching)")
+    LLM_BATCH_WINDOW_MS: float = Field(default=5.0, ge=0, description="Time to wait for concurrent prompts before a batch starts")
+    LLM_BATCH_MAX_PROMPTS: int = Field(default=1000, ge=1, description="Prompts accepted by one POST /llm/generate/batch request")
+    LLM_RESPONSE_CACHE_SIZE: int = Field(default=1024, ge=0, description="Cached deterministic (temperature 0) responses (0 = disabled)")
+    LLM_RESPONSE_CACHE_TTL_S: float = Field(default=3600, gt=0, description="Lifetime of cached responses in seconds")
+    LLM_USE_MMAP: bool = Field(default=True, description="Memory-map model weights (shared page cache, fast load)")
+    LLM_USE_MLOCK: bool = Field(default=False, description="Lock model weights in RAM so they are never paged out")
+    LLM_BACKGROUND_LOAD: bool = Field(default=False, description="Start serving before models finish loading; /ready reports when they have")
+    LLM_PREFIX_CACHE_MB: int = Field(default=0, ge=0, description="Memory for saved prompt-prefix KV states per model in MB (0 = disabled)")
+    LLM_SPECULATIVE: Literal["off", "prompt_lookup", "draft_model"] = Field(default="off", description="Default speculative decoding mode; any mode other than off lets requests choose")
+    LLM_DRAFT_MODEL_PATH: Optional[Path] = Field(default=None, description="Small GGUF model sharing the main model's tokenizer, for draft_model speculation")
+    LLM_DRAFT_TOKENS: int = Field(default=8, ge=1, le=64, description="Tokens proposed per speculative verification pass")
+    LLM_GRAMMAR_CACHE_SIZE: int = Field(default=64, ge=1, description="Compiled JSON-schema/GBNF grammars kept per model")
 
     @field_validator('ALLOWED_HOSTS', mode='before')
     @classmethod
@@ -32,6 +88,11 @@ class Settings(BaseSettings):
             return [host.strip() for host in self.ALLOWED_HOSTS.split(',') if host.strip()]
         return self.ALLOWED_HOSTS
 
+    @property
+    def llm_models(self) -> Dict[str, Path]:
+        """All configured models; LLM_MODEL_PATH is registered as "default"."""
+        return {"default": self.LLM_MODEL_PATH, **self.LLM_MODELS}
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -2,6 +2,7 @@
 Code Morningstar - Startup Script
 Handles application initialization and model setup
 """
+import argparse
 import os
 import sys
 from pathlib import Path
@@ -43,36 +44,72 @@ def check_model():
         print(f"✓ Model found: {model_path}")
         return True
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Start the Code Morningstar API")
+    parser.add_argument("--production", action="store_true",
+                        help="No auto-reload; run worker processes, load models in the background and report readiness on /ready")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes in production mode (default: API_WORKERS, 0 = autotune)")
+    return parser.parse_args()
+
+def configure_workers(workers=None):
+    """
+    Pick the worker count and llama.cpp threads per worker, and pass the
+    per-worker settings to the worker processes through the environment.
+    """
+    from backend.settings import settings
+    from backend.tuning import plan_from_settings
+    plan = plan_from_settings(settings, workers)
+    os.environ["LLM_N_THREADS"] = str(plan.threads_per_worker)
+    # Each process serves its own model context; more inference threads would only oversubscribe the CPUs.
+    os.environ.setdefault("LLM_INFERENCE_WORKERS", "1")
+    print(f"⚙️  Workers: {plan.workers} x {plan.threads_per_worker} threads "
+          f"({plan.cpus} CPUs, {plan.memory_bytes / 2**30:.1f} GiB, model weights {plan.model_bytes / 2**30:.1f} GiB"
+          f"{', memory-mapped and shared' if settings.LLM_USE_MMAP else ''})")
+    return plan.workers
+
 def main():
     """Main startup function."""
+    args = parse_args()
     print("🌟 Starting Code Morningstar...")
     
     # Setup environment
     if not setup_environment():
         sys.exit(1)
+    if args.production:
+        os.environ.setdefault("LLM_BACKGROUND_LOAD", "true")
     
     # Check model
     model_available = check_model()
     
     # Import and start the app
     try:
-        from backend.app.main import app
+        # The app itself is imported by uvicorn in each serving process, never in this one,
+        # so workers map the model weights themselves and share them through the page cache.
         import uvicorn
+        from backend.settings import settings
+        workers = configure_workers(args.workers) if args.production else 1
         
         print("\n🚀 Starting FastAPI server...")
-        print("📖 API Documentation: http://localhost:8000/docs")
-        print("🔄 ReDoc: http://localhost:8000/redoc")
+        print(f"📖 API Documentation: http://localhost:{settings.API_PORT}/docs")
+        print(f"🔄 ReDoc: http://localhost:{settings.API_PORT}/redoc")
         if model_available:
             print("🤖 LLM Model: Loaded")
         else:
             print("🤖 LLM Model: Mock mode (no model file)")
         print("\n" + "="*50)
         
+        # Workers that exit are restarted; SIGHUP restarts them one at a time.
         uvicorn.run(
             "backend.app.main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
+            host=settings.API_HOST,
+            port=settings.API_PORT,
+            reload=not args.production,
+            workers=workers,
+            timeout_graceful_shutdown=settings.API_GRACEFUL_TIMEOUT_S,
+            http=settings.API_HTTP,
+            loop=settings.API_LOOP,
+            timeout_keep_alive=settings.API_KEEPALIVE_S,
             log_level="info"
         )
     except Exception as e:
@@ -0,0 +1 @@
+# Marker for telemetry package.
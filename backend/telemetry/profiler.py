@@ -0,0 +1,150 @@
+import heapq
+import itertools
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+
+@dataclass(eq=False)
+class Profile:
+    """Stack samples taken while one request was in flight, as collapsed-stack counts."""
+    label: str
+    started_at: float
+    duration_ms: float = 0.0
+    samples: "Counter[str]" = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format (``frame;frame;frame count``), for flamegraph.pl or speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": sum(self.samples.values()),
+        }
+
+
+class SlowRequestProfiler:
+    """
+    Sampling profiler in the style of py-spy: a background thread snapshots
+    every thread's stack each ``interval_ms`` while requests are in flight and
+    credits the samples to each of them, then only the slowest ``slowest_n``
+    requests' profiles are kept. Samples cover the whole process, so a request
+    that overlapped others also carries their stacks. Nothing runs while idle.
+    """
+    def __init__(self, slowest_n: int = 10, interval_ms: float = 5.0, max_depth: int = 64):
+        self.slowest_n = slowest_n
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+        self._active: Set[Profile] = set()
+        self._slowest: List[Any] = []  # min-heap of (duration_ms, sequence, Profile)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "SlowRequestProfiler":
+        return cls(settings.PROFILER_SLOWEST_N, settings.PROFILER_INTERVAL_MS)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def begin(self, label: str) -> Profile:
+        profile = Profile(label=label, started_at=time.time())
+        with self._lock:
+            self._active.add(profile)
+        self._wake.set()
+        return profile
+
+    def end(self, profile: Profile, duration_ms: float) -> None:
+        """Stop sampling for ``profile`` and keep it if it is among the slowest seen."""
+        profile.duration_ms = duration_ms
+        with self._lock:
+            self._active.discard(profile)
+            entry = (duration_ms, next(self._sequence), profile)
+            if len(self._slowest) < self.slowest_n:
+                heapq.heappush(self._slowest, entry)
+            elif duration_ms > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def profiles(self) -> List[Profile]:
+        """Kept profiles, slowest first."""
+        with self._lock:
+            return [profile for _, _, profile in sorted(self._slowest, reverse=True)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._slowest.clear()
+
+    def sample(self) -> None:
+        """Take one snapshot of every other thread's stack and credit it to the in-flight requests."""
+        with self._lock:
+            active = list(self._active)
+        if not active:
+            return
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        stacks = [
+            self._fold(names.get(ident, str(ident)), frame)
+            for ident, frame in sys._current_frames().items() if ident != own
+        ]
+        with self._lock:
+            for profile in active:
+                profile.samples.update(stacks)
+
+    def _fold(self, thread_name: str, frame: Any) -> str:
+        frames: List[str] = []
+        while frame is not None and len(frames) < self.max_depth:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(reversed(frames))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                idle = not self._active
+            if idle:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            self.sample()
+            self._stop.wait(self.interval)
+
+
+class ProfilerMiddleware:
+    """ASGI middleware that profiles every HTTP request with ``profiler`` and keeps the slowest."""
+    def __init__(self, app: Any, profiler: SlowRequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["path"].startswith("/debug/profiles"):
+            await self.app(scope, receive, send)
+            return
+        profile = self.profiler.begin(f"{scope['method']} {scope['path']}")
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.end(profile, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,320 @@
+import contextvars
+import functools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+# Finished spans of the trace being recorded in this context (None = not tracing).
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+STATEMENT_MAX_CHARS = 200
+
+
+class Span:
+    """One timed operation. Field names follow OpenTelemetry; ids are W3C trace-context hex strings."""
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _random_id(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Trace:
+    """Spans finished so far within one request; shared by every context (and thread) it was copied into."""
+    def __init__(self, trace_id: str, parent_id: Optional[str] = None):
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.spans: List[Span] = []
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value: total duration per span name, in start order."""
+        totals: Dict[str, float] = {}
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return ", ".join(f"{_token(name)};dur={ms:.1f}" for name, ms in totals.items())
+
+
+class _NoopSpan:
+    """Returned when tracing is off or the request was not sampled, so instrumented code costs one check."""
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    def __init__(self, span: Span, trace: Trace):
+        self.span = span
+        self.trace = trace
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.span.end_ns = time.time_ns()
+        if exc is not None:
+            self.span.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.trace.spans.append(self.span)
+
+
+class ConsoleSpanExporter:
+    """Writes each finished trace as one OTLP/JSON line to stderr."""
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stderr
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        self.stream.write(json.dumps(payload) + "\n")
+
+    def close(self) -> None:
+        self.stream.flush()
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+    """
+    Appends OTLP/JSON lines to ``path``, the format of the OpenTelemetry
+    Collector's file exporter, so the file can be replayed into any OTLP backend.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        super().__init__(self.path.open("a", encoding="utf-8", buffering=1))
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            super().export(payload)
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+class Tracer:
+    """
+    Records spans for sampled requests and hands each finished trace to the
+    exporter. Disabled, ``span()`` returns a shared no-op after one attribute
+    check, and nothing is allocated.
+    """
+    def __init__(self, enabled: bool = False, exporter: Optional[Any] = None, sample_rate: float = 1.0,
+                 service_name: str = "code-morningstar"):
+        self.enabled = enabled
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+
+    def configure(self, enabled: bool, exporter: Optional[Any] = None, sample_rate: float = 1.0) -> None:
+        self.shutdown()
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+
+    @classmethod
+    def exporter_from_settings(cls, settings: Any) -> Optional[Any]:
+        if settings.TRACING_EXPORTER == "console":
+            return ConsoleSpanExporter()
+        if settings.TRACING_EXPORTER == "file":
+            return FileSpanExporter(settings.TRACING_FILE)
+        return None
+
+    def span(self, name: str, **attributes: Any) -> Any:
+        """Time a block as a child of the current span; a no-op outside a sampled trace."""
+        if not self.enabled:
+            return NOOP_SPAN
+        trace = _current_trace.get()
+        if trace is None:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        parent_id = parent.span_id if parent is not None else trace.parent_id
+        return _ActiveSpan(Span(name, trace.trace_id, parent_id, attributes), trace)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+        """Add an already-timed interval (e.g. time spent queued) as a child of the current span."""
+        active = self.span(name, **attributes)
+        if active is not NOOP_SPAN:
+            active.span.start_ns, active.span.end_ns = start_ns, end_ns
+            active.trace.spans.append(active.span)
+
+    def start_trace(self, traceparent: Optional[str] = None) -> Optional[Tuple[Trace, contextvars.Token]]:
+        """
+        Begin recording a trace in the current context, continuing the caller's
+        W3C ``traceparent`` if given. Returns None when disabled or not sampled.
+        """
+        if not self.enabled:
+            return None
+        trace_id, parent_id, sampled = _parse_traceparent(traceparent)
+        if trace_id is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return None
+            trace_id = _random_id(16)
+        elif not sampled:
+            return None
+        trace = Trace(trace_id, parent_id)
+        return trace, _current_trace.set(trace)
+
+    def end_trace(self, trace: Trace, token: contextvars.Token) -> None:
+        _current_trace.reset(token)
+        if self.exporter is not None and trace.spans:
+            try:
+                self.exporter.export(self._payload(trace.spans))
+            except Exception as e:
+                print(f"Warning: could not export trace {trace.trace_id}: {e}")
+
+    def shutdown(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        resource = {"attributes": [
+            {"key": "service.name", "value": {"stringValue": self.service_name}},
+            {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+        ]}
+        return {"resourceSpans": [{
+            "resource": resource,
+            "scopeSpans": [{"scope": {"name": "backend.telemetry.tracing"}, "spans": [s.to_otlp() for s in spans]}],
+        }]}
+
+
+TRACER = Tracer()
+
+
+def span(name: str, **attributes: Any) -> Any:
+    return TRACER.span(name, **attributes)
+
+
+def traced(name: str, db_system: str, statement: bool = True) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorate a database service method so each call is a span. With
+    ``statement`` the first argument (the query text) is recorded as
+    ``db.statement``, truncated to ``STATEMENT_MAX_CHARS``.
+    """
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            if not TRACER.enabled or _current_trace.get() is None:
+                return fn(self, *args, **kwargs)
+            attributes = {"db.system": db_system}
+            if statement and args and isinstance(args[0], str):
+                attributes["db.statement"] = args[0][:STATEMENT_MAX_CHARS]
+            with TRACER.span(name, **attributes):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _random_id(n_bytes: int) -> str:
+    return random.getrandbits(n_bytes * 8).to_bytes(n_bytes, "big").hex()
+
+
+def _parse_traceparent(header: Optional[str]) -> Tuple[Optional[str], Optional[str], bool]:
+    # version-traceid-parentid-flags, e.g. 00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or set(parts[1]) == {"0"}:
+        return None, None, True
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None, None, True
+    return parts[1], parts[2], sampled
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _token(name: str) -> str:
+    # Server-Timing metric names are HTTP tokens.
+    return "".join(c if c.isalnum() or c in "!#$%&'*+-.^_`|~" else "_" for c in name)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware recording one trace per HTTP request, rooted in a server
+    span, and adding a ``Server-Timing`` header that sums the time of each
+    span name finished before the response started. Passes requests straight
+    through while tracing is disabled.
+    """
+    def __init__(self, app: Any, tracer: Tracer = TRACER):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers") or [])
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1")
+        started = self.tracer.start_trace(traceparent)
+        if started is None:
+            await self.app(scope, receive, send)
+            return
+        trace, token = started
+        root = self.tracer.span(f"{scope['method']} {scope['path']}", **{
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                root.span.set_attribute("http.status_code", message["status"])
+                total_ms = (time.time_ns() - root.span.start_ns) / 1e6
+                timings = [trace.server_timing(), f"total;dur={total_ms:.1f}", f'trace;desc="{trace.trace_id}"']
+                MutableHeaders(scope=message).append("Server-Timing", ", ".join(t for t in timings if t))
+            await send(message)
+
+        try:
+            with root:
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            self.tracer.end_trace(trace, token)
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.async_services import (
+    AsyncPostgresService, AsyncRedisService, AsyncSQLiteService, ThreadOffloadService, _to_numeric
+)
+from backend.services.db_router import DatabaseRouter
+from backend.services.sqlite_service import SQLiteService
+
+class SlowService:
+    """Blocking fake service that records how many calls overlap."""
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def find(self, db, collection, query):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return [query]
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+def test_async_sqlite_execute(tmp_path):
+    async def scenario():
+        db = AsyncSQLiteService(str(tmp_path / "test.db"))
+        await db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT)")
+        await asyncio.gather(*[
+            db.execute("INSERT INTO users (username) VALUES (?)", (f"user{i}",)) for i in range(20)
+        ])
+        rows = await db.execute("SELECT COUNT(*) FROM users")
+        await db.aclose()
+        return rows
+    assert asyncio.run(scenario()) == [(20,)]
+
+def test_offload_is_bounded_and_concurrent():
+    async def scenario():
+        service = SlowService()
+        offload = ThreadOffloadService(service, max_workers=4)
+        start = time.perf_counter()
+        results = await asyncio.gather(*[offload.find("db", "c", {"i": i}) for i in range(8)])
+        elapsed = time.perf_counter() - start
+        await offload.aclose()
+        return service.peak, elapsed, results
+    peak, elapsed, results = asyncio.run(scenario())
+    assert peak == 4
+    assert elapsed < 8 * 0.05  # calls overlapped instead of running one by one
+    assert results[3] == [{"i": 3}]
+
+def test_async_redis_get_set():
+    async def scenario():
+        redis = AsyncRedisService("localhost", 6379, client=FakeAsyncRedis())
+        await redis.set("key", b"value")
+        return await redis.get("key")
+    assert asyncio.run(scenario()) == b"value"
+
+def test_router_selects_async_services(tmp_path):
+    sqlite = SQLiteService(str(tmp_path / "test.db"))
+    redis = AsyncRedisService("localhost", 6379, client=FakeAsyncRedis())
+    router = DatabaseRouter({"sqlite": sqlite}, async_services={"redis": redis})
+    assert router.get_service("sqlite") is sqlite
+    assert router.get_service("redis", use_async=True) is redis
+    offloaded = router.get_service("sqlite", use_async=True)
+    assert isinstance(offloaded, ThreadOffloadService)
+    assert router.get_service("sqlite", use_async=True) is offloaded
+    assert asyncio.run(offloaded.execute("SELECT 1")) == [(1,)]
+    with pytest.raises(ValueError, match="Unsupported database type"):
+        router.get_service("oracle", use_async=True)
+
+def test_postgres_placeholders_match_the_sync_service():
+    assert _to_numeric("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%' AND c = %s") == \
+        "SELECT * FROM t WHERE a = $1 AND b LIKE 'x%' AND c = $2"
+
+def test_async_postgres_fetches_rows_and_executes_statements():
+    class FakeConnection:
+        def __init__(self):
+            self.calls = []
+
+        async def fetch(self, query, *args):
+            self.calls.append(("fetch", query, args))
+            return [{"id": 1}.values()]
+
+        async def execute(self, query, *args):
+            self.calls.append(("execute", query, args))
+            return "UPDATE 1"
+
+    class FakePool:
+        def __init__(self, conn):
+            self.conn = conn
+
+        def acquire(self):
+            pool = self
+
+            class Acquire:
+                async def __aenter__(self):
+                    return pool.conn
+
+                async def __aexit__(self, *exc):
+                    return False
+            return Acquire()
+
+    conn = FakeConnection()
+    # asyncpg is optional; the pool is all execute needs.
+    db = AsyncPostgresService.__new__(AsyncPostgresService)
+    db._pool = FakePool(conn)
+
+    async def scenario():
+        rows = await db.execute("SELECT id FROM users WHERE name = %s", ("a",))
+        status = await db.execute("UPDATE users SET name = %s WHERE id = %s", ("b", 1))
+        return rows, status
+    assert asyncio.run(scenario()) == ([(1,)], None)
+    assert conn.calls == [("fetch", "SELECT id FROM users WHERE name = $1", ("a",)),
+                          ("execute", "UPDATE users SET name = $1 WHERE id = $2", ("b", 1))]
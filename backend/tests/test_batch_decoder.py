@@ -0,0 +1,170 @@
+import pytest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services import llm_service
+from backend.services.batch_decoder import BatchDecoder, supports_batching
+from backend.services.batching import ContinuousBatcher
+from backend.services.llm_service import LLMService
+
+EOS = 0
+
+class FakeLib:
+    """The slice of llama_cpp's low-level API BatchDecoder uses. The "model" predicts token + 1."""
+    def __init__(self):
+        self.decodes = []
+        self.removed = []
+        self.params = None
+        self.freed = 0
+
+    def llama_context_default_params(self):
+        return SimpleNamespace()
+
+    def llama_init_from_model(self, model, params):
+        self.params = params
+        return "ctx"
+
+    def llama_batch_init(self, n_tokens, embd, n_seq_max):
+        return SimpleNamespace(token=[0] * n_tokens, pos=[0] * n_tokens, n_seq_id=[0] * n_tokens,
+                               seq_id=[[0] for _ in range(n_tokens)], logits=[False] * n_tokens, n_tokens=0)
+
+    def llama_decode(self, ctx, batch):
+        self.decodes.append([(batch.token[i], batch.pos[i], batch.seq_id[i][0], batch.logits[i])
+                             for i in range(batch.n_tokens)])
+        return 0
+
+    def llama_get_logits_ith(self, ctx, index):
+        token, _, _, logits = self.decodes[-1][index]
+        assert logits
+        return token + 1
+
+    def llama_get_memory(self, ctx):
+        return "memory"
+
+    def llama_memory_seq_rm(self, memory, seq_id, p0, p1):
+        self.removed.append(seq_id)
+
+    def llama_batch_free(self, batch):
+        pass
+
+    def llama_free(self, ctx):
+        self.freed += 1
+
+class FakeLlama:
+    _model = SimpleNamespace(model="model")
+
+    def __init__(self, eos=EOS):
+        self.eos = eos
+
+    def n_vocab(self):
+        return 1000
+
+    def token_eos(self):
+        return self.eos
+
+    def tokenize(self, text, add_bos=True):
+        return [len(word) for word in text.split()]
+
+    def detokenize(self, tokens):
+        return "".join(f"t{token} " for token in tokens).encode()
+
+def greedy(logits, n_vocab, temperature):
+    return logits
+
+@pytest.fixture
+def lib():
+    return FakeLib()
+
+def make_decoder(lib, slots=4, n_batch=512, eos=EOS):
+    return BatchDecoder(FakeLlama(eos), lib, slots, n_ctx=256, n_threads=1, n_batch=n_batch, sampler=greedy)
+
+def test_context_has_a_sequence_per_slot(lib):
+    make_decoder(lib, slots=4)
+    assert lib.params.n_seq_max == 4
+    assert lib.params.n_ctx == 4 * 256
+    assert supports_batching(lib)
+
+def test_one_decode_per_step_for_all_sequences(lib):
+    decoder = make_decoder(lib)
+    first = decoder.open([10, 20], max_tokens=3, temperature=0.0)
+    second = decoder.open([50], max_tokens=3, temperature=0.0)
+    assert decoder.step([first, second]) == ["t21 ", "t51 "]
+    # Single pending tokens go first, prompts fill the rest of the batch.
+    assert lib.decodes[-1] == [(50, 0, second.slot, True), (10, 0, first.slot, False), (20, 1, first.slot, True)]
+    assert decoder.step([first, second]) == ["t22 ", "t52 "]
+    # Each sequence continues at its own position with the token it sampled.
+    assert lib.decodes[-1] == [(21, 2, first.slot, True), (51, 1, second.slot, True)]
+    assert len(lib.decodes) == 2
+
+def test_long_prompt_is_split_across_steps(lib):
+    decoder = make_decoder(lib, slots=2, n_batch=4)
+    generating = decoder.open([7], max_tokens=10, temperature=0.0)
+    prompt = decoder.open([1, 2, 3, 4, 5, 6], max_tokens=10, temperature=0.0)
+    assert decoder.step([generating, prompt]) == ["t8 ", ""]
+    assert decoder.step([generating, prompt]) == ["t9 ", "t7 "]
+    assert [len(tokens) for tokens in lib.decodes] == [4, 4]
+    assert [pos for _, pos, seq, _ in lib.decodes[1] if seq == prompt.slot] == [3, 4, 5]
+
+def test_sequences_finish_on_eos_stop_and_length(lib):
+    decoder = make_decoder(lib, eos=12)
+    eos = decoder.open([11], max_tokens=5, temperature=0.0)
+    length = decoder.open([30], max_tokens=2, temperature=0.0)
+    assert decoder.step([eos, length]) == [None, "t31 "]
+    assert decoder.step([eos, length]) == [None, "t32 "]
+    assert decoder.step([eos, length]) == [None, None]
+
+    stopped = decoder.open([40], max_tokens=5, temperature=0.0, stop=["t42"])
+    assert decoder.step([stopped]) == ["t41 "]
+    assert decoder.step([stopped]) == [""]
+    assert stopped.text == "t41 "
+    assert decoder.step([stopped]) == [None]
+
+def test_close_frees_the_slot_and_its_cache(lib):
+    decoder = make_decoder(lib, slots=1)
+    sequence = decoder.open([1], max_tokens=5, temperature=0.0)
+    with pytest.raises(RuntimeError, match="slots are in use"):
+        decoder.open([2], max_tokens=5, temperature=0.0)
+    slot = sequence.slot
+    sequence.close()
+    assert lib.removed == [slot]
+    assert decoder.free_slots == 1
+
+def test_batcher_decodes_real_sequences_together(lib, monkeypatch):
+    llm = LLMService("/nonexistent/path/model.gguf", batch_slots=4, min_completion_tokens=1)
+    llm._llm = FakeLlama(eos=-1)
+    monkeypatch.setattr(llm_service, "llama_cpp", lib)
+    monkeypatch.setattr("backend.services.batch_decoder.sample_logits", greedy)
+    assert llm.max_batch_sequences == 4
+    batcher = ContinuousBatcher(llm, max_batch_size=4, batch_window_ms=50)
+    batcher.start()
+    try:
+        futures = [batcher.submit("a" * (i + 1), max_tokens=5, temperature=0.0) for i in range(4)]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.stop()
+    assert [result.text for result in results] == [" ".join(f"t{i + n}" for n in range(2, 7)) for i in range(4)]
+    # Five tokens each, four sequences, one llama_decode per step.
+    assert len(lib.decodes) == 5
+    assert batcher.stats()["tokens_generated"] == 20
+    assert all(len(tokens) == 4 for tokens in lib.decodes)
+
+def test_service_close_frees_the_batch_context(lib, monkeypatch):
+    llm = LLMService("/nonexistent/path/model.gguf", batch_slots=2, min_completion_tokens=1)
+    llm._llm = FakeLlama(eos=-1)
+    monkeypatch.setattr(llm_service, "llama_cpp", lib)
+    monkeypatch.setattr("backend.services.batch_decoder.sample_logits", greedy)
+    sequence = llm.open_sequence("a b", max_tokens=5, temperature=0.0)
+    assert llm._get_batch_decoder() is sequence.decoder
+    llm.close()
+    assert lib.freed == 1
+    with pytest.raises(RuntimeError, match="closed"):
+        llm.decode_step([sequence])
+    sequence.close()
+    llm.close()
+    assert lib.freed == 1
+    # The next batched sequence gets a fresh context.
+    assert llm.open_sequence("c", max_tokens=5, temperature=0.0).decoder is not sequence.decoder
@@ -0,0 +1,111 @@
+import json
+import pytest
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.testclient import TestClient
+from backend.app.main import get_application
+from backend.batch import main as batch_main
+from backend.services.batch_jobs import BatchProgress, load_checkpoint, parse_jsonl, plan_groups, run_groups
+from backend.services.llm_service import LLMService
+
+PROMPTS = [
+    {"id": "a", "prompt": "a much longer prompt than the others"},
+    {"id": "b", "prompt": "short"},
+    {"id": "c", "prompt": "short"},
+    {"request_id": "d", "title": "Title", "body": "Body text"},
+]
+
+def _jsonl(records):
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+def test_parse_jsonl_reads_prompt_or_title_and_body():
+    items = parse_jsonl(_jsonl(PROMPTS).splitlines() + [""], max_tokens=16)
+    assert [item.id for item in items] == ["a", "b", "c", "d"]
+    assert items[3].prompt == "Title\n\nBody text"
+    assert items[0].max_tokens == 16
+    with pytest.raises(ValueError, match="Line 2"):
+        parse_jsonl(['{"prompt": "ok"}', "not json"])
+    with pytest.raises(ValueError, match="no prompt"):
+        parse_jsonl(['{"id": 1}'])
+
+def test_plan_groups_dedups_sorts_and_skips_done():
+    groups = plan_groups(parse_jsonl(_jsonl(PROMPTS).splitlines()), done={"d"})
+    assert [group.ids for group in groups] == [["b", "c"], ["a"]]
+
+def test_run_groups_marks_duplicates_and_counts_tokens():
+    llm = LLMService("/nonexistent/path/model.gguf")
+    groups = plan_groups(parse_jsonl(_jsonl(PROMPTS).splitlines()))
+    progress = BatchProgress(total=4)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        submit = lambda group: executor.submit(llm.generate, group.prompt, group.max_tokens, group.temperature)
+        records = list(run_groups(groups, submit, concurrency=2, progress=progress))
+    by_id = {record["id"]: record for record in records}
+    assert set(by_id) == {"a", "b", "c", "d"}
+    assert by_id["b"]["response"] == by_id["c"]["response"]
+    assert sorted([by_id["b"]["cache"], by_id["c"]["cache"]]) == ["dedup", "miss"]
+    summary = progress.summary()
+    assert summary["prompts"] == 4 and summary["failed"] == 0
+    assert summary["generated_tokens"] == sum(by_id[id]["completion_tokens"] for id in ("a", "b", "d"))
+
+def test_run_groups_reports_failures_per_item():
+    groups = plan_groups(parse_jsonl(_jsonl(PROMPTS).splitlines()))
+    def submit(group):
+        raise RuntimeError("model crashed")
+    progress = BatchProgress(total=4)
+    records = list(run_groups(groups, submit, concurrency=4, progress=progress))
+    assert all(record["error"] == "model crashed" for record in records)
+    assert progress.failed == 4
+
+def test_closing_run_groups_cancels_queued_work():
+    from concurrent.futures import Future
+    groups = plan_groups(parse_jsonl(_jsonl(PROMPTS).splitlines()))
+    futures = []
+    def submit(group):
+        future = Future()
+        if not futures:
+            future.set_result(LLMService("/nonexistent/path/model.gguf").generate(group.prompt))
+        futures.append(future)
+        return future
+    records = run_groups(groups, submit, concurrency=3)
+    next(records)
+    records.close()
+    assert [future.cancelled() for future in futures] == [False, True, True]
+
+def test_load_checkpoint_drops_truncated_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text('{"id": "a", "response": "x"}\n{"id": "b", "resp')
+    assert load_checkpoint(path) == {"a"}
+    assert path.read_text() == '{"id": "a", "response": "x"}\n'
+    assert load_checkpoint(tmp_path / "missing.jsonl") == set()
+
+def test_load_checkpoint_retries_failed_ids(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text('{"id": "a", "response": "x", "error": null}\n{"id": "b", "error": "model crashed"}\n')
+    assert load_checkpoint(path) == {"a"}
+
+def test_cli_resumes_from_output(tmp_path, capsys):
+    prompts = tmp_path / "prompts.jsonl"
+    prompts.write_text(_jsonl(PROMPTS))
+    output = tmp_path / "out.jsonl"
+    output.write_text(json.dumps({"id": "a", "response": "done earlier"}) + "\n")
+    assert batch_main([str(prompts), "-o", str(output), "--batch-size", "1"]) == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [record["id"] for record in records][0] == "a"
+    assert sorted(record["id"] for record in records) == ["a", "b", "c", "d"]
+    summary = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+    assert summary["prompts"] == 3 and summary["skipped"] == 1
+
+def test_batch_endpoint_streams_jsonl():
+    with TestClient(get_application()) as client:
+        response = client.post("/llm/generate/batch?max_tokens=32", content=_jsonl(PROMPTS))
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        *records, last = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(record["id"] for record in records) == ["a", "b", "c", "d"]
+        assert last["summary"]["prompts"] == 4
+        assert client.post("/llm/generate/batch", content="{bad").status_code == 400
@@ -0,0 +1,49 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.batching import ContinuousBatcher
+from backend.services.llm_service import LLMService
+
+@pytest.fixture
+def llm():
+    return LLMService("/nonexistent/path/model.gguf", mock_token_delay=0.005)
+
+@pytest.fixture
+def batcher(llm):
+    batcher = ContinuousBatcher(llm, max_batch_size=4, batch_window_ms=20)
+    batcher.start()
+    yield batcher
+    batcher.stop()
+
+def test_batched_results_match_sequential(llm, batcher):
+    prompts = [f"prompt {i}" for i in range(6)]
+    futures = [batcher.submit(prompt) for prompt in prompts]
+    assert [future.result().text for future in futures] == [llm.generate(prompt).text for prompt in prompts]
+
+def test_batch_shares_decode_steps(batcher):
+    futures = [batcher.submit(f"prompt {i}") for i in range(4)]
+    for future in futures:
+        future.result()
+    assert all(future.result().completion_tokens > 0 for future in futures)
+    stats = batcher.stats()
+    assert stats["steps"] < stats["tokens_generated"]
+    assert stats["avg_batch_occupancy"] > 1
+
+def test_new_sequence_joins_running_batch(batcher):
+    long_prompt = " ".join("abcdefghijklmnopqrstuvwxyz")
+    running = batcher.submit(long_prompt)
+    while batcher.steps == 0:
+        time.sleep(0.001)
+    joined = batcher.submit("x")
+    joined.result()
+    assert not running.done()  # finished without waiting for the batch to drain
+    running.result()
+
+def test_batcher_rejects_empty_prompt(batcher):
+    with pytest.raises(ValueError, match="Prompt cannot be empty"):
+        batcher.submit(" ")
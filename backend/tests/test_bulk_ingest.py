@@ -0,0 +1,104 @@
+import json
+import pytest
+import sys
+from collections import namedtuple
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from elastic_transport import ApiResponseMeta, BaseNode, HttpHeaders
+from elasticsearch import Elasticsearch
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.elasticsearch_service import ElasticsearchService
+from backend.services.mongo_service import MongoService
+
+NodeResponse = namedtuple("NodeResponse", ["meta", "body"])
+
+class FakeNode(BaseNode):
+    """Answers bulk and point-in-time requests in process; the first ``reject`` bulk items get a 429."""
+    requests = []
+    reject = 0
+    documents = []
+
+    def perform_request(self, method, target, body=None, headers=None, request_timeout=None):
+        FakeNode.requests.append((method, target, json.loads(body) if body and not target.endswith("_bulk") else body))
+        if target.endswith("_bulk"):
+            items = []
+            for _ in range(len(body.splitlines()) // 2):
+                status = 429 if FakeNode.reject > 0 else 201
+                FakeNode.reject -= 1
+                items.append({"index": {"status": status, "_id": "x", "error": {"type": "es_rejected"} if status == 429 else None}})
+            data = {"took": 1, "errors": any(i["index"]["status"] != 201 for i in items), "items": items}
+        elif "_pit" in target and method == "POST":
+            data = {"id": "pit-1"}
+        elif "_pit" in target:
+            data = {"succeeded": True, "num_freed": 1}
+        else:
+            request = json.loads(body)
+            start = request.get("search_after", [-1])[0] + 1
+            hits = [{"_source": doc, "sort": [i]} for i, doc in enumerate(FakeNode.documents) if i >= start]
+            data = {"pit_id": "pit-1", "hits": {"hits": hits[:request["size"]]}}
+        headers = HttpHeaders({"x-elastic-product": "Elasticsearch", "content-type": "application/json"})
+        return NodeResponse(ApiResponseMeta(200, "1.1", headers, 0.0, self.config), json.dumps(data).encode())
+
+@pytest.fixture
+def es():
+    FakeNode.requests, FakeNode.reject, FakeNode.documents = [], 0, []
+    return ElasticsearchService("unused", 0, client=Elasticsearch("http://localhost:9200", node_class=FakeNode))
+
+def bulk_requests():
+    return [r for r in FakeNode.requests if r[1].endswith("_bulk")]
+
+def test_bulk_index_chunks_generator(es):
+    result = es.bulk_index("docs", ({"n": i} for i in range(1200)), chunk_size=500)
+    assert result == {"indexed": 1200, "failed": 0, "errors": []}
+    assert len(bulk_requests()) == 3
+
+def test_bulk_index_chunks_by_bytes(es):
+    es.bulk_index("docs", ({"text": "x" * 1000} for i in range(100)), chunk_size=500, max_chunk_bytes=20_000)
+    assert len(bulk_requests()) > 1
+
+def test_bulk_index_retries_429(es):
+    FakeNode.reject = 3
+    result = es.bulk_index("docs", ({"n": i} for i in range(10)), initial_backoff=0)
+    assert result["indexed"] == 10 and result["failed"] == 0
+    assert len(bulk_requests()) == 2
+
+def test_export_pages_with_point_in_time(es):
+    FakeNode.documents = [{"n": i} for i in range(25)]
+    hits = list(es.export("docs", batch_size=10))
+    assert [hit["_source"]["n"] for hit in hits] == list(range(25))
+    searches = [r for r in FakeNode.requests if r[1].endswith("_search")]
+    assert len(searches) == 3 and all(s[2]["pit"]["id"] == "pit-1" for s in searches)
+    assert FakeNode.requests[-1][0] == "DELETE"
+
+def test_mongo_insert_many_streams_unordered_batches():
+    client = MagicMock()
+    collection = client["db"]["docs"]
+    collection.insert_many.side_effect = lambda batch, ordered: MagicMock(inserted_ids=list(range(len(batch))))
+    service = MongoService("mongodb://unused", client=client)
+    assert service.insert_many("db", "docs", ({"n": i} for i in range(2500))) == {"inserted": 2500, "errors": []}
+    assert [len(c.args[0]) for c in collection.insert_many.call_args_list] == [1000, 1000, 500]
+    assert all(c.kwargs["ordered"] is False for c in collection.insert_many.call_args_list)
+
+def test_mongo_insert_many_continues_after_write_errors():
+    client = MagicMock()
+    collection = client["db"]["docs"]
+    error = BulkWriteError({"nInserted": 9, "writeErrors": [{"index": 3, "code": 11000}]})
+    collection.insert_many.side_effect = [error, MagicMock(inserted_ids=[1] * 5)]
+    service = MongoService("mongodb://unused", client=client)
+    result = service.insert_many("db", "docs", ({"n": i} for i in range(15)), batch_size=10)
+    assert result == {"inserted": 14, "errors": [{"index": 3, "code": 11000}]}
+
+def test_mongo_bulk_write_aggregates_counts():
+    client = MagicMock()
+    collection = client["db"]["docs"]
+    collection.bulk_write.return_value.bulk_api_result = {"nInserted": 1, "nMatched": 1, "nModified": 1}
+    service = MongoService("mongodb://unused", client=client)
+    operations = [InsertOne({"n": 1}), UpdateOne({"n": 1}, {"$set": {"m": 2}})] * 3
+    result = service.bulk_write("db", "docs", operations, batch_size=2)
+    assert result["inserted"] == 3 and result["modified"] == 3 and collection.bulk_write.call_count == 3
@@ -0,0 +1,51 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import cassandra.concurrent
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.cassandra_service import CassandraService, _to_qmark
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.prepare.side_effect = lambda cql: MagicMock(name=f"prepared:{cql}", query_string=cql)
+    return session
+
+def test_statements_are_prepared_once(session):
+    service = CassandraService("unused", 0, session=session)
+    for i in range(5):
+        service.execute("SELECT * FROM users WHERE id = %s", (i,))
+    session.prepare.assert_called_once_with("SELECT * FROM users WHERE id = ?")
+    assert session.execute.call_count == 5
+    assert session.execute.call_args.args[0].query_string == "SELECT * FROM users WHERE id = ?"
+
+def test_unparameterized_cql_is_not_prepared(session):
+    service = CassandraService("unused", 0, session=session)
+    service.execute("CREATE TABLE t (id int PRIMARY KEY)")
+    session.prepare.assert_not_called()
+
+def test_placeholders_inside_literals_are_kept():
+    assert _to_qmark("SELECT * FROM t WHERE a = %s AND b = '100%s'") == "SELECT * FROM t WHERE a = ? AND b = '100%s'"
+
+def test_execute_concurrent_uses_prepared_statement(session, monkeypatch):
+    calls = []
+    monkeypatch.setattr(cassandra.concurrent, "execute_concurrent_with_args",
+                        lambda *args, **kwargs: calls.append((args, kwargs)) or [(True, [])])
+    service = CassandraService("unused", 0, session=session)
+    assert service.execute_concurrent("INSERT INTO t (id) VALUES (%s)", [(1,), (2,)], concurrency=16) == [(True, [])]
+    (passed_session, statement, params), kwargs = calls[0]
+    assert passed_session is session and statement.query_string == "INSERT INTO t (id) VALUES (?)"
+    assert kwargs["concurrency"] == 16
+
+def test_iterate_sets_fetch_size(session):
+    session.execute.return_value = iter([("a",), ("b",)])
+    service = CassandraService("unused", 0, fetch_size=100, session=session)
+    assert list(service.iterate("SELECT * FROM t WHERE p = %s", ("x",), fetch_size=10)) == [("a",), ("b",)]
+    bound = session.execute.call_args.args[0]
+    assert bound.fetch_size == 10
+    assert session.default_fetch_size == 100
@@ -0,0 +1,89 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.testclient import TestClient
+from backend.app.main import get_application
+from backend.services.context_window import TokenCache, plan_context, truncate, windows
+from backend.services.llm_service import LLMService
+from backend.settings import settings
+
+def mock_service(n_ctx=256, truncation="error"):
+    return LLMService("/nonexistent/model.gguf", n_ctx=n_ctx, truncation=truncation, min_completion_tokens=16)
+
+def words(count):
+    return " ".join(f"w{index}" for index in range(count))
+
+def test_plan_clamps_max_tokens_to_remaining_context():
+    plan = plan_context(prompt_tokens=1900, max_tokens=256, n_ctx=2048, min_completion=64)
+    assert (plan.prompt_tokens, plan.max_tokens, plan.truncated_tokens) == (1900, 148, 0)
+
+def test_plan_rejects_or_truncates_oversized_prompts():
+    with pytest.raises(ValueError, match="3000 tokens"):
+        plan_context(prompt_tokens=3000, max_tokens=256, n_ctx=2048)
+    plan = plan_context(prompt_tokens=3000, max_tokens=256, n_ctx=2048, strategy="tail")
+    assert (plan.prompt_tokens, plan.max_tokens, plan.truncated_tokens) == (1792, 256, 1208)
+    # The completion never takes more than half the context from the prompt.
+    assert plan_context(prompt_tokens=3000, max_tokens=2048, n_ctx=2048, strategy="head").prompt_tokens == 1024
+
+def test_plan_never_truncates_a_prompt_below_half_the_context():
+    # min_completion above n_ctx // 2: the prompt misses the reserve but is kept whole.
+    plan = plan_context(prompt_tokens=250, max_tokens=400, n_ctx=512, strategy="tail", min_completion=300)
+    assert (plan.prompt_tokens, plan.max_tokens, plan.truncated_tokens) == (250, 262, 0)
+
+def test_truncate_strategies():
+    tokens = list(range(10))
+    assert truncate(tokens, 4, "head") == [0, 1, 2, 3]
+    assert truncate(tokens, 4, "tail") == [6, 7, 8, 9]
+    assert truncate(tokens, 5, "middle_out") == [0, 1, 2, 8, 9]
+
+def test_windows_overlap_and_cover_the_input():
+    assert windows(10, 4, 1) == [(0, 4), (3, 7), (6, 10)]
+    assert windows(3, 4, 1) == [(0, 3)]
+    with pytest.raises(ValueError):
+        windows(10, 4, 4)
+
+def test_token_cache_tokenizes_each_text_once():
+    calls = []
+    cache = TokenCache(max_entries=1)
+    tokenize = lambda text: calls.append(text) or [len(text)]
+    assert cache.get("abc", tokenize) == cache.get("abc", tokenize) == [3]
+    cache.get("de", tokenize)
+    cache.get("abc", tokenize)
+    assert calls == ["abc", "de", "abc"]
+
+def test_service_truncates_before_generating():
+    service = mock_service(truncation="tail")
+    result = service.generate(words(400), max_tokens=64)
+    assert result.prompt_tokens == 256 - 64 and result.truncated_tokens == 400 - 192
+    assert "w399" not in service.generate(words(400), max_tokens=64, truncation="head").text
+    with pytest.raises(ValueError, match="400 tokens"):
+        mock_service().generate(words(400), max_tokens=64)
+
+def test_chunk_text_windows_fit_with_the_instruction():
+    service = mock_service()
+    chunks = service.chunk_text(words(1000), "Summarize.", max_tokens=64, overlap_tokens=8)
+    assert len(chunks) > 1
+    assert chunks[0].split()[-8:] == chunks[1].split()[:8]
+    for chunk in chunks:
+        service.fit_context(f"Summarize.\n\n[Part 1 of 9]\n{chunk}", 64)  # never raises
+
+def test_context_and_chunked_endpoints(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_N_CTX", 512)
+    with TestClient(get_application()) as client:
+        plan = client.post("/llm/context", json={"prompt": words(3000), "max_tokens": 128}).json()
+        assert plan["prompt_tokens"] == 3000 and not plan["fits"] and "3000 tokens" in plan["error"]
+        plan = client.post("/llm/context", json={"prompt": words(3000), "truncation": "middle_out"}).json()
+        assert plan["truncated_tokens"] > 0 and plan["planned_prompt_tokens"] + plan["max_tokens"] <= plan["n_ctx"]
+        assert client.post("/llm/generate", json={"prompt": words(700)}).status_code == 400
+        clamped = client.post("/llm/generate", json={"prompt": words(700), "max_tokens": 1024, "truncation": "tail"})
+        assert clamped.json()["usage"]["truncated_tokens"] == 700 - 256
+        response = client.post("/llm/generate/chunked", json={
+            "text": words(5000), "instruction": "List the words.", "max_tokens": 64, "window_tokens": 400
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body["chunks"]) == 15 and body["response"].startswith("[MOCK]")
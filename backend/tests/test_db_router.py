@@ -0,0 +1,122 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.db_cluster import (
+    CircuitBreaker, CircuitOpenError, DatabaseCluster, Endpoint, HashRing, NoHealthyEndpointError, ShardedDatabase
+)
+from backend.services.db_router import DatabaseRouter
+from backend.services.sqlite_service import SQLiteService
+
+class BrokenService:
+    def execute(self, query, params=()):
+        raise ConnectionError("node down")
+
+def node(tmp_path, name, role="replica"):
+    service = SQLiteService(str(tmp_path / f"{name}.db"))
+    service.execute("CREATE TABLE IF NOT EXISTS items (name TEXT)")
+    service.execute("INSERT INTO items VALUES (?)", (name,))
+    return Endpoint(name, service, role=role)
+
+def served_by(endpoint):
+    return endpoint.execute("SELECT name FROM items")[0][0]
+
+def test_reads_go_to_replicas_and_writes_to_primary(tmp_path):
+    router = DatabaseRouter({})
+    router.add_cluster("main", DatabaseCluster(node(tmp_path, "primary"), [node(tmp_path, "r1"), node(tmp_path, "r2")]))
+    assert served_by(router.get_service("main")) == "primary"
+    assert served_by(router.get_service("main", readonly=True)) in ("r1", "r2")
+
+def test_reads_prefer_least_loaded_replica(tmp_path):
+    slow, fast = node(tmp_path, "slow"), node(tmp_path, "fast")
+    slow.latency_ewma, fast.latency_ewma = 0.050, 0.005
+    cluster = DatabaseCluster(node(tmp_path, "primary"), [slow, fast])
+    assert cluster.reader() is fast
+    fast.in_flight = 20
+    assert cluster.reader() is slow
+
+def test_unhealthy_replica_is_skipped_and_primary_is_fallback(tmp_path):
+    primary = node(tmp_path, "primary")
+    broken = Endpoint("broken", BrokenService())
+    router = DatabaseRouter({})
+    router.add_cluster("main", DatabaseCluster(primary, [broken]))
+    assert router.check_health() == {"primary": True, "broken": False}
+    assert router.get_service("main", readonly=True) is primary
+    primary.healthy = False
+    with pytest.raises(NoHealthyEndpointError):
+        router.get_service("main", readonly=True)
+
+def test_circuit_breaker_opens_and_half_opens():
+    endpoint = Endpoint("flaky", BrokenService(), breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.05))
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            endpoint.execute("SELECT 1")
+    assert endpoint.breaker.state == "open" and not endpoint.available
+    with pytest.raises(CircuitOpenError):
+        endpoint.execute("SELECT 1")
+    time.sleep(0.06)
+    assert endpoint.breaker.state == "half_open"
+    with pytest.raises(ConnectionError):
+        endpoint.execute("SELECT 1")
+    assert endpoint.breaker.state == "open"
+
+def test_background_health_checks(tmp_path):
+    broken = Endpoint("broken", BrokenService())
+    router = DatabaseRouter({})
+    router.add_cluster("main", DatabaseCluster(node(tmp_path, "primary"), [broken]))
+    router.start_health_checks(interval=0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while broken.healthy and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        router.stop_health_checks()
+    assert not broken.healthy
+
+def test_sharding_is_consistent(tmp_path):
+    shards = {name: DatabaseCluster(node(tmp_path, name)) for name in ("s1", "s2", "s3")}
+    router = DatabaseRouter({})
+    router.add_cluster("tenants", ShardedDatabase(shards))
+    owners = {tenant: served_by(router.get_service("tenants", shard_key=tenant)) for tenant in range(60)}
+    assert set(owners.values()) == {"s1", "s2", "s3"}
+    assert all(served_by(router.get_service("tenants", shard_key=t)) == owner for t, owner in owners.items())
+    with pytest.raises(ValueError):
+        router.get_service("tenants")
+
+def test_hash_ring_moves_few_keys_when_growing():
+    ring = HashRing(["a", "b", "c"])
+    before = {key: ring.get(str(key)) for key in range(1000)}
+    ring.add("d")
+    moved = sum(1 for key, owner in before.items() if ring.get(str(key)) != owner)
+    assert moved < 400
+
+def test_endpoint_stats(tmp_path):
+    router = DatabaseRouter({"sqlite": object()})
+    router.add_cluster("main", DatabaseCluster(node(tmp_path, "primary")))
+    router.get_service("main").execute("SELECT 1")
+    stats = router.stats()["primary"]
+    assert stats["role"] == "primary" and stats["requests"] >= 1 and stats["latency_ms_p95"] is not None
+
+def test_streaming_calls_are_timed_until_exhausted():
+    class StreamingService:
+        def iterate(self, fail=False):
+            yield 1
+            time.sleep(0.02)
+            if fail:
+                raise ConnectionError("node down")
+            yield 2
+
+    endpoint = Endpoint("stream", StreamingService(), breaker=CircuitBreaker(failure_threshold=1))
+    rows = endpoint.iterate()
+    assert next(rows) == 1
+    assert endpoint.in_flight == 1 and endpoint.requests == 0
+    assert list(rows) == [2]
+    assert endpoint.in_flight == 0 and endpoint.requests == 1
+    assert endpoint.latency_ewma >= 0.02
+    with pytest.raises(ConnectionError):
+        list(endpoint.iterate(fail=True))
+    assert endpoint.errors == 1 and endpoint.breaker.state == "open"
@@ -13,9 +13,53 @@ def db(tmp_path):
     db_file = tmp_path / "test.db"
     service = SQLiteService(str(db_file))
     service.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, username TEXT)")
-    return service
+    yield service
+    service.close()
 
 def test_insert_and_select(db):
     db.execute("INSERT INTO users (username) VALUES (?)", ("testuser",))
     rows = db.execute("SELECT username FROM users")
     assert rows[0][0] == "testuser"
+
+def test_connection_is_reused(db):
+    db.execute("SELECT 1")
+    db.execute("SELECT 1")
+    assert len(db._connections) == 1
+
+def test_wal_mode(db):
+    assert db.execute("PRAGMA journal_mode")[0][0] == "wal"
+
+def test_executemany(db):
+    assert db.executemany("INSERT INTO users (username) VALUES (?)", [("a",), ("b",), ("c",)]) == 3
+    assert db.execute("SELECT COUNT(*) FROM users")[0][0] == 3
+
+def test_bulk_insert(db):
+    rows = ((f"user{i}",) for i in range(2500))
+    assert db.bulk_insert("users", ["username"], rows, batch_size=1000) == 2500
+    assert db.execute("SELECT COUNT(*) FROM users")[0][0] == 2500
+
+def test_transaction_rolls_back_on_error(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.execute("INSERT INTO users (username) VALUES (?)", ("ghost",))
+            raise RuntimeError("boom")
+    assert db.execute("SELECT COUNT(*) FROM users")[0][0] == 0
+
+def test_transaction_commits(db):
+    with db.transaction():
+        db.execute("INSERT INTO users (username) VALUES (?)", ("a",))
+        db.execute("INSERT INTO users (username) VALUES (?)", ("b",))
+    assert db.execute("SELECT COUNT(*) FROM users")[0][0] == 2
+
+def test_iterate_streams_rows(db):
+    db.bulk_insert("users", ["username"], [(f"user{i}",) for i in range(10)])
+    rows = db.iterate("SELECT username FROM users ORDER BY id", batch_size=3)
+    assert next(rows) == ("user0",)
+    assert [row[0] for row in rows] == [f"user{i}" for i in range(1, 10)]
+
+def test_concurrent_threads_share_pool(db):
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: db.execute("INSERT INTO users (username) VALUES (?)", (f"u{i}",)), range(100)))
+    assert db.execute("SELECT COUNT(*) FROM users")[0][0] == 100
+    assert len(db._connections) <= db.pool_size
@@ -0,0 +1,87 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.feature_flags.manager import FeatureFlagManager
+
+FLAGS = """
+enable_llm: true
+debug_mode: false
+max_prompt_chars: 4000
+half_rollout:
+  rollout: 50
+tenant_only:
+  rollout: 0
+  tenants: [acme]
+tenant_overrides:
+  tenants: {acme: false}
+sampler:
+  value: top_p
+"""
+
+@pytest.fixture
+def flags_file(tmp_path):
+    path = tmp_path / "flags.yaml"
+    path.write_text(FLAGS)
+    return path
+
+def test_plain_and_typed_flags(flags_file):
+    flags = FeatureFlagManager(flags_file)
+    assert flags.is_enabled("enable_llm")
+    assert not flags.is_enabled("debug_mode")
+    assert not flags.is_enabled("missing")
+    assert flags.get("max_prompt_chars", 1000) == 4000
+    assert flags.get("sampler", "greedy") == "top_p"
+    assert flags.get("sampler", 0) == 0  # wrong type falls back to the default
+    assert flags.get("missing", "x") == "x"
+
+def test_percentage_rollout_is_stable(flags_file):
+    flags = FeatureFlagManager(flags_file)
+    assert not flags.is_enabled("half_rollout")
+    enabled = {user for user in range(2000) if flags.is_enabled("half_rollout", key=str(user))}
+    assert 850 < len(enabled) < 1150
+    other_process = FeatureFlagManager(flags_file)
+    assert enabled == {user for user in range(2000) if other_process.is_enabled("half_rollout", key=str(user))}
+
+def test_tenant_rollouts(flags_file):
+    flags = FeatureFlagManager(flags_file)
+    assert flags.is_enabled("tenant_only", tenant="acme")
+    assert not flags.is_enabled("tenant_only", tenant="other", key="u1")
+    assert not flags.is_enabled("tenant_overrides", tenant="acme")
+    assert flags.is_enabled("tenant_overrides", tenant="other")
+
+def test_reload_swaps_table_and_keeps_old_on_error(flags_file):
+    flags = FeatureFlagManager(flags_file)
+    assert not flags.reload()
+    flags_file.write_text("enable_llm: false\n")
+    assert flags.reload()
+    assert not flags.is_enabled("enable_llm")
+    flags_file.write_text("enable_llm: [unterminated\n")
+    assert not flags.reload()
+    assert not flags.is_enabled("enable_llm") and "enable_llm" in flags.flags
+
+def test_invalid_rollout_rejected(tmp_path):
+    path = tmp_path / "flags.yaml"
+    path.write_text("bad:\n  rollout: 150\n")
+    with pytest.raises(ValueError):
+        FeatureFlagManager(path)
+
+def test_watcher_picks_up_changes(flags_file):
+    flags = FeatureFlagManager(flags_file)
+    flags.start_watching(interval=0.01)
+    try:
+        flags_file.write_text("debug_mode: true\n")
+        deadline = time.monotonic() + 2
+        while not flags.is_enabled("debug_mode") and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        flags.stop_watching()
+    assert flags.is_enabled("debug_mode")
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FeatureFlagManager(tmp_path / "nope.yaml")
@@ -0,0 +1,102 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.testclient import TestClient
+from backend.app.main import get_application
+from backend.services.grammar import GrammarCache, JsonEndScanner, grammar_key, mock_instance
+from backend.services.llm_service import LLMService
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "tags": {"type": "array", "items": {"type": "string"}}},
+    "required": ["name", "tags"],
+}
+
+class StreamingLlama:
+    """Streams ``pieces`` one chunk per token and records the sampling arguments."""
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.draft_model = None
+        self.calls = []
+        self.emitted = 0
+
+    def tokenize(self, text):
+        return list(range(len(text.split())))
+
+    def __call__(self, prompt, **kwargs):
+        self.calls.append(kwargs)
+        assert kwargs.get("stream")
+        return self._chunks()
+
+    def _chunks(self):
+        for piece in self.pieces:
+            self.emitted += 1
+            yield {"choices": [{"text": piece, "finish_reason": None}]}
+        yield {"choices": [{"text": "", "finish_reason": "stop"}]}
+
+def counting_cache(max_entries=2):
+    compiled = []
+    def compile(source):
+        if "invalid" in source:
+            raise RuntimeError("parse error at line 1")
+        compiled.append(source)
+        return object()
+    return GrammarCache(max_entries, compile_schema=compile, compile_gbnf=compile), compiled
+
+def test_grammar_key_ignores_schema_key_order():
+    assert grammar_key({"a": 1, "b": 2}) == grammar_key({"b": 2, "a": 1})
+    assert grammar_key({"a": 1}) != grammar_key(grammar='root ::= "a"')
+
+def test_grammar_cache_compiles_each_schema_once():
+    cache, compiled = counting_cache(max_entries=2)
+    first, cached = cache.get(json_schema=SCHEMA)
+    again, cached_again = cache.get(json_schema=dict(reversed(list(SCHEMA.items()))))
+    assert (cached, cached_again) == (False, True) and first is again
+    cache.get(grammar='root ::= "a"')
+    cache.get(grammar='root ::= "b"')
+    assert len(cache) == 2 and len(compiled) == 3
+    cache.get(json_schema=SCHEMA)
+    assert len(compiled) == 4  # evicted as least recently used
+
+def test_grammar_cache_rejects_bad_input():
+    cache, _ = counting_cache()
+    with pytest.raises(ValueError, match="Invalid grammar"):
+        cache.get(grammar="invalid")
+    with pytest.raises(ValueError, match="not both"):
+        cache.get(json_schema=SCHEMA, grammar='root ::= "a"')
+
+def test_json_end_scanner_ignores_brackets_in_strings():
+    scanner = JsonEndScanner()
+    assert not scanner.feed('{"a": "}]\\"{", "b": [1, ')
+    assert not scanner.feed("{}]")
+    assert scanner.feed("}")
+
+def test_mock_instance_fills_required_properties():
+    assert mock_instance(SCHEMA) == {"name": "", "tags": []}
+    assert mock_instance({"enum": ["red", "green"]}) == "red"
+
+def test_schema_generation_stops_when_json_closes():
+    service = LLMService("/nonexistent/model.gguf")
+    service._llm = StreamingLlama(['{"name"', ': "a}"', ', "tags": []', "}", "\n", "  ", "\n"])
+    service.grammar_cache, compiled = counting_cache()
+    result = service.generate("Describe a tag", json_schema=SCHEMA)
+    assert result.text == '{"name": "a}", "tags": []}'
+    assert result.completion_tokens == 4 and service._llm.emitted == 4
+    call = service._llm.calls[0]
+    assert call["stop"] == [] and call["grammar"] is not None
+    service.generate("Describe a tag", json_schema=SCHEMA)
+    assert len(compiled) == 1
+
+def test_generate_endpoint_returns_parsed_json():
+    with TestClient(get_application()) as client:
+        response = client.post("/llm/generate", json={"prompt": "user", "json_schema": SCHEMA})
+        assert response.status_code == 200
+        assert response.json()["parsed"] == {"name": "", "tags": []}
+        both = client.post("/llm/generate", json={"prompt": "user", "json_schema": SCHEMA, "grammar": 'root ::= "a"'})
+        assert both.status_code == 400
+        plain = client.post("/llm/generate", json={"prompt": "user"})
+        assert plain.json()["parsed"] is None
@@ -0,0 +1,159 @@
+import asyncio
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.inference_scheduler import (
+    InferenceScheduler, QueueFullError, DeadlineExceededError, SchedulerClosedError
+)
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_scheduler_runs_off_event_loop():
+    async def scenario():
+        scheduler = InferenceScheduler(max_workers=1)
+        scheduler.start()
+        task = asyncio.create_task(scheduler.submit(time.sleep, 0.2))
+        ticks = 0
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+        return ticks
+    assert run(scenario()) > 5  # the loop kept running during the blocking call
+
+def test_scheduler_respects_priority():
+    async def scenario():
+        scheduler = InferenceScheduler(max_workers=1)
+        scheduler.start()
+        gate = threading.Event()
+        order = []
+        blocker = asyncio.create_task(scheduler.submit(gate.wait))
+        await asyncio.sleep(0.05)  # the worker is now busy
+        low = asyncio.create_task(scheduler.submit(order.append, "low", priority=9))
+        high = asyncio.create_task(scheduler.submit(order.append, "high", priority=0))
+        await asyncio.sleep(0.01)
+        gate.set()
+        await asyncio.gather(blocker, low, high)
+        await scheduler.stop()
+        return order
+    assert run(scenario()) == ["high", "low"]
+
+def test_scheduler_rejects_when_queue_full():
+    async def scenario():
+        scheduler = InferenceScheduler(max_workers=1, max_queue_size=1)
+        scheduler.start()
+        gate = threading.Event()
+        running = asyncio.create_task(scheduler.submit(gate.wait))
+        await asyncio.sleep(0.05)
+        queued = asyncio.create_task(scheduler.submit(gate.wait))
+        await asyncio.sleep(0.01)
+        with pytest.raises(QueueFullError):
+            await scheduler.submit(gate.wait)
+        gate.set()
+        await asyncio.gather(running, queued)
+        stats = scheduler.stats()
+        await scheduler.stop()
+        return stats
+    stats = run(scenario())
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+
+def test_scheduler_deadline_expires_queued_request():
+    async def scenario():
+        scheduler = InferenceScheduler(max_workers=1)
+        scheduler.start()
+        gate = threading.Event()
+        running = asyncio.create_task(scheduler.submit(gate.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(DeadlineExceededError):
+            await scheduler.submit(lambda: "late", timeout=0.05)
+        gate.set()
+        await running
+        stats = scheduler.stats()
+        await scheduler.stop()
+        return stats
+    assert run(scenario())["expired"] == 1
+
+def test_scheduler_stop_fails_running_and_queued_requests():
+    async def scenario():
+        scheduler = InferenceScheduler(max_workers=1)
+        scheduler.start()
+        gate = threading.Event()
+        running = asyncio.create_task(scheduler.submit(gate.wait))
+        await asyncio.sleep(0.05)
+        queued = asyncio.create_task(scheduler.submit(lambda: "never"))
+        await asyncio.sleep(0.01)
+        await scheduler.stop()
+        results = await asyncio.wait_for(asyncio.gather(running, queued, return_exceptions=True), 1)
+        gate.set()
+        return results
+    assert all(isinstance(result, SchedulerClosedError) for result in run(scenario()))
+
+def test_scheduler_not_running():
+    scheduler = InferenceScheduler()
+    with pytest.raises(SchedulerClosedError):
+        run(scheduler.submit(lambda: None))
+
+def test_stream_runs_ahead_of_a_slow_reader():
+    async def scenario():
+        scheduler = InferenceScheduler(max_workers=1)
+        scheduler.start()
+        stream = scheduler.submit_stream(iter(["a", "b", "c"]))
+        # The worker is free again before anything was read.
+        assert await scheduler.submit(lambda: "next") == "next"
+        pieces = [piece async for piece in stream]
+        await scheduler.stop()
+        return pieces
+    assert run(scenario()) == ["a", "b", "c"]
+
+def test_stream_close_stops_the_worker():
+    async def scenario():
+        scheduler = InferenceScheduler(max_workers=1)
+        scheduler.start()
+        closed = threading.Event()
+
+        def endless():
+            try:
+                while True:
+                    time.sleep(0.001)
+                    yield "x"
+            finally:
+                closed.set()
+
+        stream = scheduler.submit_stream(endless())
+        assert await stream.__anext__() == "x"
+        stream.close()
+        await asyncio.get_running_loop().run_in_executor(None, closed.wait, 1)
+        await scheduler.stop()
+        return closed.is_set()
+    assert run(scenario())
+
+def test_stream_stops_at_its_deadline_and_respects_queue_limit():
+    async def scenario():
+        scheduler = InferenceScheduler(max_workers=1, max_queue_size=1)
+        scheduler.start()
+
+        def slow():
+            while True:
+                time.sleep(0.01)
+                yield "x"
+
+        stream = scheduler.submit_stream(slow(), timeout=0.05)
+        await asyncio.sleep(0.01)
+        queued = scheduler.submit_stream(iter(["y"]))
+        with pytest.raises(QueueFullError):
+            scheduler.submit_stream(iter(["z"]))
+        with pytest.raises(DeadlineExceededError):
+            async for _ in stream:
+                pass
+        pieces = [piece async for piece in queued]
+        await scheduler.stop()
+        return pieces
+    assert run(scenario()) == ["y"]
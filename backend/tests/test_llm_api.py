@@ -0,0 +1,177 @@
+import json
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.testclient import TestClient
+from backend.app.main import get_application
+
+@pytest.fixture
+def client():
+    with TestClient(get_application()) as client:
+        yield client
+
+def test_health_reports_residency(client):
+    data = client.get("/llm/health").json()
+    assert data["model_loaded"] is False  # mock mode, no GGUF file in CI
+    assert data["models"][0]["name"] == "default"
+    assert data["models"][0]["resident"] is True
+
+def test_generate_reuses_registry_model(client):
+    registry = client.app.state.model_registry
+    llm = registry.get()
+    response = client.post("/llm/generate", json={"prompt": "test prompt"})
+    assert response.status_code == 200
+    assert "[MOCK]" in response.json()["response"]
+    assert registry.get() is llm
+
+def test_generate_unknown_model(client):
+    response = client.post("/llm/generate", json={"prompt": "test prompt", "model": "missing"})
+    assert response.status_code == 404
+
+def _parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_generate_stream_mock(client):
+    with client.stream("POST", "/llm/generate/stream", json={"prompt": "test prompt"}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(response.read().decode())
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == client.app.state.model_registry.get().generate("test prompt").text
+    event, data = events[-1]
+    assert event == "done"
+    assert data["tokens_generated"] == len(tokens)
+    assert data["ttft_ms"] >= 0
+    # Decoded on an inference worker, like /generate.
+    assert client.get("/llm/queue").json()["completed"] == 1
+
+def test_generate_stream_rejected_when_queue_full(client, monkeypatch):
+    monkeypatch.setattr(client.app.state.inference_scheduler._queue, "full", lambda: True)
+    response = client.post("/llm/generate/stream", json={"prompt": "test prompt"})
+    assert response.status_code == 429
+
+def test_generate_stream_plans_off_the_event_loop(client, monkeypatch):
+    import asyncio
+    from backend.services.llm_service import LLMService
+    on_loop = []
+    fit_context = LLMService.fit_context
+
+    def recording_fit_context(self, *args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return fit_context(self, *args, **kwargs)
+
+    monkeypatch.setattr(LLMService, "fit_context", recording_fit_context)
+    with client.stream("POST", "/llm/generate/stream", json={"prompt": "test prompt"}) as response:
+        assert response.status_code == 200
+        list(response.iter_lines())
+    assert on_loop == [False]
+
+def test_generate_stream_blank_prompt(client):
+    response = client.post("/llm/generate/stream", json={"prompt": "   "})
+    assert response.status_code == 400
+
+def test_queue_stats(client):
+    client.post("/llm/generate", json={"prompt": "test prompt"})
+    stats = client.get("/llm/queue").json()
+    assert stats["running"] is True
+    assert stats["completed"] >= 1
+    assert stats["queue_depth"] == 0
+
+def test_generate_deterministic_response_is_cached(client):
+    body = {"prompt": "cache me", "temperature": 0}
+    first = client.post("/llm/generate", json=body).json()
+    second = client.post("/llm/generate", json=body).json()
+    assert first["cache"] == "miss"
+    assert second["cache"] == "hit"
+    assert second["response"] == first["response"]
+    assert second["tokens_saved"] == first["usage"]["total_tokens"]
+
+def test_redis_cache_calls_run_off_the_event_loop(client):
+    import asyncio
+    from backend.services.llm_cache import ResponseCache
+
+    class LoopCheckingRedis:
+        """Records whether each call was made from a thread running the event loop."""
+        def __init__(self):
+            self.data = {}
+            self.on_loop = []
+
+        def _record(self):
+            try:
+                asyncio.get_running_loop()
+                self.on_loop.append(True)
+            except RuntimeError:
+                self.on_loop.append(False)
+
+        def get(self, key):
+            self._record()
+            return self.data.get(key)
+
+        def set(self, key, value, ex=None):
+            self._record()
+            self.data[key] = value
+
+    redis = LoopCheckingRedis()
+    client.app.state.response_cache = ResponseCache(redis=redis)
+    client.post("/llm/generate", json={"prompt": "cache me remotely", "temperature": 0})
+    client.post("/llm/generate/batch?temperature=0", content=b'{"id": "a", "prompt": "batch me"}\n')
+    assert len(redis.on_loop) == 4 and not any(redis.on_loop)
+
+def test_generate_sampled_response_is_not_cached(client):
+    body = {"prompt": "do not cache me", "temperature": 0.7}
+    client.post("/llm/generate", json=body)
+    assert client.post("/llm/generate", json=body).json()["cache"] == "miss"
+
+def test_generate_reports_usage_and_timings(client):
+    data = client.post("/llm/generate", json={"prompt": "count my tokens please"}).json()
+    usage = data["usage"]
+    assert usage["prompt_tokens"] == 4
+    assert usage["completion_tokens"] == data["tokens_generated"] > 0
+    assert usage["total_tokens"] == usage["prompt_tokens"] + usage["completion_tokens"]
+    assert data["timings"]["total_ms"] >= data["timings"]["queue_wait_ms"] >= 0
+
+def test_metrics_endpoint(client):
+    client.post("/llm/generate", json={"prompt": "test prompt"})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'llm_request_duration_seconds_count{model="default"}' in response.text
+    assert "# TYPE llm_time_to_first_token_seconds histogram" in response.text
+    assert "llm_queue_depth 0" in response.text
+
+def test_liveness_and_readiness(client):
+    assert client.get("/live").json() == {"status": "alive"}
+    response = client.get("/ready")
+    assert response.status_code == 200 and response.json() == {"status": "ready"}
+
+def test_background_load_reports_not_ready_until_loaded(monkeypatch):
+    from backend.services.model_registry import ModelRegistry
+    from backend.settings import settings
+    release = threading.Event()
+    preload = ModelRegistry.preload
+    monkeypatch.setattr(settings, "LLM_BACKGROUND_LOAD", True)
+    monkeypatch.setattr(ModelRegistry, "preload", lambda self: release.wait(5) and preload(self))
+    with TestClient(get_application()) as client:
+        assert client.get("/live").status_code == 200
+        assert client.get("/ready").status_code == 503
+        release.set()
+        for _ in range(100):
+            if client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.01)
+        assert client.get("/ready").status_code == 200
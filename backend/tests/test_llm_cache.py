@@ -0,0 +1,78 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.llm_cache import PrefixCache, ResponseCache, make_cache_key
+
+class FakeRedisService:
+    """Same get/set shape as RedisService, backed by a dict."""
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode("utf-8") if isinstance(value, str) else value
+
+@pytest.fixture
+def redis_service():
+    return FakeRedisService()
+
+def test_cache_key_depends_on_params():
+    key = make_cache_key("default", "prompt", temperature=0, max_tokens=16)
+    assert key == make_cache_key("default", "prompt", max_tokens=16, temperature=0)
+    assert key != make_cache_key("default", "prompt", temperature=0, max_tokens=32)
+    assert key != make_cache_key("other", "prompt", temperature=0, max_tokens=16)
+
+def test_response_cache_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", {"text": "A"})
+    cache.set("b", {"text": "B"})
+    cache.get("a")
+    cache.set("c", {"text": "C"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"text": "A"}
+
+def test_response_cache_ttl():
+    cache = ResponseCache(ttl_seconds=0.01)
+    cache.set("a", {"text": "A"})
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+def test_response_cache_redis_tier(redis_service):
+    writer = ResponseCache(redis=redis_service)
+    writer.set("a", {"text": "A", "tokens": 3})
+    reader = ResponseCache(redis=redis_service)  # e.g. another worker process
+    assert reader.get("a") == {"text": "A", "tokens": 3}
+    assert reader.stats()["hits"] == 1
+
+def test_prefix_cache_longest_prefix():
+    cache = PrefixCache(max_bytes=100, min_prefix_tokens=2)
+    cache.store([1, 2, 3], "short", size=10)
+    cache.store([1, 2, 3, 4, 5, 6], "long", size=10)
+    assert cache.lookup([1, 2, 3, 4, 5, 9, 9]) == ("long", 5)
+    assert cache.lookup([7, 8, 9]) == (None, 0)
+    assert cache.stats()["tokens_saved"] == 5
+
+def test_prefix_cache_byte_budget():
+    cache = PrefixCache(max_bytes=25, min_prefix_tokens=1)
+    cache.store([1, 2], "a", size=10)
+    cache.store([3, 4], "b", size=10)
+    cache.store([5, 6], "c", size=10)
+    assert cache.stats()["entries"] == 2
+    assert not cache.covers([1, 2])
+    assert cache.covers([5, 6])
+
+def test_prefix_cache_saves_recurring_prefixes_only():
+    cache = PrefixCache(max_bytes=100, min_prefix_tokens=3)
+    assert not cache.should_save([1, 2])  # too short
+    assert not cache.should_save([1, 2, 3, 4])  # first time this prefix is seen
+    assert cache.should_save([1, 2, 3, 5])
+    cache.store([1, 2, 3, 5, 6], "state", size=10)
+    assert not cache.should_save([1, 2, 3, 5])  # already covered
+    assert cache.should_save([1, 2, 3, 7])
@@ -37,9 +37,9 @@ def test_llm_service_generate_with_mock(nonexistent_model):
     """Test generation works in mock mode when no model is available."""
     service = LLMService(nonexistent_model)
     result = service.generate("test prompt")
-    assert "[MOCK]" in result
-    assert "test prompt" in result
-    assert isinstance(result, str)
+    assert "[MOCK]" in result.text
+    assert "test prompt" in result.text
+    assert isinstance(result.text, str)
 
 def test_llm_service_generate_empty_prompt(nonexistent_model):
     """Test that empty prompt raises ValueError."""
@@ -51,11 +51,25 @@ def test_llm_service_generate_with_parameters(nonexistent_model):
     """Test generation with custom parameters."""
     service = LLMService(nonexistent_model)
     result = service.generate("test prompt", max_tokens=100, temperature=0.5)
-    assert isinstance(result, str)
-    assert len(result) > 0
+    assert isinstance(result.text, str)
+    assert len(result.text) > 0
 
 def test_llm_service_model_loaded_status(nonexistent_model):
     """Test model loaded status check."""
     service = LLMService(nonexistent_model)
     assert isinstance(service.is_model_loaded(), bool)
-    assert not service.is_model_loaded()  # Should be False for nonexistent model
\ No newline at end of file
+    assert not service.is_model_loaded()  # Should be False for nonexistent model
+
+
+def test_llm_service_generate_stream_with_mock(nonexistent_model):
+    """Test streaming yields the mock response piece by piece."""
+    service = LLMService(nonexistent_model)
+    tokens = list(service.generate_stream("test prompt"))
+    assert len(tokens) > 1
+    assert "".join(tokens) == service.generate("test prompt").text
+
+def test_llm_service_generate_stream_empty_prompt(nonexistent_model):
+    """Test that streaming rejects an empty prompt before yielding anything."""
+    service = LLMService(nonexistent_model)
+    with pytest.raises(ValueError, match="Prompt cannot be empty"):
+        service.generate_stream("  ")
@@ -0,0 +1,45 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.benchmarks.load_test import compare, percentile, run_load, summarize
+
+def test_percentile_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile(samples, 100) == 100.0
+    assert percentile([], 95) == 0.0
+
+def test_summarize_reports_milliseconds_and_rps():
+    result = summarize([0.01, 0.02, 0.03, 0.04], errors=1, elapsed=2.0)
+    assert result["requests"] == 5 and result["errors"] == 1
+    assert result["rps"] == 2.0
+    assert result["p50_ms"] == 20.0 and result["max_ms"] == 40.0
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {"rps": 100.0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "errors": 0}
+    assert compare(dict(baseline, rps=90.0, p99_ms=33.0), baseline, max_regression=20) == []
+    regressions = compare(dict(baseline, rps=70.0, p95_ms=30.0), baseline, max_regression=20)
+    assert [line.split(":")[0] for line in regressions] == ["rps", "p95_ms"]
+    assert compare(dict(baseline, errors=3), baseline, max_regression=20) == ["errors: 0 -> 3"]
+
+def test_run_load_sends_requested_count():
+    prompts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        prompts.append(request.content)
+        return httpx.Response(200 if len(prompts) % 10 else 500, json={})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+            return await run_load(client, concurrency=4, requests=50, duration=None, payload={"prompt": "hi"})
+
+    result = asyncio.run(scenario())
+    assert result["requests"] == 50 and result["errors"] == 5
+    assert len(set(prompts)) == 50
@@ -0,0 +1,92 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.llm_service import LLMService
+from backend.services.model_registry import ModelRegistry
+
+@pytest.fixture
+def model_files(tmp_path):
+    """Create fake model files of known sizes (contents are not valid GGUF)."""
+    paths = {}
+    for name, size in (("a", 100), ("b", 200), ("c", 300)):
+        path = tmp_path / f"{name}.gguf"
+        path.write_bytes(b"\0" * size)
+        paths[name] = str(path)
+    return paths
+
+@pytest.fixture
+def loads():
+    return []
+
+@pytest.fixture
+def loader(loads):
+    def _load(path):
+        loads.append(path)
+        return LLMService("/nonexistent/path/model.gguf")
+    return _load
+
+def test_registry_loads_each_model_once(model_files, loads, loader):
+    registry = ModelRegistry(model_files, loader=loader)
+    first = registry.get("a")
+    second = registry.get("a")
+    assert first is second
+    assert loads == [model_files["a"]]
+
+def test_registry_default_model(model_files, loader):
+    registry = ModelRegistry(model_files, default_model="b", loader=loader)
+    assert registry.get() is registry.get("b")
+
+def test_registry_unknown_model(model_files, loader):
+    registry = ModelRegistry(model_files, loader=loader)
+    with pytest.raises(ValueError, match="Unknown model"):
+        registry.get("missing")
+
+def test_registry_evicts_least_recently_used(model_files, loader):
+    registry = ModelRegistry(model_files, memory_budget_bytes=500, loader=loader)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")  # "b" is now least recently used
+    registry.get("c")
+    assert registry.is_resident("a")
+    assert not registry.is_resident("b")
+    assert registry.is_resident("c")
+    assert registry.resident_bytes() <= 500
+
+def test_registry_closes_models_it_drops(model_files, monkeypatch):
+    closed = []
+    monkeypatch.setattr(LLMService, "close", lambda self: closed.append(self))
+    registry = ModelRegistry(model_files, memory_budget_bytes=500, loader=lambda path: LLMService(path))
+    a = registry.get("a")
+    b = registry.get("b")
+    c = registry.get("c")  # evicts "a"
+    assert closed == [a]
+    assert registry.evict("b")
+    assert not registry.evict("b")
+    assert closed == [a, b]
+    registry.clear()
+    assert closed == [a, b, c]
+
+def test_registry_status_does_not_load(model_files, loads, loader):
+    registry = ModelRegistry(model_files, loader=loader)
+    status = registry.status()
+    assert loads == []
+    assert [entry["resident"] for entry in status] == [False, False, False]
+    assert registry.peek("a") is None
+    assert loads == []
+
+def test_registry_preload(model_files, loads, loader):
+    registry = ModelRegistry(model_files, loader=loader)
+    registry.preload()
+    assert sorted(loads) == sorted(model_files.values())
+
+def test_registry_preload_fits_the_budget_and_keeps_the_default(model_files, loads, loader):
+    registry = ModelRegistry(model_files, default_model="c", memory_budget_bytes=450, loader=loader)
+    registry.preload()
+    # "c" (300) plus "a" (100) fit, "b" (200) would not; the default is loaded last.
+    assert loads == [model_files["a"], model_files["c"]]
+    assert registry.is_resident("c")
+    assert not registry.is_resident("b")
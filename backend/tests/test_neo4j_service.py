@@ -0,0 +1,55 @@
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.neo4j_service import Neo4jService
+
+class FakeTx:
+    def __init__(self, calls, records):
+        self.calls = calls
+        self.records = records
+
+    def run(self, cypher, params):
+        self.calls.append((cypher, params))
+        result = MagicMock()
+        result.__iter__.return_value = iter([MagicMock(data=MagicMock(return_value=r)) for r in self.records])
+        return result
+
+@pytest.fixture
+def driver():
+    driver = MagicMock()
+    driver.calls = []
+    driver.records = [{"n": 1}, {"n": 2}]
+    session = driver.session.return_value.__enter__.return_value
+    tx_fn = lambda fn, *args: fn(FakeTx(driver.calls, driver.records), *args)
+    session.execute_write.side_effect = tx_fn
+    session.execute_read.side_effect = tx_fn
+    session.begin_transaction.return_value.__enter__.return_value = FakeTx(driver.calls, driver.records)
+    return driver
+
+def test_execute_consumes_records_inside_session(driver):
+    service = Neo4jService("bolt://unused", "u", "p", fetch_size=250, database="graph", driver=driver)
+    assert service.execute("MATCH (n) RETURN n", write=False) == [{"n": 1}, {"n": 2}]
+    driver.session.assert_called_once_with(database="graph", fetch_size=250)
+    session = driver.session.return_value.__enter__.return_value
+    session.execute_read.assert_called_once()
+    session.execute_write.assert_not_called()
+
+def test_iterate_is_lazy(driver):
+    service = Neo4jService("bolt://unused", "u", "p", driver=driver)
+    records = service.iterate("MATCH (n) RETURN n")
+    driver.session.assert_not_called()
+    assert list(records) == [{"n": 1}, {"n": 2}]
+    driver.session.return_value.__exit__.assert_called_once()
+
+def test_execute_batch_unwinds_in_chunks(driver):
+    service = Neo4jService("bolt://unused", "u", "p", driver=driver)
+    rows = ({"id": i} for i in range(2500))
+    assert service.execute_batch("MERGE (p:Person {id: row.id})", rows, batch_size=1000) == 2500
+    assert [len(params["rows"]) for _, params in driver.calls] == [1000, 1000, 500]
+    assert all(cypher == "UNWIND $rows AS row MERGE (p:Person {id: row.id})" for cypher, _ in driver.calls)
+    driver.session.assert_called_once()
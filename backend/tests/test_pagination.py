@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.async_services import ThreadOffloadService
+from backend.services.mongo_service import MongoService
+from backend.services.pagination import iter_keyset_pages, keyset_query
+from backend.services.sqlite_service import SQLiteService
+
+@pytest.fixture
+def db(tmp_path):
+    service = SQLiteService(str(tmp_path / "pages.db"))
+    service.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    service.bulk_insert("items", ["name"], ((f"item{i}",) for i in range(25)))
+    yield service
+    service.close()
+
+def test_keyset_query_formats():
+    query, params = keyset_query("items", ["id", "name"], after=10, limit=5, where="name LIKE ?", params=("a%",))
+    assert query == 'SELECT "id", "name" FROM "items" WHERE (name LIKE ?) AND "id" > ? ORDER BY "id" LIMIT 5'
+    assert params == ("a%", 10)
+    query, _ = keyset_query("items", ["id"], after=1, paramstyle="format")
+    assert '"id" > %s' in query
+
+def test_iter_keyset_pages(db):
+    pages = list(iter_keyset_pages(db, "items", ["id", "name"], page_size=10))
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [row[0] for page in pages for row in page] == list(range(1, 26))
+
+def test_iter_keyset_pages_requires_key(db):
+    with pytest.raises(ValueError):
+        list(iter_keyset_pages(db, "items", ["name"]))
+
+def test_sqlite_iterate_releases_connection_when_abandoned(db):
+    rows = db.iterate("SELECT id FROM items", batch_size=4)
+    assert next(rows) == (1,)
+    rows.close()
+    assert db._pool.qsize() == len(db._connections)
+
+def test_offload_iterate(db):
+    async def collect():
+        service = ThreadOffloadService(db, max_workers=2)
+        return [row async for row in service.iterate("SELECT id FROM items", batch_size=7)]
+    assert asyncio.run(collect()) == [(i,) for i in range(1, 26)]
+
+def test_mongo_iterate_closes_cursor():
+    client = MagicMock()
+    cursor = client["db"]["docs"].find.return_value.batch_size.return_value
+    cursor.__iter__.return_value = iter([{"_id": 1}, {"_id": 2}])
+    service = MongoService("mongodb://unused", client=client)
+    assert list(service.iterate("db", "docs", {}, batch_size=50)) == [{"_id": 1}, {"_id": 2}]
+    client["db"]["docs"].find.return_value.batch_size.assert_called_once_with(50)
+    cursor.close.assert_called_once()
+
+def test_mongo_find_page_uses_key_range():
+    client = MagicMock()
+    service = MongoService("mongodb://unused", client=client)
+    service.find_page("db", "docs", {"kind": "a"}, after=10, limit=3)
+    client["db"]["docs"].find.assert_called_once_with({"$and": [{"kind": "a"}, {"_id": {"$gt": 10}}]})
+    client["db"]["docs"].find.return_value.sort.assert_called_once_with("_id", 1)
+    client["db"]["docs"].find.return_value.sort.return_value.limit.assert_called_once_with(3)
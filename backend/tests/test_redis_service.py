@@ -0,0 +1,163 @@
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.redis_service import _MISSING, NearCache, RedisService
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value))
+
+    def execute(self):
+        self.client.round_trips += 1
+        for _, key, value in self.commands:
+            self.client.data[key] = value
+        return [True] * len(self.commands)
+
+    def reset(self):
+        self.commands = []
+
+class FakeRedisClient:
+    """Dict-backed stand-in for redis.Redis that counts round-trips."""
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+        self.subscriptions = {}
+        self.notify_flags = "KA"
+        self.config_sets = []
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.round_trips += 1
+        self.data[key] = value
+
+    def mset(self, mapping):
+        self.round_trips += 1
+        self.data.update(mapping)
+
+    def delete(self, *keys):
+        self.round_trips += 1
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def config_get(self, name):
+        return {name: self.notify_flags}
+
+    def config_set(self, name, value):
+        self.notify_flags = value
+        self.config_sets.append((name, value))
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        client = self
+
+        class PubSub:
+            def psubscribe(self, **handlers):
+                client.subscriptions.update(handlers)
+
+            def run_in_thread(self, sleep_time, daemon):
+                return self
+
+            def stop(self):
+                pass
+        return PubSub()
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def client():
+    return FakeRedisClient()
+
+def test_mget_mset_single_round_trip(client):
+    service = RedisService("unused", 0, client=client)
+    service.mset({"a": b"1", "b": b"2"})
+    assert service.mget(["a", "b", "c"]) == [b"1", b"2", None]
+    assert client.round_trips == 2
+
+def test_mset_with_expiry_uses_pipeline(client):
+    service = RedisService("unused", 0, client=client)
+    service.mset({"a": b"1", "b": b"2"}, ex=10)
+    assert client.data == {"a": b"1", "b": b"2"} and client.round_trips == 1
+
+def test_pipeline_executes_on_exit_only_on_success(client):
+    service = RedisService("unused", 0, client=client)
+    with service.pipeline() as pipe:
+        pipe.set("a", b"1")
+        pipe.set("b", b"2")
+    assert pipe.results == [True, True] and client.round_trips == 1
+    with pytest.raises(RuntimeError):
+        with service.pipeline() as pipe:
+            pipe.set("c", b"3")
+            raise RuntimeError("abort")
+    assert "c" not in client.data
+
+def test_pipeline_failure_still_resets_and_clears_near_cache(client, monkeypatch):
+    service = RedisService("unused", 0, near_cache_size=10, client=client)
+    service.set("a", b"1")
+    assert service.get("a") == b"1"
+    def fail(self):
+        self.client.data["a"] = b"2"  # applied before the connection dropped
+        raise ConnectionError("connection lost")
+    monkeypatch.setattr(FakePipeline, "execute", fail)
+    with pytest.raises(ConnectionError):
+        with service.pipeline(transaction=False) as pipe:
+            pipe.set("a", b"2")
+    assert pipe.commands == []
+    assert service.get("a") == b"2"
+
+def test_near_cache_serves_hot_keys_locally(client):
+    service = RedisService("unused", 0, near_cache_size=10, client=client)
+    client.data["a"] = b"1"
+    assert [service.get("a") for _ in range(5)] == [b"1"] * 5
+    assert client.round_trips == 1
+    assert service.mget(["a", "b"]) == [b"1", None]
+    assert client.round_trips == 2
+
+def test_near_cache_invalidated_by_writes_and_notifications(client):
+    service = RedisService("unused", 0, near_cache_size=10, client=client)
+    service.set("a", b"1")
+    assert service.get("a") == b"1"
+    service.set("a", b"2")
+    assert service.get("a") == b"2"
+    client.data["a"] = b"3"  # written by another process
+    client.subscriptions["__keyspace@0__:*"]({"channel": b"__keyspace@0__:a", "data": b"set"})
+    assert service.get("a") == b"3"
+
+def test_near_cache_disabled_without_keyspace_notifications(client):
+    client.notify_flags = ""
+    service = RedisService("unused", 0, near_cache_size=10, client=client)
+    assert service.near_cache is None
+    assert client.config_sets == [] and client.subscriptions == {}
+
+def test_keyspace_notifications_configured_only_when_allowed(client):
+    client.notify_flags = "Ex"
+    service = RedisService("unused", 0, near_cache_size=10, client=client, configure_notifications=True)
+    assert service.near_cache is not None
+    assert client.config_sets == [("notify-keyspace-events", "AEKx")]
+    assert "__keyspace@0__:*" in client.subscriptions
+
+def test_near_cache_ttl_and_lru():
+    cache = NearCache(max_entries=2, ttl_seconds=0.01)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)
+    assert cache.stats()["entries"] == 2
+    time.sleep(0.02)
+    assert cache.get("c") is _MISSING
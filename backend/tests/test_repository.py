@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import InvalidRequestError
+from backend.db.model import UserORM
+from backend.db.repository import AsyncRepository, Repository, make_engine, to_async_url
+
+def users(count, start=0):
+    return [{"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x" * 60}
+            for i in range(start, start + count)]
+
+def posts(count, authors):
+    return [{"title": f"post {i}", "body": "text", "author_id": 1 + i % authors} for i in range(count)]
+
+@pytest.fixture
+def repo():
+    repository = Repository(make_engine("sqlite://"))
+    repository.create_all()
+    yield repository
+    repository.close()
+
+def count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+def test_bulk_insert_batches_rows(repo):
+    statements = count_queries(repo.engine)
+    assert repo.bulk_insert_users(users(250), batch_size=100) == 250
+    assert len(statements) == 3
+    with repo.session() as session:
+        user = session.scalar(select(UserORM).where(UserORM.username == "user42"))
+        assert user.is_active and user.created_at is not None
+
+def test_upsert_updates_existing_and_inserts_new(repo):
+    repo.bulk_insert_users(users(2))
+    changed = [{"username": "user1", "email": "changed@example.com", "hashed_password": "y" * 60}] + users(1, start=5)
+    assert repo.upsert_users(changed) == 2
+    by_name = {u.username: u for u in repo.users_with_posts()}
+    assert set(by_name) == {"user0", "user1", "user5"}
+    assert by_name["user1"].email == "changed@example.com"
+
+def test_users_with_posts_uses_two_queries(repo):
+    repo.bulk_insert_users(users(20))
+    repo.bulk_insert_posts(posts(200, authors=20))
+    statements = count_queries(repo.engine)
+    page = repo.users_with_posts(limit=20)
+    assert len(statements) == 2
+    assert [len(user.posts) for user in page] == [10] * 20
+    assert [p.id for p in page[0].posts] == sorted(p.id for p in page[0].posts)
+
+def test_lazy_loading_is_refused(repo):
+    repo.bulk_insert_users(users(1))
+    with repo.session() as session:
+        user = session.scalar(select(UserORM))
+        with pytest.raises(InvalidRequestError):
+            user.posts
+
+def test_posts_by_author_keyset_pages(repo):
+    repo.bulk_insert_users(users(3))
+    repo.bulk_insert_posts(posts(30, authors=3))
+    first = repo.posts_by_author(2, limit=4)
+    assert all(p.author_id == 2 for p in first.items)
+    second = repo.posts_by_author(2, after=first.next_after, limit=4)
+    assert second.items[0].id > first.items[-1].id
+    pages = list(repo.iter_posts_by_author(2, page_size=4))
+    assert [len(page) for page in pages] == [4, 4, 2]
+    assert repo.posts_by_author(2, after=10_000).next_after is None
+
+def test_to_async_url():
+    assert to_async_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert to_async_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    with pytest.raises(ValueError):
+        to_async_url("oracle://h/db")
+
+def test_async_repository():
+    async def scenario():
+        repository = AsyncRepository.from_url("sqlite://")
+        try:
+            await repository.create_all()
+            await repository.bulk_insert_users(users(3))
+            await repository.bulk_insert_posts(posts(9, authors=3))
+            page = await repository.users_with_posts(limit=2)
+            posts_page = await repository.posts_by_author(3, limit=2)
+            return page, posts_page
+        finally:
+            await repository.close()
+
+    page, posts_page = asyncio.run(scenario())
+    assert [len(user.posts) for user in page] == [3, 3]
+    assert [p.author_id for p in posts_page.items] == [3, 3] and posts_page.next_after is not None
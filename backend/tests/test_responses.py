@@ -0,0 +1,65 @@
+import json
+import sys
+import zlib
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.testclient import TestClient
+from backend.app.main import get_application
+from backend.app.responses import ORJSONResponse, accepted_encodings, etag_matches, make_etag
+from backend.settings import settings
+
+def test_accepted_encodings_honours_q_zero():
+    assert accepted_encodings("gzip, br;q=0, deflate;q=0.5") == ["gzip", "deflate"]
+    assert accepted_encodings("br;q=0.0") == []
+
+def test_etag_comparison_is_weak():
+    etag = make_etag(b"{}")
+    assert etag_matches(etag, etag) and etag_matches(etag[2:], etag)
+    assert etag_matches(b'"other", ' + etag, etag) and etag_matches(b"*", etag)
+    assert not etag_matches(b'"other"', etag)
+
+def test_orjson_response_renders_non_str_keys():
+    assert json.loads(ORJSONResponse({1: "a", "b": [1.5]}).body) == {"1": "a", "b": [1.5]}
+
+def test_compression_negotiates_and_respects_threshold(monkeypatch):
+    monkeypatch.setattr(settings, "API_COMPRESSION", "brotli")
+    monkeypatch.setattr(settings, "API_COMPRESSION_MIN_BYTES", 200)
+    monkeypatch.setattr(settings, "API_ORJSON", True)
+    with TestClient(get_application()) as client:
+        small = client.get("/live", headers={"Accept-Encoding": "br, gzip"})
+        assert "content-encoding" not in small.headers
+        raw = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+        spec = client.get("/openapi.json", headers={"Accept-Encoding": "br, gzip"})
+        assert spec.headers["content-encoding"] == "br" and spec.headers["vary"] == "Accept-Encoding"
+        assert spec.json() == raw.json()
+        assert int(spec.headers["content-length"]) < len(raw.content) / 3
+        gzipped = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+        assert gzipped.headers["content-encoding"] == "gzip" and gzipped.json() == raw.json()
+
+def test_streamed_responses_are_compressed_per_chunk(monkeypatch):
+    monkeypatch.setattr(settings, "API_COMPRESSION", "gzip")
+    monkeypatch.setattr(settings, "API_COMPRESSION_MIN_BYTES", 0)
+    body = "".join(json.dumps({"id": str(i), "prompt": f"prompt {i}"}) + "\n" for i in range(20))
+    with TestClient(get_application()) as client:
+        with client.stream("POST", "/llm/generate/batch", content=body, headers={"Accept-Encoding": "gzip"}) as response:
+            assert response.headers["content-encoding"] == "gzip"
+            assert "content-length" not in response.headers
+            decoder = zlib.decompressobj(31)
+            # Each chunk decodes on its own, without waiting for the end of the stream.
+            lines = [decoder.decompress(chunk) for chunk in response.iter_raw()]
+    records = [json.loads(line) for line in b"".join(lines).splitlines()]
+    assert len(records) == 21 and "summary" in records[-1]
+
+def test_health_etag_returns_304(monkeypatch):
+    monkeypatch.setattr(settings, "API_ETAGS", True)
+    with TestClient(get_application()) as client:
+        first = client.get("/llm/health")
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"') and first.headers["cache-control"] == "no-cache"
+        again = client.get("/llm/health", headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b""
+        assert client.get("/llm/health", headers={"If-None-Match": '"stale"'}).status_code == 200
+        assert "etag" not in client.get("/live").headers
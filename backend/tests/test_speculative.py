@@ -0,0 +1,150 @@
+import pytest
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.testclient import TestClient
+from backend.app.main import get_application
+from backend.services import llm_service
+from backend.services.llm_service import LLMService
+from backend.services.speculative import CountingDraft, ModelDraft, PromptLookupDraft, make_draft
+
+class FakeLlama:
+    """Emits ``completion`` tokens, asking the draft once per verification pass of ``per_pass`` tokens."""
+    def __init__(self, completion=12, per_pass=4):
+        self.completion = completion
+        self.per_pass = per_pass
+        self.draft_model = None
+        self.drafts_seen = []
+
+    def tokenize(self, text):
+        return list(range(len(text.split())))
+
+    def __call__(self, prompt, **kwargs):
+        self.drafts_seen.append(self.draft_model)
+        if self.draft_model is not None:
+            for _ in range(-(-self.completion // self.per_pass)):
+                self.draft_model([1, 2, 3])
+        if kwargs.get("stream"):
+            return iter([{"choices": [{"text": "ok"}]}])
+        return {"choices": [{"text": "ok"}], "usage": {"prompt_tokens": 3, "completion_tokens": self.completion}}
+
+def fake_service(speculative="prompt_lookup"):
+    service = LLMService("/nonexistent/model.gguf")
+    service._llm = FakeLlama()
+    service.speculative = speculative
+    service._drafts = {"prompt_lookup": CountingDraft(lambda ids: [7, 8, 9, 10], "prompt_lookup")}
+    return service
+
+def test_prompt_lookup_continues_latest_match():
+    draft = PromptLookupDraft(max_ngram_size=3, num_pred_tokens=3)
+    # The final 3-gram (5 6 7) occurs twice earlier; the nearest one was followed by 1 2 4.
+    ids = [5, 6, 7, 8, 9, 0, 5, 6, 7, 1, 2, 4, 5, 6, 7]
+    assert draft.propose(ids) == [1, 2, 4]
+
+def test_prompt_lookup_falls_back_to_shorter_ngrams():
+    draft = PromptLookupDraft(max_ngram_size=3, num_pred_tokens=2)
+    assert draft.propose([1, 9, 9, 2, 3, 4, 9]) == [2, 3]
+    assert draft.propose([1, 2, 3]) == []
+
+def test_model_draft_takes_greedy_tokens():
+    class DraftLlama:
+        def generate(self, tokens, **kwargs):
+            assert kwargs["temp"] == 0.0
+            yield from range(100, 200)
+    assert ModelDraft(DraftLlama(), num_pred_tokens=3).propose([1, 2]) == [100, 101, 102]
+
+def test_counting_draft_acceptance():
+    draft = CountingDraft(lambda ids: [1, 2, 3, 4], "prompt_lookup")
+    for _ in range(3):
+        draft([0])
+    assert (draft.passes, draft.proposed) == (3, 12)
+    assert draft.accepted(completion_tokens=11) == 8
+    assert draft.accepted(completion_tokens=2) == 0
+
+def test_draft_model_mode_needs_a_model():
+    with pytest.raises(ValueError, match="LLM_DRAFT_MODEL_PATH"):
+        make_draft("draft_model", 8)
+
+def test_generate_reports_acceptance_and_speedup():
+    service = fake_service()
+    plain = service.generate("a b c", speculative="off")
+    assert plain.speculative is None and service._llm.drafts_seen[-1] is None
+    result = service.generate("a b c")
+    assert service._llm.drafts_seen[-1] is service._drafts["prompt_lookup"]
+    assert result.speculative == "prompt_lookup"
+    # 12 tokens in 3 passes: 9 of the 12 proposed draft tokens were kept.
+    assert (result.draft_tokens, result.accepted_tokens) == (12, 9)
+    assert result.acceptance_rate == pytest.approx(0.75)
+    assert result.speedup is not None and result.speedup > 0
+
+def test_generate_rejects_unavailable_mode():
+    service = fake_service()
+    with pytest.raises(ValueError, match="not available"):
+        service.generate("a b c", speculative="draft_model")
+    service._drafts = {}
+    with pytest.raises(ValueError, match="not enabled"):
+        service.generate("a b c", speculative="prompt_lookup")
+
+def test_unknown_default_mode_rejected():
+    with pytest.raises(ValueError, match="Unknown speculative mode"):
+        LLMService("/nonexistent/model.gguf", speculative="medusa")
+
+def test_api_returns_speculation_stats():
+    with TestClient(get_application()) as client:
+        llm = client.app.state.model_registry.get()
+        llm._llm = FakeLlama()
+        llm._drafts = {"prompt_lookup": CountingDraft(lambda ids: [7, 8, 9, 10], "prompt_lookup")}
+        data = client.post("/llm/generate", json={"prompt": "a b c", "speculative": "prompt_lookup"}).json()
+        assert data["speculative"]["mode"] == "prompt_lookup"
+        assert data["speculative"]["accepted_tokens"] == 9
+        response = client.post("/llm/generate", json={"prompt": "a b c", "speculative": "draft_model"})
+        assert response.status_code == 400
+        llm._llm = None
+
+def test_stream_uses_requested_mode_with_a_fresh_draft():
+    service = fake_service()
+    draft = service._drafts["prompt_lookup"]
+    assert list(service.generate_stream("a b c", speculative="off")) == ["ok"]
+    assert service._llm.drafts_seen[-1] is None
+    list(service.generate_stream("a b c"))
+    list(service.generate_stream("a b c"))
+    assert service._llm.drafts_seen[-1] is draft
+    assert draft.passes == 3  # counted for this stream only
+    with pytest.raises(ValueError, match="not available"):
+        service.generate_stream("a b c", speculative="draft_model")
+
+def test_mock_mode_validates_modes_like_a_model():
+    service = LLMService("/nonexistent/model.gguf")
+    with pytest.raises(ValueError, match="not enabled"):
+        service.generate("a b c", speculative="prompt_lookup")
+    service = LLMService("/nonexistent/model.gguf", speculative="prompt_lookup")
+    assert service.generate("a b c", speculative="prompt_lookup").text
+    with pytest.raises(ValueError, match="not available"):
+        service.generate("a b c", speculative="draft_model")
+    with pytest.raises(ValueError, match="not available"):
+        service.generate_stream("a b c", speculative="draft_model")
+
+def test_broken_draft_model_keeps_the_main_model(tmp_path, monkeypatch, capsys):
+    model = tmp_path / "model.gguf"
+    draft = tmp_path / "draft.gguf"
+    model.write_bytes(b"")
+    draft.write_bytes(b"")
+
+    class FakeLlamaCpp:
+        LlamaGrammar = object
+
+        class Llama:
+            def __init__(self, model_path, draft_model=None, **kwargs):
+                if model_path == str(draft):
+                    raise RuntimeError("bad magic")
+                self.draft_model = draft_model
+
+    monkeypatch.setattr(llm_service, "llama_cpp", FakeLlamaCpp)
+    service = LLMService(str(model), speculative="draft_model", draft_model_path=str(draft))
+    assert service.is_model_loaded()
+    assert service.speculative == "prompt_lookup"
+    assert service._llm.draft_model is service._drafts["prompt_lookup"]
+    assert "could not load draft model" in capsys.readouterr().out
@@ -0,0 +1,141 @@
+import json
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from fastapi.testclient import TestClient
+from backend.app.main import get_application
+from backend.services.sqlite_service import SQLiteService
+from backend.settings import settings
+from backend.telemetry.profiler import SlowRequestProfiler
+from backend.telemetry.tracing import NOOP_SPAN, TRACER, Tracer, _parse_traceparent
+
+class ListExporter:
+    def __init__(self):
+        self.payloads = []
+
+    def export(self, payload):
+        self.payloads.append(payload)
+
+    def close(self):
+        pass
+
+    @property
+    def spans(self):
+        return [span for payload in self.payloads
+                for span in payload["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+
+@pytest.fixture
+def traced_client(monkeypatch):
+    exporter = ListExporter()
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(Tracer, "exporter_from_settings", classmethod(lambda cls, s: exporter))
+    with TestClient(get_application()) as client:
+        yield client, exporter
+    TRACER.configure(False)
+
+def test_disabled_tracer_returns_shared_noop():
+    tracer = Tracer(enabled=False)
+    assert tracer.span("anything", key="value") is NOOP_SPAN
+    assert tracer.start_trace() is None
+
+def test_spans_outside_a_trace_are_noops():
+    tracer = Tracer(enabled=True)
+    assert tracer.span("orphan") is NOOP_SPAN
+
+def test_nested_spans_share_trace_and_parent():
+    exporter = ListExporter()
+    tracer = Tracer(enabled=True, exporter=exporter)
+    trace, token = tracer.start_trace()
+    with tracer.span("outer") as outer:
+        with tracer.span("inner", rows=3):
+            pass
+    tracer.end_trace(trace, token)
+    inner, outer_span = exporter.spans
+    assert inner["name"] == "inner" and outer_span["name"] == "outer"
+    assert inner["traceId"] == outer_span["traceId"] == trace.trace_id
+    assert inner["parentSpanId"] == outer.span_id
+    assert inner["attributes"] == [{"key": "rows", "value": {"intValue": "3"}}]
+
+def test_traceparent_is_continued():
+    trace_id, parent_id, sampled = _parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+    assert (trace_id, parent_id, sampled) == ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", True)
+    assert _parse_traceparent("garbage") == (None, None, True)
+    tracer = Tracer(enabled=True)
+    assert tracer.start_trace("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00") is None
+
+def test_sample_rate_zero_records_nothing():
+    assert Tracer(enabled=True, sample_rate=0.0).start_trace() is None
+
+def test_generate_request_is_traced(traced_client):
+    client, exporter = traced_client
+    response = client.post("/llm/generate", json={"prompt": "trace me"})
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    assert "llm.queue_wait;dur=" in timing and "llm.generate;dur=" in timing and "total;dur=" in timing
+    names = {span["name"] for span in exporter.spans}
+    assert {"POST /llm/generate", "llm.queue_wait", "llm.inference", "llm.generate"} <= names
+    assert len({span["traceId"] for span in exporter.spans}) == 1
+    root = next(span for span in exporter.spans if span["name"] == "POST /llm/generate")
+    children = [span for span in exporter.spans if span.get("parentSpanId") == root["spanId"]]
+    assert {span["name"] for span in children} >= {"llm.queue_wait", "llm.inference"}
+
+def test_db_calls_become_spans():
+    exporter = ListExporter()
+    tracer_state = (TRACER.enabled, TRACER.exporter)
+    TRACER.configure(True, exporter)
+    try:
+        db = SQLiteService(":memory:")
+        trace, token = TRACER.start_trace()
+        db.execute("SELECT 1")
+        TRACER.end_trace(trace, token)
+    finally:
+        TRACER.enabled, TRACER.exporter = tracer_state
+    (span,) = exporter.spans
+    attributes = {a["key"]: a["value"]["stringValue"] for a in span["attributes"]}
+    assert span["name"] == "sqlite.execute"
+    assert attributes == {"db.system": "sqlite", "db.statement": "SELECT 1"}
+
+def test_file_exporter_writes_otlp_json(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "file")
+    monkeypatch.setattr(settings, "TRACING_FILE", path)
+    with TestClient(get_application()) as client:
+        client.get("/live")
+    TRACER.configure(False)
+    (line,) = path.read_text().splitlines()
+    spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[0]["name"] == "GET /live"
+
+def test_profiler_keeps_slowest_requests():
+    profiler = SlowRequestProfiler(slowest_n=2)
+    for duration in (5.0, 50.0, 1.0, 20.0):
+        profile = profiler.begin(f"req {duration}")
+        sampler = threading.Thread(target=profiler.sample)  # samples every thread but its own
+        sampler.start()
+        sampler.join()
+        profiler.end(profile, duration)
+    kept = profiler.profiles()
+    assert [p.duration_ms for p in kept] == [50.0, 20.0]
+    stack, count = kept[0].collapsed().splitlines()[0].rsplit(" ", 1)
+    assert stack.startswith("MainThread;") and count == "1"
+
+def test_profiles_endpoint(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_SLOWEST_N", 3)
+    monkeypatch.setattr(settings, "PROFILER_INTERVAL_MS", 1.0)
+    with TestClient(get_application()) as client:
+        profiler = client.app.state.profiler
+        original = profiler.end
+        monkeypatch.setattr(profiler, "end", lambda profile, ms: (time.sleep(0.02), original(profile, ms)))
+        client.post("/llm/generate", json={"prompt": "profile me"})
+        profiles = client.get("/debug/profiles").json()["profiles"]
+        assert profiles[0]["label"] == "POST /llm/generate"
+        flame = client.get("/debug/profiles/0")
+        assert flame.status_code == 200
+        assert client.get("/debug/profiles/9").status_code == 404
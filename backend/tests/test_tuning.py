@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.tuning import available_cpus, available_memory, plan_workers
+
+GiB = 1024 ** 3
+
+def test_plan_splits_cpus_between_workers():
+    plan = plan_workers(cpus=16, memory_bytes=64 * GiB, model_bytes=4 * GiB)
+    assert (plan.workers, plan.threads_per_worker) == (4, 4)
+
+def test_plan_small_machine_gets_one_worker():
+    plan = plan_workers(cpus=2, memory_bytes=8 * GiB, model_bytes=4 * GiB)
+    assert (plan.workers, plan.threads_per_worker) == (1, 2)
+
+def test_plan_limited_by_memory_without_mmap():
+    shared = plan_workers(cpus=32, memory_bytes=16 * GiB, model_bytes=4 * GiB, use_mmap=True)
+    private = plan_workers(cpus=32, memory_bytes=16 * GiB, model_bytes=4 * GiB, use_mmap=False)
+    assert shared.workers == 8
+    assert private.workers == 3 and private.threads_per_worker == 10
+
+def test_plan_keeps_explicit_values():
+    plan = plan_workers(cpus=16, memory_bytes=64 * GiB, model_bytes=0, workers=2)
+    assert (plan.workers, plan.threads_per_worker) == (2, 8)
+    plan = plan_workers(cpus=16, memory_bytes=64 * GiB, model_bytes=0, threads_per_worker=8)
+    assert (plan.workers, plan.threads_per_worker) == (2, 8)
+
+def test_available_resources_are_positive():
+    assert available_cpus() >= 1
+    assert available_memory() > 0
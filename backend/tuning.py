@@ -0,0 +1,83 @@
+"""
+Code Morningstar - Worker Autotuning
+Chooses how many server processes to run and how many llama.cpp threads each
+one gets, from the CPUs and memory actually available to the container.
+"""
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+# llama.cpp decoding is memory-bandwidth bound and gains little past a few threads,
+# so spare cores are better spent on more workers serving requests in parallel.
+TARGET_THREADS_PER_WORKER = 4
+
+@dataclass(frozen=True)
+class WorkerPlan:
+    workers: int
+    threads_per_worker: int
+    cpus: int
+    memory_bytes: int
+    model_bytes: int
+
+def available_cpus() -> int:
+    """CPUs this process may use: the cgroup quota if set, else the affinity mask."""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def available_memory() -> int:
+    """Bytes of memory this process may use: the cgroup limit if set, else physical RAM."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            value = Path(path).read_text().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+def plan_workers(cpus: int, memory_bytes: int, model_bytes: int, use_mmap: bool = True, workers: int = 0,
+                 threads_per_worker: int = 0, worker_overhead_bytes: int = 512 * 1024 * 1024) -> WorkerPlan:
+    """
+    Split ``cpus`` between worker processes. With ``use_mmap`` the model
+    weights live once in the shared page cache, so each extra worker only
+    costs ``worker_overhead_bytes`` (KV cache, interpreter); without it every
+    worker holds a private copy. Explicit ``workers``/``threads_per_worker``
+    values are kept; zero means choose automatically.
+    """
+    cpus = max(1, cpus)
+    if not workers:
+        target_threads = threads_per_worker or TARGET_THREADS_PER_WORKER
+        workers = max(1, cpus // target_threads)
+        if memory_bytes:
+            shared = model_bytes if use_mmap else 0
+            per_worker = worker_overhead_bytes + (0 if use_mmap else model_bytes)
+            workers = max(1, min(workers, (memory_bytes - shared) // max(1, per_worker)))
+    if not threads_per_worker:
+        threads_per_worker = max(1, cpus // workers)
+    return WorkerPlan(workers, threads_per_worker, cpus, memory_bytes, model_bytes)
+
+def plan_from_settings(settings: Any, workers: Optional[int] = None) -> WorkerPlan:
+    return plan_workers(
+        cpus=available_cpus(),
+        memory_bytes=available_memory(),
+        model_bytes=_total_size(settings.llm_models.values()),
+        use_mmap=settings.LLM_USE_MMAP,
+        workers=settings.API_WORKERS if workers is None else workers,
+        threads_per_worker=settings.LLM_N_THREADS,
+        worker_overhead_bytes=settings.API_WORKER_MEMORY_MB * 1024 * 1024,
+    )
+
+def _total_size(paths: Iterable[Path]) -> int:
+    return sum(Path(path).stat().st_size for path in paths if Path(path).exists())